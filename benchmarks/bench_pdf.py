@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Benchmark the TaskBoard PDF generators
+
+Runs both generators (generate_docs.py and generate_pdf.py) plus synthetic
+scale-up variants of them and records, per case, wall time, peak RSS, page
+count and output size into a JSON results file.  Every case runs in a fresh
+interpreter so peak RSS and import state do not leak between cases.
+
+The startup cases time a whole `generate_x.py list-sections` process
+instead, which must not import reportlab; their "pages" are the section
+count and they write no output.
+
+    python benchmarks/bench_pdf.py                      # run, write results
+    python benchmarks/bench_pdf.py --save-baseline      # ... and store them as the baseline
+    python benchmarks/bench_pdf.py --scales 1,10,100,1000 --cases whitepaper
+
+With a baseline file present, cases that got slower, bigger or hungrier
+than the baseline by more than --tolerance are reported as regressions and
+the script exits with status 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(HERE, 'results.json')
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+
+# Generator script of each document, for the startup cases
+SCRIPTS = {'whitepaper': 'generate_docs.py', 'technical-docs': 'generate_pdf.py'}
+
+# Metrics compared against the baseline; larger is worse for all of them.
+METRICS = ('wall_s', 'peak_rss_mib', 'bytes')
+
+
+def load_spec(module):
+    """Return the DocumentSpec of a generator module"""
+    if module == 'whitepaper':
+        import generate_docs
+        return generate_docs.SPEC
+    import generate_pdf
+    return generate_pdf.SPEC
+
+
+def scaled(spec, factor):
+    """The spec with its sections repeated factor times"""
+    from docbuild import DocumentSpec
+
+    sections = [(title if copy == 0 else "%s (%d)" % (title, copy + 1), build)
+                for copy in range(factor) for title, build in spec.sections]
+    return DocumentSpec('%s-x%d' % (spec.name, factor), sections, spec.create_styles, spec.create_doc,
+                        spec.on_first_page, spec.on_later_pages, spec.draw_page_number)
+
+
+def terminal_section(lines, styles):
+    """One very long terminal mock-up in the whitepaper's style"""
+    from reportlab.platypus import Paragraph
+    from generate_docs import terminal
+
+    yield Paragraph("Synthetic terminal session", styles['SectionTitle'])
+    yield terminal(["# %d lines of output" % lines] +
+                   ["> Task TASK-2025-%05d settled: %d.%02d SOL" % (i, i % 97, i % 100) for i in range(lines)],
+                   styles)
+
+
+def bullet_section(items, styles):
+    """One very long bullet list in the whitepaper's style"""
+    from reportlab.platypus import Paragraph
+    from docbuild.flowables import ListBlock
+
+    yield Paragraph("Synthetic bullet list", styles['SectionTitle'])
+    yield ListBlock(["Requirement %d: operators keep %d%% uptime across zone %d" % (i, 90 + i % 10, i % 40)
+                     for i in range(items)], styles['BulletItem'], bullet='*')
+
+
+def table_section(rows, styles):
+    """One very long fee table in the whitepaper's style"""
+    from reportlab.platypus import Paragraph
+    from generate_docs import data_table
+    from docbuild.tables import Column
+
+    yield Paragraph("Synthetic fee table", styles['SectionTitle'])
+    yield data_table([{'task': "TASK-2025-%05d" % i, 'zone': "Warehouse zone %d, aisle %d" % (i % 40, i % 300),
+                       'value': 10 + i % 990, 'fee': (10 + i % 990) * 0.03} for i in range(rows)],
+                     [Column('task', "Task", wrap=False), Column('zone', "Location"),
+                      Column('value', "Value", format='%d SOL', align='right', wrap=False),
+                      Column('fee', "Fees", format='%.2f SOL', align='right', wrap=False)], styles)
+
+
+def synthetic(spec, name, section):
+    from docbuild import DocumentSpec
+
+    return DocumentSpec(name, [("Synthetic", section)], spec.create_styles, spec.create_doc,
+                        spec.on_later_pages, spec.on_later_pages, spec.draw_page_number)
+
+
+def make_spec(case):
+    """Build the DocumentSpec a case describes"""
+    kind = case['kind']
+    spec = load_spec(case.get('document', 'whitepaper'))
+    if kind == 'document':
+        return spec
+    if kind == 'scaled':
+        return scaled(spec, case['factor'])
+    if kind == 'terminal':
+        return synthetic(spec, case['name'], partial(terminal_section, case['size']))
+    if kind == 'bullets':
+        return synthetic(spec, case['name'], partial(bullet_section, case['size']))
+    if kind == 'table':
+        return synthetic(spec, case['name'], partial(table_section, case['size']))
+    raise ValueError("Unknown case kind %r" % kind)
+
+
+def define_cases(scales, size):
+    """The benchmark matrix, in run order"""
+    cases = []
+    for document in ('whitepaper', 'technical-docs'):
+        cases.append({'name': document + '-startup', 'kind': 'startup', 'document': document,
+                      'mode': 'list-sections'})
+        cases.append({'name': document, 'kind': 'document', 'document': document, 'mode': 'single-pass'})
+        cases.append({'name': document + '-sections', 'kind': 'document', 'document': document,
+                      'mode': 'sections'})
+        for factor in scales:
+            if factor > 1:
+                cases.append({'name': '%s-x%d' % (document, factor), 'kind': 'scaled',
+                              'document': document, 'factor': factor, 'mode': 'single-pass'})
+    cases.append({'name': 'terminal-%d' % size, 'kind': 'terminal', 'size': size, 'mode': 'single-pass'})
+    cases.append({'name': 'bullets-%d' % size, 'kind': 'bullets', 'size': size, 'mode': 'single-pass'})
+    cases.append({'name': 'table-%d' % size, 'kind': 'table', 'size': size, 'mode': 'single-pass'})
+    return cases
+
+
+def peak_rss_mib(who):
+    peak_kib = resource.getrusage(who).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kib //= 1024
+    return round(peak_kib / 1024.0, 1)
+
+
+def run_startup(case):
+    """Time a generator process that lists its sections without rendering"""
+    started = time.perf_counter()
+    listing = subprocess.run([sys.executable, SCRIPTS[case['document']], case['mode']], cwd=REPO_ROOT,
+                             check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return {
+        'wall_s': round(time.perf_counter() - started, 4),
+        'peak_rss_mib': peak_rss_mib(resource.RUSAGE_CHILDREN),
+        'pages': len(listing.splitlines()),
+        'bytes': 0,
+    }
+
+
+def run_case(case, workdir):
+    """Run one case in the current process and return its measurements"""
+    from docbuild.build import build_sections, build_single_pass
+
+    if case['kind'] == 'startup':
+        return run_startup(case)
+    started = time.perf_counter()
+    spec = make_spec(case)
+    output = os.path.join(workdir, case['name'] + '.pdf')
+    if case['mode'] == 'sections':
+        pages = sum(pages for title, pages, reused in build_sections(spec, output))
+    else:
+        pages = build_single_pass(spec, output)
+    wall = time.perf_counter() - started
+    return {
+        'wall_s': round(wall, 4),
+        'peak_rss_mib': peak_rss_mib(resource.RUSAGE_SELF),
+        'pages': pages,
+        'bytes': os.path.getsize(output),
+    }
+
+
+def run_isolated(case, workdir):
+    """Run a case in a freshly spawned interpreter"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(run_case, case, workdir).result()
+
+
+def compare(results, baseline, tolerance):
+    """Return human-readable regression lines for results against baseline"""
+    problems = []
+    for name, current in sorted(results['cases'].items()):
+        previous = baseline.get('cases', {}).get(name)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if before and after is not None and after > before * (1 + tolerance):
+                problems.append("%s: %s %s -> %s (+%.0f%%)" % (
+                    name, metric, before, after, (after / before - 1) * 100))
+        if previous.get('pages') != current.get('pages'):
+            problems.append("%s: pages %s -> %s" % (name, previous.get('pages'), current.get('pages')))
+    return problems
+
+
+def environment():
+    import reportlab
+
+    return {
+        'python': platform.python_version(),
+        'reportlab': reportlab.Version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the TaskBoard PDF generators")
+    parser.add_argument('--scales', default='1,10,100',
+                        help="comma-separated section multipliers for the scale-up cases (default 1,10,100)")
+    parser.add_argument('--size', type=int, default=5000,
+                        help="lines/items/rows in the long terminal, bullet and table cases (default 5000)")
+    parser.add_argument('--cases', help="only run cases whose name contains one of these comma-separated words")
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help="where to write the results JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="also store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed relative increase before a metric counts as a regression (default 0.25)")
+    args = parser.parse_args(argv)
+
+    cases = define_cases([int(s) for s in args.scales.split(',') if s], args.size)
+    if args.cases:
+        words = args.cases.split(',')
+        cases = [case for case in cases if any(word in case['name'] for word in words)]
+
+    results = {'environment': environment(), 'cases': {}}
+    with tempfile.TemporaryDirectory(prefix='bench-pdf-') as workdir:
+        for case in cases:
+            measured = run_isolated(case, workdir)
+            results['cases'][case['name']] = measured
+            print("%-28s %8.3fs %8.1f MiB %7d pages %10d bytes" % (
+                case['name'], measured['wall_s'], measured['peak_rss_mib'], measured['pages'], measured['bytes']))
+
+    with open(args.results, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print("Results written to %s" % args.results)
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f), args.tolerance)
+        if problems:
+            print("Regressions against %s:" % args.baseline)
+            for line in problems:
+                print("  " + line)
+            status = 1
+        else:
+            print("No regressions against %s" % args.baseline)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("Baseline written to %s" % args.baseline)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
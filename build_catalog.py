@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Build the robot catalog appendix as a PDF of its own
+
+Reads robot records from src/pages/Robots.jsx or from a JSONL export of
+the fleet inventory (see docbuild/robots.py for the record format) and
+lays out a spec sheet per SKU in the whitepaper's theme.  Records are
+sorted externally and streamed into the layout, so catalogs of tens of
+thousands of SKUs build in bounded memory.
+
+    python build_catalog.py --source fleet.jsonl --output fleet-catalog.pdf
+    python build_catalog.py --export-jsonl robots.jsonl     # Robots.jsx as JSONL
+"""
+
+import argparse
+import os
+import sys
+from functools import partial
+
+from docbuild import DocumentSpec
+from docbuild.build import build_single_pass
+from docbuild.output import make_deterministic, publish, staging_path
+from docbuild.robots import ROBOTS_JSX, RUN_SIZE, export_jsonl, jsx_categories, read_records
+from docbuild.variants import DEFAULT_OUT_DIR
+
+
+def catalog_section(source, run_size, styles):
+    """The catalog of source as one section"""
+    import generate_docs
+    from reportlab.platypus import Paragraph
+
+    categories = jsx_categories() if os.path.exists(ROBOTS_JSX) else {}
+    yield Paragraph("Robot Catalog", styles['SectionTitle'])
+    yield Paragraph("Spec sheets for every robot model in %s, by category. Prices are list prices in USD; "
+                    "maintenance is the expected yearly cost." % os.path.basename(source), styles['Body'])
+    yield from generate_docs.robot_catalog(read_records(source), styles, categories, run_size)
+
+
+def catalog_spec(source, run_size=RUN_SIZE):
+    """DocumentSpec of the catalog of source, in the whitepaper's theme"""
+    import generate_docs
+
+    whitepaper = generate_docs.SPEC
+    return DocumentSpec('robot-catalog', [("Robot Catalog", partial(catalog_section, source, run_size))],
+                        whitepaper.create_styles, whitepaper.create_doc,
+                        whitepaper.on_later_pages, whitepaper.on_later_pages, whitepaper.draw_page_number,
+                        sources=[source])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--source', default=ROBOTS_JSX, help="Robots.jsx or a .jsonl export of robot records")
+    parser.add_argument('--output', default=os.path.join(DEFAULT_OUT_DIR, 'TaskBoard-robot-catalog.pdf'),
+                        help="PDF file to write")
+    parser.add_argument('--run-size', type=int, default=RUN_SIZE,
+                        help="records sorted in memory at a time (default %d)" % RUN_SIZE)
+    parser.add_argument('--deterministic', action='store_true',
+                        help="reproducible output: identical input gives an identical PDF")
+    parser.add_argument('--export-jsonl', metavar='PATH',
+                        help="write the records of --source to PATH as JSONL instead of building")
+    args = parser.parse_args(argv)
+
+    if args.export_jsonl:
+        count = export_jsonl(read_records(args.source), args.export_jsonl)
+        print("Records written: %s (%d robots)" % (args.export_jsonl, count))
+        return 0
+
+    if args.deterministic:
+        make_deterministic()
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    staged = staging_path(args.output)
+    pages = build_single_pass(catalog_spec(args.source, args.run_size), staged)
+    digest, changed = publish(staged, args.output)
+    print("Catalog created: %s (%d pages%s)" % (args.output, pages, '' if changed else ', unchanged'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Build every TaskBoard PDF variant in one run
+
+Produces the dark protocol whitepaper (generate_docs.py), the light
+technical docs (generate_pdf.py) and every translation found under
+locales/, each to its own file in the output directory.
+"""
+
+import argparse
+import os
+import sys
+
+from docbuild.cli import record_pages
+from docbuild.output import make_deterministic
+from docbuild.variants import DEFAULT_OUT_DIR, DOCUMENTS, LOCALES_DIR, build_variants, extract_catalog, find_variants
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR, help="directory to write the PDFs to")
+    parser.add_argument('--documents', help="comma-separated documents to build (%s)" % ', '.join(DOCUMENTS))
+    parser.add_argument('--locales', help="comma-separated locales to build ('en' = untranslated)")
+    parser.add_argument('--locales-dir', default=LOCALES_DIR, help="directory holding <lang>/<document>.json catalogs")
+    parser.add_argument('--cache-dir', help="reuse unchanged sections rendered into this directory")
+    parser.add_argument('--jobs', type=int, default=0, help="variants built in parallel (0 = one per CPU)")
+    parser.add_argument('--deterministic', action='store_true',
+                        help="reproducible output: identical input gives identical PDFs")
+    parser.add_argument('--manifest',
+                        help="keep content-hashed copies of the PDFs and record them in this JSON manifest "
+                             "(implies --deterministic)")
+    parser.add_argument('--page-manifest',
+                        help="record every page's content hash, and the pages changed since the last build, "
+                             "in this JSON file; page hashes depend on the build mode, so a build is only "
+                             "compared with one made the same way (single-pass, or in sections with "
+                             "--cache-dir)")
+    parser.add_argument('--watch', action='store_true',
+                        help="stay running and rebuild changed sections whenever the sources change "
+                             "(not with --jobs, --manifest or --page-manifest)")
+    parser.add_argument('--extract', metavar='LANG',
+                        help="write message catalogs for LANG with every source text instead of building")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        # the watcher builds the variants one by one and only publishes the PDFs
+        ignored = [option for option, value in (('--jobs', args.jobs != 0), ('--manifest', args.manifest),
+                                                ('--page-manifest', args.page_manifest)) if value]
+        if ignored:
+            parser.error("--watch cannot be combined with %s" % ', '.join(ignored))
+
+    documents = args.documents.split(',') if args.documents else list(DOCUMENTS)
+    unknown = [document for document in documents if document not in DOCUMENTS]
+    if unknown:
+        parser.error("unknown document: %s" % ', '.join(unknown))
+
+    if args.extract:
+        for document in documents:
+            path = os.path.join(args.locales_dir, args.extract, document + '.json')
+            count = extract_catalog(document, path)
+            print("Catalog written: %s (%d messages)" % (path, count))
+        return 0
+
+    locales = args.locales.split(',') if args.locales else None
+    variants = find_variants(documents, locales, args.locales_dir)
+    if not variants:
+        print("Nothing to build")
+        return 1
+    if args.watch:
+        from docbuild.watch import watch
+        if args.deterministic:
+            make_deterministic()
+        return watch([(variant, os.path.join(args.out_dir, variant.filename())) for variant in variants],
+                     args.cache_dir)
+    built = build_variants(variants, args.out_dir, args.cache_dir, args.jobs, args.deterministic, args.manifest)
+    for variant, output, pages, changed in built:
+        print("%-28s %3d pages  %s%s" % (variant.name, pages, os.path.relpath(output), '' if changed else '  (unchanged)'))
+    if args.page_manifest:
+        record_pages(args.page_manifest, [output for variant, output, pages, changed in built])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
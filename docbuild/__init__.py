@@ -0,0 +1,14 @@
+"""Shared build machinery for the TaskBoard PDF generators
+
+The generator scripts (generate_docs.py, generate_pdf.py) describe their
+documents as a DocumentSpec: an ordered list of sections plus the styles,
+document template and page callbacks used to lay them out.  The modules in
+this package turn a spec into a PDF.
+
+Nothing here imports reportlab at module import time; it is pulled in only
+when a build actually renders pages.
+"""
+
+from docbuild.spec import DocumentSpec
+from docbuild.cache import SectionCache
+from docbuild.build import build_pdf, build_sections
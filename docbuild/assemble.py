@@ -0,0 +1,86 @@
+"""Merge separately rendered section PDFs into one document
+
+Sections are rendered without page numbers because their final position is
+only known once every section before them has been laid out.  After the
+parts are concatenated the numbers are drawn on a single overlay document,
+one overlay page per output page, and stamped onto the merged pages.  The
+result names PRODUCER as its producer, which tells it from a single-pass
+build (see docbuild.pages).
+
+Requires pypdf (pip install pypdf).
+"""
+
+import io
+import os
+
+PRODUCER = 'docbuild.assemble'
+# passes merging identical objects, see assemble_pdf()
+MERGE_PASSES = 3
+
+
+def _require_pypdf():
+    try:
+        import pypdf
+    except ImportError:
+        raise SystemExit("Assembling section PDFs requires pypdf: pip install pypdf")
+    return pypdf
+
+
+def number_overlay(page_sizes, draw_page_number):
+    """Render one page per entry in page_sizes carrying only its page number"""
+    from reportlab.pdfgen.canvas import Canvas
+    from docbuild.pages import numbered
+
+    draw_page_number = numbered(draw_page_number)
+    buf = io.BytesIO()
+    canvas = Canvas(buf)
+    for page_num, size in enumerate(page_sizes, 1):
+        canvas.setPageSize(size)
+        draw_page_number(canvas, page_num)
+        canvas.showPage()
+    canvas.save()
+    return buf.getvalue()
+
+
+def page_count(path):
+    """Number of pages in the PDF at path"""
+    return len(_require_pypdf().PdfReader(path).pages)
+
+
+def assemble_pdf(parts, output, draw_page_number=None):
+    """Concatenate the PDFs in parts into output and number the pages
+
+    Returns the page count of each part, in order.
+    """
+    pypdf = _require_pypdf()
+
+    writer = pypdf.PdfWriter()
+    counts = []
+    for path in parts:
+        before = len(writer.pages)
+        writer.append(pypdf.PdfReader(path))
+        counts.append(len(writer.pages) - before)
+
+    if draw_page_number is not None:
+        from docbuild.pages import has_page_number
+
+        sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in writer.pages]
+        overlay = pypdf.PdfReader(io.BytesIO(number_overlay(sizes, draw_page_number)))
+        for page, stamp in zip(writer.pages, overlay.pages):
+            if stamp.get_contents() is not None and has_page_number(stamp.get_contents().get_data()):
+                page.merge_page(stamp)
+                page.compress_content_streams()
+    writer.add_metadata({'/Producer': PRODUCER})
+    # Every part carries its own copy of shared resources (fonts, page
+    # artwork forms, images).  An object only hashes equal to its twin once
+    # the objects it refers to have been merged, so each pass merges one
+    # level more; MERGE_PASSES covers the deepest sharing in the documents
+    # (a font's file, its descriptor, the font).
+    for merge in range(MERGE_PASSES):
+        writer.compress_identical_objects()
+
+    tmp = output + '.tmp'
+    with open(tmp, 'wb') as f:
+        writer.write(f)
+    os.replace(tmp, output)
+    return counts
@@ -0,0 +1,307 @@
+"""Section-level document builds: incremental and parallel"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from docbuild import drawings, memory, toc, trace
+from docbuild.cache import SectionCache
+from docbuild.pages import numbered
+from docbuild.stream import build_streaming
+from docbuild.fingerprint import (
+    fingerprint_callable, fingerprint_flowables, fingerprint_sources, fingerprint_stylesheet, section_key,
+)
+
+
+def render_section(spec, index, flowables, path):
+    """Lay out one section on its own into path and return its page count
+
+    flowables may be any iterable; it is consumed lazily.
+    """
+    on_first, on_later = spec.page_callbacks(index)
+    tracer = trace.active()
+    if tracer is not None:
+        on_first = tracer.wrap_callback(on_first, 'onFirstPage')
+        on_later = tracer.wrap_callback(on_later, 'onLaterPages')
+    kwargs = {}
+    if on_first is not None:
+        kwargs['onFirstPage'] = on_first
+    if on_later is not None:
+        kwargs['onLaterPages'] = on_later
+    doc = spec.create_doc(path)
+    build_streaming(doc, flowables, **kwargs)
+    return doc.page
+
+
+def build_single_pass(spec, output, styles=None):
+    """Lay out the whole document in one pass, drawing page numbers live
+
+    Contents page numbers are filled in when the document is saved (see
+    docbuild.toc).  Returns the page count.
+    """
+    draw_page_number = numbered(spec.draw_page_number) if spec.draw_page_number is not None else None
+
+    def with_number(callback):
+        def on_page(canvas, doc):
+            if callback is not None:
+                callback(canvas, doc)
+            if draw_page_number is not None:
+                draw_page_number(canvas, canvas.getPageNumber())
+        return on_page
+
+    if styles is None:
+        styles = spec.create_styles()
+    on_first = with_number(spec.on_first_page)
+    on_later = with_number(spec.on_later_pages)
+    marks = [toc.section_mark]
+    profiler = memory.active()
+    if profiler is not None:
+        spec = memory.accounted_spec(profiler, spec)
+        marks.append(partial(memory.section_mark, profiler))
+    story = spec.iter_story(styles, marks)
+    tracer = trace.active()
+    if tracer is not None:
+        on_first = tracer.wrap_callback(on_first, 'onFirstPage')
+        on_later = tracer.wrap_callback(on_later, 'onLaterPages')
+        story = trace.traced_story(tracer, spec, styles, marks)
+    doc = spec.create_doc(output)
+    try:
+        build_streaming(doc, story, onFirstPage=on_first, onLaterPages=on_later,
+                        canvasmaker=toc.contents_canvas())
+    finally:
+        if tracer is not None:
+            tracer.end_section()
+        if profiler is not None:
+            profiler.end_section()
+    return doc.page
+
+
+def _render_job(spec, index, path, traced=False, section_pages=None, drawing_dir=None):
+    """Process pool entry point: rebuild section index of spec and render it
+
+    section_pages is the start page map contents are drawn from and
+    drawing_dir the store of rendered charts (see docbuild.drawings).  Returns
+    (pages, trace events, titles looked up in the map); the events are only
+    recorded when traced.
+    """
+    styles = spec.create_styles()
+    title, build = spec.sections[index]
+    with toc.using(toc.PageMap(section_pages)) as page_map, drawings.storing(drawing_dir):
+        if not traced:
+            return render_section(spec, index, build(styles), path), [], sorted(page_map.looked_up)
+        tracer = trace.install(trace.Tracer())
+        tracer.process_name('worker')
+        try:
+            with tracer.span(title, 'section'):
+                count = render_section(spec, index, build(styles), path)
+        finally:
+            trace.uninstall()
+    return count, tracer.events, sorted(page_map.looked_up)
+
+
+def section_context(spec, styles):
+    """Fingerprints shared by every section of a build"""
+    return [
+        spec.name,
+        fingerprint_stylesheet(styles),
+        fingerprint_callable(spec.create_doc),
+        fingerprint_callable(spec.on_first_page),
+        fingerprint_callable(spec.on_later_pages),
+        fingerprint_sources(),
+    ]
+
+
+# contents that still show moved pages after this many passes are left as they are
+MAX_PASSES = 3
+
+
+def build_sections(spec, output, cache_dir=None, jobs=1, prune=True):
+    """Build spec into output by rendering its sections separately
+
+    Each section is laid out on its own and the section PDFs are
+    concatenated, with page numbers stamped on afterwards so every section
+    can be rendered without knowing where it will end up.
+
+    Sections are built twice when cached (once to fingerprint, once to
+    render) and never kept in memory as a whole, so a section builder may
+    be a generator producing arbitrarily many flowables.
+
+    With cache_dir, sections are fingerprinted from their flowables, the
+    stylesheet, the document template, the page callbacks and the code of
+    the docbuild modules that draw them (see fingerprint_sources()); sections
+    whose fingerprint is already cached are reused as rendered.  With
+    jobs > 1 (or 0 for one per CPU) the sections that do need rendering
+    are laid out in a process pool.
+
+    While a memory profiler is installed (see docbuild.memory) sections
+    are rendered in this process whatever jobs says.
+
+    Charts are rendered through a store in the drawings/ directory of the
+    cache, so an unchanged chart in a changed section is not rendered
+    again.
+
+    Contents are drawn from the section start pages of the previous build
+    recorded in the cache manifest.  If a page they show turns out to have
+    moved, only the sections holding contents are rendered again.
+
+    Returns a list of (title, pages, reused) tuples.
+    """
+    from docbuild.assemble import assemble_pdf, page_count
+
+    tracer = trace.active()
+    workdir = None
+    if cache_dir is None:
+        workdir = cache_dir = tempfile.mkdtemp(prefix='docbuild-')
+    cache = SectionCache(cache_dir)
+    drawing_dir = os.path.join(cache_dir, 'drawings')
+    styles = spec.create_styles()
+    context = section_context(spec, styles)
+    titles = spec.section_titles()
+    manifest = cache.load_manifest(spec.name)
+    known = dict((entry['key'], entry['pages']) for entry in manifest if entry.get('key'))
+    page_map = toc.PageMap(toc.estimate_pages(titles, manifest))
+
+    count = len(spec.sections)
+    parts = [None] * count
+    keys = [None] * count
+    counts = [None] * count
+    reused = [False] * count
+    readers = set()
+    scratch = []
+    style_cache = {}
+
+    def render(indexes):
+        pending = []
+        for index in indexes:
+            title, build = spec.sections[index]
+            key = None
+            if workdir is None:
+                start = trace.now()
+                lookups = page_map.lookups
+                with memory.section(title):
+                    key = section_key(fingerprint_flowables(build(styles), style_cache), index == 0, *context)
+                if page_map.lookups != lookups:
+                    readers.add(index)
+                if tracer is not None:
+                    tracer.complete(title, 'fingerprint', start)
+            path = cache.get(key)
+            reused[index] = path is not None
+            if path is None:
+                path = cache.temp_path()
+                scratch.append(path)
+                pending.append((index, path))
+            else:
+                counts[index] = known.get(key) or page_count(path)
+            parts[index] = path
+            keys[index] = key
+
+        # memory is accounted in this process, so a profiled build renders here
+        if jobs != 1 and len(pending) > 1 and memory.active() is None:
+            workers = min(jobs or os.cpu_count() or 1, len(pending))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_render_job, spec, index, path, tracer is not None, page_map.pages,
+                                       drawing_dir)
+                           for index, path in pending]
+                for (index, path), future in zip(pending, futures):
+                    counts[index], events, looked_up = future.result()
+                    if looked_up:
+                        readers.add(index)
+                        page_map.looked_up.update(looked_up)
+                    if tracer is not None:
+                        tracer.extend(events)
+        else:
+            for index, path in pending:
+                title, build = spec.sections[index]
+                start = trace.now()
+                lookups = page_map.lookups
+                with memory.section(title):
+                    counts[index] = render_section(spec, index, build(styles), path)
+                if page_map.lookups != lookups:
+                    readers.add(index)
+                if tracer is not None:
+                    tracer.complete(title, 'section', start)
+
+        for index, path in pending:
+            if keys[index] is not None:
+                scratch.remove(path)
+                parts[index] = cache.put(keys[index], path)
+
+    try:
+        with toc.using(page_map), drawings.storing(drawing_dir):
+            render(range(count))
+            for attempt in range(MAX_PASSES - 1):
+                actual = toc.start_pages(titles, counts)
+                if not readers or not page_map.stale(actual):
+                    break
+                page_map.pages = actual
+                render(sorted(readers))
+
+        start = trace.now()
+        with memory.section('assemble'):
+            counts = assemble_pdf(parts, output, spec.draw_page_number)
+        if tracer is not None:
+            tracer.complete('assemble', 'write', start, {'parts': len(parts)})
+    finally:
+        for path in scratch:
+            if os.path.exists(path):
+                os.remove(path)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if workdir is None:
+        cache.save_manifest(spec.name, [
+            {'title': title, 'key': key, 'pages': pages}
+            for (title, build), key, pages in zip(spec.sections, keys, counts)
+        ])
+        if prune:
+            cache.prune()
+            drawings.prune_store(drawing_dir)
+    return [(title, pages, hit) for (title, build), pages, hit in zip(spec.sections, counts, reused)]
+
+
+def report(results):
+    """One-line summary of a build_sections() result"""
+    reused = sum(1 for title, pages, hit in results if hit)
+    pages = sum(pages for title, pages, hit in results)
+    return "%d sections, %d pages (%d reused, %d rendered)" % (
+        len(results), pages, reused, len(results) - reused)
+
+
+def build_pdf(spec, output, cache_dir=None, jobs=1, trace_path=None, deterministic=False, manifest=None,
+              label="PDF created"):
+    """Build spec into output and print label with a summary of the build
+
+    With cache_dir only changed sections are re-rendered; with jobs != 1
+    sections are rendered in a process pool and merged in order.  With
+    trace_path the build is recorded as Chrome trace events into that file.
+
+    The output is only rewritten when its bytes change.  deterministic
+    makes identical input give identical bytes; manifest (which implies
+    it) also keeps a content-hashed copy of the PDF, recorded in that
+    manifest file.
+    """
+    from docbuild.output import make_deterministic, publish, staging_path, update_manifest
+
+    if trace_path:
+        with trace.tracing(trace_path, spec.name):
+            build_pdf(spec, output, cache_dir, jobs, None, deterministic, manifest, label)
+        print("Trace written: %s" % trace_path)
+        return
+
+    if deterministic or manifest:
+        make_deterministic()
+    staged = staging_path(output)
+    if cache_dir or jobs != 1:
+        notes = [report(build_sections(spec, staged, cache_dir, jobs))]
+    else:
+        build_single_pass(spec, staged)
+        notes = []
+    digest, changed = publish(staged, output)
+    if not changed:
+        notes.append("unchanged")
+    print("%s: %s%s" % (label, os.path.basename(output), " (%s)" % ", ".join(notes) if notes else ""))
+    if manifest:
+        hashed, = update_manifest(manifest, [(output, digest)])
+        print("Hashed copy: %s (manifest %s)" % (os.path.basename(hashed), manifest))
@@ -0,0 +1,76 @@
+"""On-disk store of rendered section PDFs"""
+
+import json
+import os
+import tempfile
+
+
+class SectionCache(object):
+    """Rendered section PDFs keyed by section fingerprint
+
+    Each cached section is stored as <key>.pdf.  A per-document manifest
+    (<name>.manifest.json) records the sections of the last build in order,
+    with their keys and page counts; prune() deletes rendered sections that
+    no manifest refers to any more.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + '.pdf')
+
+    def get(self, key):
+        """Return the path of the cached section, or None on a miss"""
+        if key is None:
+            return None
+        path = self.path_for(key)
+        if os.path.exists(path):
+            return path
+        return None
+
+    def temp_path(self):
+        """Return a fresh path inside the cache directory to render into"""
+        fd, path = tempfile.mkstemp(suffix='.pdf.tmp', dir=self.directory)
+        os.close(fd)
+        return path
+
+    def put(self, key, rendered_path):
+        """Move a freshly rendered section into the cache and return its path"""
+        path = self.path_for(key)
+        os.replace(rendered_path, path)
+        return path
+
+    def manifest_path(self, name):
+        return os.path.join(self.directory, name + '.manifest.json')
+
+    def load_manifest(self, name):
+        """Return the section entries recorded by the last build of name"""
+        try:
+            with open(self.manifest_path(name)) as f:
+                return json.load(f)['sections']
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def save_manifest(self, name, sections):
+        path = self.manifest_path(name)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'sections': sections}, f, indent=2)
+        os.replace(tmp, path)
+
+    def prune(self):
+        """Delete cached sections that no manifest refers to"""
+        keep = set()
+        for entry in os.listdir(self.directory):
+            if entry.endswith('.manifest.json'):
+                for section in self.load_manifest(entry[:-len('.manifest.json')]):
+                    if section.get('key'):
+                        keep.add(section['key'] + '.pdf')
+        removed = 0
+        for entry in os.listdir(self.directory):
+            if entry.endswith('.pdf') and entry not in keep:
+                os.remove(os.path.join(self.directory, entry))
+                removed += 1
+        return removed
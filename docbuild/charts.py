@@ -0,0 +1,366 @@
+"""Charts drawn with reportlab.graphics
+
+A chart is a Flowable built from plain data and a ChartTheme.  It keeps
+the data rather than a Drawing, so it can describe itself for the section
+cache (fingerprint()) and only builds the Drawing when it has to be
+rendered: charts are placed through docbuild.drawings, which renders a
+chart once per description and shows it as a form XObject, so identical
+charts are stored once per document and not rendered again while they do
+not change.
+
+LineChart draws series of points, BarChart horizontal bars by category
+and GaugeChart a row of dials.
+"""
+
+import copy
+import math
+
+from reportlab.lib import colors
+from reportlab.platypus.flowables import Flowable
+
+from docbuild.drawings import drawing_key, place
+
+
+class ChartTheme(object):
+    """How charts look
+
+    series_colors cycle over the series; text_color and font are used for
+    every label and grid_color for the axes and grid lines.  track_color
+    is the unfilled part of a gauge, grid_color if None.
+    """
+
+    def __init__(self, series_colors, text_color, grid_color, font_name='Helvetica', font_size=8, track_color=None):
+        self.series_colors = tuple(series_colors)
+        self.text_color = text_color
+        self.grid_color = grid_color
+        self.font_name = font_name
+        self.font_size = font_size
+        self.track_color = grid_color if track_color is None else track_color
+
+    def fingerprint(self):
+        return repr([str(value) for value in (self.series_colors, self.text_color, self.grid_color,
+                                              self.font_name, self.font_size, self.track_color)])
+
+    def series_color(self, index):
+        return colors.toColor(self.series_colors[index % len(self.series_colors)])
+
+
+def _legend(theme, names, x, y):
+    """A legend of names in the series colors, its top left corner at (x, y)"""
+    from reportlab.graphics.charts.legends import Legend
+
+    size = theme.font_size
+    legend = Legend()
+    legend.x, legend.y = x, y
+    legend.alignment = 'right'
+    legend.columnMaximum = 1
+    legend.deltax = 0
+    legend.dx = legend.dy = size
+    legend.autoXPadding = 1.5 * size
+    legend.fontName = theme.font_name
+    legend.fontSize = size
+    legend.fillColor = colors.toColor(theme.text_color)
+    legend.strokeColor = None
+    legend.colorNamePairs = [(theme.series_color(index), name) for index, name in enumerate(names)]
+    return legend
+
+
+class Chart(Flowable):
+    """What the charts share: a fixed size, a theme and placement as a form
+
+    Subclasses describe their content in fingerprint() and build it in
+    drawing().  texts() lists the texts a translation replaces and
+    translated() returns a copy with them replaced from messages.
+    """
+
+    def __init__(self, theme, width, height):
+        Flowable.__init__(self)
+        self.theme = theme
+        self.width = width
+        self.height = height
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def texts(self):
+        return []
+
+    def translated(self, messages):
+        return self
+
+    def drawing(self):
+        raise NotImplementedError
+
+    def draw(self):
+        from reportlab.graphics import renderPDF
+
+        place(self.canv, drawing_key(self.fingerprint()), self.width, self.height,
+              lambda canv: renderPDF.draw(self.drawing(), canv, 0, 0))
+
+
+class LineChart(Chart):
+    """Lines through series of (x, y) points
+
+    series is a list of point lists.  x_ticks are (x, label) pairs placed
+    along the x axis, which spans the first to the last of them; with
+    x_log the axis is logarithmic.  y_format formats the y axis labels,
+    which start at y_min.  names, if given, label the series in a legend
+    above the plot.
+    """
+
+    def __init__(self, series, theme, width, height, x_ticks, y_format='%g', y_min=0, x_title='', y_title='',
+                 x_log=False, names=()):
+        Chart.__init__(self, theme, width, height)
+        # a logarithmic axis is a linear one through log10(x)
+        x_scale = math.log10 if x_log else float
+        self.series = [[(x_scale(x), float(y)) for x, y in points] for points in series]
+        self.x_ticks = [(x_scale(x), label) for x, label in x_ticks]
+        self.y_format = y_format
+        self.y_min = y_min
+        self.x_title = x_title
+        self.y_title = y_title
+        self.names = tuple(names)
+
+    def __repr__(self):
+        return '<LineChart %d series>' % len(self.series)
+
+    def fingerprint(self):
+        return '%r:%s:%r' % (self.series, self.theme.fingerprint(), (self.width, self.height, self.x_ticks,
+                                                                     self.y_format, self.y_min, self.x_title,
+                                                                     self.y_title, self.names))
+
+    def texts(self):
+        return [text for text in (self.x_title, self.y_title) + self.names if text]
+
+    def translated(self, messages):
+        chart = copy.copy(self)
+        chart.x_title = messages.get(self.x_title, self.x_title)
+        chart.y_title = messages.get(self.y_title, self.y_title)
+        chart.names = tuple(messages.get(name, name) for name in self.names)
+        return chart
+
+    def drawing(self):
+        """The chart as a reportlab Drawing"""
+        from reportlab.graphics.charts.lineplots import LinePlot
+        from reportlab.graphics.shapes import Drawing, Group, String
+
+        theme = self.theme
+        text = colors.toColor(theme.text_color)
+        grid = colors.toColor(theme.grid_color)
+        size = theme.font_size
+        left, bottom = 6 * size, 3.5 * size
+        top = 2.5 * size if self.names else size
+        drawing = Drawing(self.width, self.height)
+
+        plot = LinePlot()
+        plot.x, plot.y = left, bottom
+        plot.width, plot.height = self.width - left - size, self.height - bottom - top
+        plot.data = self.series
+        for index in range(len(self.series)):
+            plot.lines[index].strokeColor = theme.series_color(index)
+            plot.lines[index].strokeWidth = 1.5
+        labels = dict(self.x_ticks)
+        for axis in (plot.xValueAxis, plot.yValueAxis):
+            axis.strokeColor = grid
+            axis.labels.fontName = theme.font_name
+            axis.labels.fontSize = size
+            axis.labels.fillColor = text
+        plot.xValueAxis.valueMin = self.x_ticks[0][0]
+        plot.xValueAxis.valueMax = self.x_ticks[-1][0]
+        plot.xValueAxis.valueSteps = [x for x, label in self.x_ticks]
+        plot.xValueAxis.labelTextFormat = lambda x: labels.get(x, '')
+        plot.yValueAxis.valueMin = self.y_min
+        plot.yValueAxis.labelTextFormat = self.y_format
+        plot.yValueAxis.visibleGrid = 1
+        plot.yValueAxis.gridStrokeColor = grid
+        plot.yValueAxis.gridStrokeWidth = 0.25
+        drawing.add(plot)
+
+        if self.names:
+            drawing.add(_legend(theme, self.names, left, self.height))
+        if self.x_title:
+            drawing.add(String(left + plot.width / 2, 2, self.x_title, fontName=theme.font_name,
+                               fontSize=size, fillColor=text, textAnchor='middle'))
+        if self.y_title:
+            # turned to read upwards along the y axis
+            drawing.add(Group(String(0, 0, self.y_title, fontName=theme.font_name, fontSize=size, fillColor=text,
+                                     textAnchor='middle'),
+                              transform=(0, 1, -1, 0, size, bottom + plot.height / 2)))
+        return drawing
+
+
+class BarChart(Chart):
+    """Horizontal bars, one group per category
+
+    series is a list of value lists, one value per category in each; the
+    first category is at the top.  Bars are labelled with their value in
+    value_format and the value axis runs from value_min to value_max (or
+    past the largest value).  names, if given, label the series in a
+    legend above the bars.
+    """
+
+    def __init__(self, categories, series, theme, width, height, value_format='%g', value_min=0, value_max=None,
+                 names=()):
+        Chart.__init__(self, theme, width, height)
+        self.categories = tuple(categories)
+        self.series = [[float(value) for value in values] for values in series]
+        self.value_format = value_format
+        self.value_min = value_min
+        self.value_max = value_max
+        self.names = tuple(names)
+
+    def __repr__(self):
+        return '<BarChart %d categories x %d series>' % (len(self.categories), len(self.series))
+
+    def fingerprint(self):
+        return '%r:%r:%s:%r' % (self.categories, self.series, self.theme.fingerprint(),
+                                (self.width, self.height, self.value_format, self.value_min, self.value_max,
+                                 self.names))
+
+    def texts(self):
+        return [text for text in self.categories + self.names if text]
+
+    def translated(self, messages):
+        chart = copy.copy(self)
+        chart.categories = tuple(messages.get(category, category) for category in self.categories)
+        chart.names = tuple(messages.get(name, name) for name in self.names)
+        return chart
+
+    def drawing(self):
+        """The chart as a reportlab Drawing"""
+        from reportlab.graphics.charts.barcharts import HorizontalBarChart
+        from reportlab.graphics.shapes import Drawing
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        theme = self.theme
+        text = colors.toColor(theme.text_color)
+        grid = colors.toColor(theme.grid_color)
+        size = theme.font_size
+        left = size + max([stringWidth(category, theme.font_name, size) for category in self.categories] or [0])
+        # room for the label of the longest bar
+        right = 2 * size + max([stringWidth(self.value_format % value, theme.font_name, size)
+                                for values in self.series for value in values] or [0])
+        bottom = 2 * size
+        top = 2.5 * size if self.names else size
+        drawing = Drawing(self.width, self.height)
+
+        chart = HorizontalBarChart()
+        chart.x, chart.y = left, bottom
+        chart.width, chart.height = self.width - left - right, self.height - bottom - top
+        chart.data = self.series
+        chart.strokeColor = None
+        chart.barSpacing = 2
+        chart.groupSpacing = size
+        for index in range(len(self.series)):
+            chart.bars[index].fillColor = theme.series_color(index)
+            chart.bars[index].strokeColor = None
+        chart.categoryAxis.categoryNames = list(self.categories)
+        # first category at the top, and first series at the top of each
+        chart.categoryAxis.reverseDirection = 1
+        chart.reversePlotOrder = 1
+        chart.categoryAxis.strokeColor = grid
+        chart.categoryAxis.visibleTicks = 0
+        for axis in (chart.categoryAxis, chart.valueAxis):
+            axis.labels.fontName = theme.font_name
+            axis.labels.fontSize = size
+            axis.labels.fillColor = text
+        chart.valueAxis.valueMin = self.value_min
+        if self.value_max is not None:
+            chart.valueAxis.valueMax = self.value_max
+        chart.valueAxis.strokeColor = grid
+        chart.valueAxis.labelTextFormat = self.value_format
+        chart.valueAxis.visibleGrid = 1
+        chart.valueAxis.gridStrokeColor = grid
+        chart.valueAxis.gridStrokeWidth = 0.25
+        chart.barLabelFormat = self.value_format
+        chart.barLabels.fontName = theme.font_name
+        chart.barLabels.fontSize = size
+        chart.barLabels.fillColor = text
+        chart.barLabels.boxAnchor = 'w'
+        chart.barLabels.dx = size / 2
+        drawing.add(chart)
+
+        if self.names:
+            drawing.add(_legend(theme, self.names, left, self.height))
+        return drawing
+
+
+class Gauge(object):
+    """One dial of a GaugeChart: label, and value on a scale from low to high
+
+    text shows the value in the dial and ends label the two ends of the
+    scale.
+    """
+
+    def __init__(self, label, value, high, text, low=0, ends=('', '')):
+        self.label = label
+        self.value = value
+        self.high = high
+        self.text = text
+        self.low = low
+        self.ends = tuple(ends)
+
+    def __repr__(self):
+        return 'Gauge(%r, %r, %r, %r, %r, %r)' % (self.label, self.value, self.high, self.text, self.low, self.ends)
+
+    @property
+    def share(self):
+        """How far along the scale the value is, 0 to 1"""
+        return min(max((self.value - self.low) / float(self.high - self.low), 0), 1)
+
+
+class GaugeChart(Chart):
+    """A row of half-circle dials, one per Gauge
+
+    Each dial fills from its left end in the next series color.
+    """
+
+    def __init__(self, gauges, theme, width, height):
+        Chart.__init__(self, theme, width, height)
+        self.gauges = list(gauges)
+
+    def __repr__(self):
+        return '<GaugeChart %d gauges>' % len(self.gauges)
+
+    def fingerprint(self):
+        return '%r:%s:%r' % (self.gauges, self.theme.fingerprint(), (self.width, self.height))
+
+    def texts(self):
+        return [gauge.label for gauge in self.gauges if gauge.label]
+
+    def translated(self, messages):
+        chart = copy.copy(self)
+        chart.gauges = [copy.copy(gauge) for gauge in self.gauges]
+        for gauge in chart.gauges:
+            gauge.label = messages.get(gauge.label, gauge.label)
+        return chart
+
+    def drawing(self):
+        """The chart as a reportlab Drawing"""
+        from reportlab.graphics.shapes import Drawing, String, Wedge
+
+        theme = self.theme
+        text = colors.toColor(theme.text_color)
+        track = colors.toColor(theme.track_color)
+        size = theme.font_size
+        drawing = Drawing(self.width, self.height)
+        cell = self.width / float(len(self.gauges) or 1)
+        base = 4 * size
+        radius = min(cell / 2 - size, self.height - base - size)
+        inner = radius * 0.72
+        for index, gauge in enumerate(self.gauges):
+            x = cell * (index + 0.5)
+            drawing.add(Wedge(x, base, radius, 0, 180, radius1=inner, fillColor=track, strokeColor=None))
+            if gauge.share > 0:
+                drawing.add(Wedge(x, base, radius, 180 - 180 * gauge.share, 180, radius1=inner,
+                                  fillColor=theme.series_color(index), strokeColor=None))
+            drawing.add(String(x, base + size / 2, gauge.text, fontName=theme.font_name, fontSize=2 * size,
+                               fillColor=text, textAnchor='middle'))
+            for end, side in zip(gauge.ends, (-1, 1)):
+                if end:
+                    drawing.add(String(x + side * (radius + inner) / 2, base - 1.4 * size, end,
+                                       fontName=theme.font_name, fontSize=size, fillColor=text,
+                                       textAnchor='middle'))
+            drawing.add(String(x, base - 3.2 * size, gauge.label, fontName=theme.font_name, fontSize=size,
+                               fillColor=text, textAnchor='middle'))
+        return drawing
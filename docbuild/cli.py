@@ -0,0 +1,329 @@
+"""Command line shared by the generator scripts
+
+    generate_pdf.py list-sections [--cache-dir DIR] [--json]
+    generate_pdf.py check [--output PDF]
+    generate_pdf.py [build] [--output PDF] [--cache-dir DIR] [--jobs N] [--memory-budget MB] ...
+    generate_docs.py personalize RECIPIENTS [--out-dir DIR] [--base PDF] [--jobs N]
+    generate_pdf.py diff-pages OLD [NEW] [--json]
+
+build is the default command, so the scripts still take the options they
+always did.  list-sections and check only look at the DocumentSpec and
+never render, so they never import reportlab.  personalize renders the
+document once (or takes --base) and stamps a copy per recipient onto it,
+see docbuild.personalize.  build --memory reports the memory each section
+and flowable type allocates, and --memory-budget fails a build that
+needs more (see docbuild.memory).  build --page-manifest records the
+hash of every page and which pages changed since the last build;
+diff-pages compares two builds (PDFs or page manifests) page by page and
+exits 1 when they differ, 2 when they were built in different modes (see
+docbuild.pages).  --timing (on any command) prints start-up
+cost, reportlab import time and command time to stderr, to keep start-up
+regressions visible.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+COMMANDS = ('list-sections', 'build', 'check', 'personalize', 'diff-pages')
+
+
+def section_rows(spec, cache_dir=None):
+    """(index, title, pages, first page) per section
+
+    Page counts come from the cache manifest of the last cached build, if
+    cache_dir has one; otherwise pages and first page are None.
+    """
+    from docbuild.cache import SectionCache
+
+    counts = {}
+    if cache_dir and os.path.isdir(cache_dir):
+        for entry in SectionCache(cache_dir).load_manifest(spec.name):
+            counts.setdefault(entry['title'], entry['pages'])
+    rows = []
+    page = 1
+    for index, title in enumerate(spec.section_titles(), 1):
+        pages = counts.get(title)
+        rows.append((index, title, pages, page if page is not None and pages is not None else None))
+        page = page + pages if page is not None and pages is not None else None
+    return rows
+
+
+def list_sections(spec, args):
+    rows = section_rows(spec, args.cache_dir)
+    if args.json:
+        print(json.dumps([{'index': index, 'title': title, 'pages': pages, 'first_page': first}
+                          for index, title, pages, first in rows], indent=1))
+        return 0
+    for index, title, pages, first in rows:
+        if pages is None:
+            print("%3d  %s" % (index, title))
+        else:
+            print("%3d  %-40s %3d page%s from p. %d" % (index, title, pages, '' if pages == 1 else 's', first))
+    return 0
+
+
+def check_spec(spec, output):
+    """Problems that would stop spec building into output, without rendering it"""
+    problems = []
+    titles = spec.section_titles()
+    if not titles:
+        problems.append("no sections")
+    seen = set()
+    for title in titles:
+        if not title.strip():
+            problems.append("a section has an empty title")
+        elif title in seen:
+            problems.append("duplicate section title %r (contents look sections up by title)" % title)
+        seen.add(title)
+    for path in spec.sources:
+        if not os.path.exists(path):
+            problems.append("source missing: %s" % path)
+    directory = os.path.dirname(os.path.abspath(output))
+    if not os.path.isdir(directory):
+        problems.append("output directory does not exist: %s" % directory)
+    elif not os.access(directory, os.W_OK):
+        problems.append("output directory is not writable: %s" % directory)
+    return problems
+
+
+def check(spec, args):
+    problems = check_spec(spec, args.output)
+    for problem in problems:
+        print("%s: %s" % (spec.name, problem))
+    if problems:
+        return 1
+    print("%s: ok (%d sections, output %s)" % (spec.name, len(spec.sections), args.output))
+    return 0
+
+
+def build(spec, args, build_document):
+    from docbuild.output import make_deterministic
+
+    if args.watch:
+        from docbuild.variants import Variant
+        from docbuild.watch import watch
+
+        if args.deterministic:
+            make_deterministic()
+        return watch([(Variant(spec.name), args.output)], args.cache_dir)
+    if args.memory or args.memory_budget:
+        status = build_profiled(args, build_document)
+    else:
+        build_document(args.output, args.cache_dir, args.jobs, args.trace, args.deterministic, args.manifest)
+        status = 0
+    if args.page_manifest and not status:
+        record_pages(args.page_manifest, [args.output])
+    return status
+
+
+def record_pages(page_manifest, outputs):
+    """Record the page hashes of outputs in page_manifest and print what changed per output"""
+    from docbuild.pages import page_ranges, update_page_manifest
+
+    for output, diff in zip(outputs, update_page_manifest(page_manifest, outputs)):
+        notes = ["%s %s" % (kind, page_ranges(pages))
+                 for kind, pages in (('changed', [page for was, page in diff.changed]), ('added', diff.added),
+                                     ('removed (old numbers)', diff.removed)) if pages]
+        print("Pages of %s: %s%s" % (os.path.basename(output), diff.summary(),
+                                     " (%s)" % "; ".join(notes) if notes else ""))
+
+
+def build_profiled(args, build_document):
+    """Build with the memory accounted (see docbuild.memory) and report it to stderr"""
+    from docbuild.memory import MemoryBudgetExceeded, profiling
+
+    budget = int(args.memory_budget * 1024 * 1024) if args.memory_budget else None
+    try:
+        with profiling(budget) as profiler:
+            build_document(args.output, args.cache_dir, args.jobs, args.trace, args.deterministic, args.manifest)
+    except MemoryBudgetExceeded as e:
+        sys.stderr.write("%s; build aborted\n%s" % (e, e.profiler.report()))
+        return 1
+    sys.stderr.write(profiler.report())
+    return 0
+
+
+def personalize(spec, args):
+    from docbuild.build import build_sections, build_single_pass
+    from docbuild.output import make_deterministic, publish, staging_path
+    from docbuild.personalize import personalize as personalize_copies, read_recipients
+    from docbuild.variants import DEFAULT_OUT_DIR
+
+    if spec.personalization is None:
+        print("%s: has no personalization" % spec.name)
+        return 1
+    if args.deterministic:
+        make_deterministic()
+    out_dir = args.out_dir or os.path.join(DEFAULT_OUT_DIR, spec.name + '-personalized')
+    os.makedirs(out_dir, exist_ok=True)
+    base = args.base
+    base_dir = workdir = None
+    if base is None:
+        # the base is not one of the copies: it stays with the cache, or only until they are stamped
+        if args.cache_dir:
+            base_dir = os.path.join(args.cache_dir, 'personalize')
+            os.makedirs(base_dir, exist_ok=True)
+        else:
+            base_dir = workdir = tempfile.mkdtemp(prefix='docbuild-')
+        base = os.path.join(base_dir, '%s.base.pdf' % spec.name)
+    try:
+        if base_dir is not None:
+            staged = staging_path(base)
+            if args.cache_dir:
+                build_sections(spec, staged, args.cache_dir)
+            else:
+                build_single_pass(spec, staged)
+            publish(staged, base)
+        started = time.perf_counter()
+        try:
+            copies, changed = personalize_copies(base, read_recipients(args.recipients, spec.personalization.fields),
+                                                 spec.personalization, out_dir, args.jobs)
+        except ValueError as e:
+            print("%s: %s" % (spec.name, e))
+            return 1
+    finally:
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    seconds = time.perf_counter() - started
+    print("%s: %d personalized copies in %s (%d changed, %.1f ms per copy)" % (
+        spec.name, copies, out_dir, changed, seconds * 1000 / (copies or 1)))
+    return 0
+
+
+def diff_pages(spec, args):
+    from docbuild.pages import diff_pages as diff, load_pages, page_ranges
+
+    try:
+        old_mode, old = load_pages(args.old, args.new)
+        new_mode, new = load_pages(args.new, args.old)
+    except (OSError, ValueError) as e:
+        print("%s: %s" % (spec.name, e))
+        return 2
+    if old_mode and new_mode and old_mode != new_mode:
+        print("%s: %s is a %s build and %s a %s build; their pages cannot be compared" % (
+            spec.name, args.old, old_mode, args.new, new_mode))
+        return 2
+    result = diff(old, new)
+    if args.json:
+        data = result.as_dict()
+        data['unchanged'] = result.unchanged
+        print(json.dumps(data))
+    else:
+        for kind, pages in (('changed', [page for was, page in result.changed]), ('added', result.added),
+                            ('removed', result.removed)):
+            if pages:
+                print("%-8s %s" % (kind, page_ranges(pages)))
+        print(result.summary())
+    return 1 if result else 0
+
+
+def report_timing(started, cpu_at_start):
+    from docbuild.lazy import import_seconds
+
+    if 'reportlab' in sys.modules:
+        lazy = import_seconds()
+        reportlab = "imported (%.0f ms on first use)" % (lazy * 1000) if lazy else "imported"
+    else:
+        reportlab = "not imported"
+    sys.stderr.write("timing: start-up %.0f ms cpu, reportlab %s, command %.0f ms\n" % (
+        cpu_at_start * 1000, reportlab, (time.perf_counter() - started) * 1000))
+
+
+def main(spec, build_document, default_output, description, argv=None):
+    """Run the command line of a generator script
+
+    build_document(output, cache_dir, jobs, trace, deterministic, manifest)
+    builds spec; default_output is where it writes by default.
+    """
+    cpu_at_start = time.process_time()
+    started = time.perf_counter()
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv = ['build'] + list(argv)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--timing', action='store_true',
+                        help="print start-up, reportlab import and command time to stderr")
+    parser = argparse.ArgumentParser(description=description)
+    commands = parser.add_subparsers(dest='command')
+
+    listing = commands.add_parser('list-sections', parents=[common], help="print the document's sections")
+    listing.add_argument('--cache-dir', help="also show page counts from the last build cached here")
+    listing.add_argument('--json', action='store_true', help="print JSON instead of a table")
+
+    checking = commands.add_parser('check', parents=[common],
+                                   help="check the spec and output path without rendering")
+    checking.add_argument('--output', default=default_output, help="PDF file the build would write")
+
+    building = commands.add_parser('build', parents=[common], help="render the PDF (the default)")
+    building.add_argument('--output', default=default_output, help="PDF file to write")
+    building.add_argument('--cache-dir', help="reuse unchanged sections rendered into this directory")
+    building.add_argument('--jobs', type=int, default=1, help="render sections in parallel (0 = one per CPU)")
+    building.add_argument('--trace', help="write a Chrome trace-event JSON of the build to this file")
+    building.add_argument('--deterministic', action='store_true',
+                          help="reproducible output: identical input gives an identical PDF")
+    building.add_argument('--manifest',
+                          help="keep a content-hashed copy of the PDF and record it in this JSON manifest "
+                               "(implies --deterministic)")
+    building.add_argument('--page-manifest',
+                          help="record every page's content hash, and the pages changed since the last build, "
+                               "in this JSON file; page hashes depend on the build mode, so a build is only "
+                               "compared with one made the same way (single-pass, or in sections with "
+                               "--cache-dir or --jobs)")
+    building.add_argument('--memory', action='store_true',
+                          help="account memory per section and flowable type with tracemalloc and report it "
+                               "to stderr (renders every section in this process)")
+    building.add_argument('--memory-budget', type=float, metavar='MB',
+                          help="abort the build once it has allocated more than MB megabytes at a time "
+                               "(implies --memory)")
+    building.add_argument('--watch', action='store_true',
+                          help="stay running and rebuild changed sections whenever the sources change "
+                               "(not with --jobs, --trace, --manifest, --page-manifest or --memory)")
+
+    personalizing = commands.add_parser('personalize', parents=[common],
+                                        help="write a personalized copy of the PDF per recipient")
+    personalizing.add_argument('recipients', help="CSV (with a header row) or JSONL file of recipients")
+    personalizing.add_argument('--out-dir',
+                               help="where to write the copies (default build/pdf/<document>-personalized)")
+    personalizing.add_argument('--base', help="stamp this PDF instead of rendering the document first "
+                                              "(a rendered base is only kept under --cache-dir)")
+    personalizing.add_argument('--cache-dir', help="render the base reusing unchanged sections cached here")
+    personalizing.add_argument('--jobs', type=int, default=0, help="copies stamped in parallel (0 = one per CPU)")
+    personalizing.add_argument('--deterministic', action='store_true',
+                               help="reproducible base, so copies of unchanged recipients stay untouched")
+
+    diffing = commands.add_parser('diff-pages', parents=[common],
+                                  help="list the pages changed, added and removed between two builds")
+    diffing.add_argument('old', help="the earlier build: a PDF or a page manifest")
+    diffing.add_argument('new', nargs='?', default=default_output,
+                         help="the later build: a PDF or a page manifest (default the document's output)")
+    diffing.add_argument('--json', action='store_true', help="print JSON instead of page lists")
+
+    args = parser.parse_args(argv)
+    if args.command == 'build' and args.watch:
+        # the watcher renders sections one by one and only publishes the PDF
+        ignored = [option for option, value in (('--jobs', args.jobs != 1), ('--trace', args.trace),
+                                                ('--manifest', args.manifest), ('--page-manifest', args.page_manifest),
+                                                ('--memory', args.memory), ('--memory-budget', args.memory_budget))
+                   if value]
+        if ignored:
+            building.error("--watch cannot be combined with %s" % ', '.join(ignored))
+    try:
+        if args.command == 'list-sections':
+            return list_sections(spec, args)
+        if args.command == 'check':
+            return check(spec, args)
+        if args.command == 'personalize':
+            return personalize(spec, args)
+        if args.command == 'diff-pages':
+            return diff_pages(spec, args)
+        return build(spec, args, build_document)
+    finally:
+        if args.timing:
+            report_timing(started, cpu_at_start)
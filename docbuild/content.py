@@ -0,0 +1,82 @@
+"""Website documentation content as a cached intermediate representation
+
+load_library_docs() reads `libraryDocs` from src/pages/Docs.jsx and returns
+it as plain JSON-compatible data:
+
+    {"source": ..., "sha256": ..., "pages": [
+        {"key": "installation", "title": "Installation", "icon": "overview",
+         "sections": [{"title": ..., "description": ..., "code": ...,
+                       "language": ...}, ...]},
+        ...]}
+
+The result is cached as JSON keyed by the sha256 of the JSX file, so the
+file is only re-parsed when its content actually changes.
+"""
+
+import hashlib
+import json
+import os
+
+from docbuild.jsx import extract_const
+
+IR_VERSION = 1
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS_JSX = os.path.join(REPO_ROOT, 'src', 'pages', 'Docs.jsx')
+# the site's static assets (images)
+PUBLIC_DIR = os.path.join(REPO_ROOT, 'public')
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, '.docs-cache')
+
+
+def library_docs_ir(source, source_name='Docs.jsx'):
+    """Convert the text of Docs.jsx into the content IR"""
+    docs = extract_const(source, 'libraryDocs')
+    pages = []
+    for key, page in docs.items():
+        sections = []
+        for section in page.get('sections', []):
+            sections.append({
+                'title': section.get('title', ''),
+                'description': section.get('description', ''),
+                'code': section.get('code', ''),
+                'language': section.get('language', 'text'),
+            })
+        pages.append({
+            'key': key,
+            'title': page.get('title', key),
+            'icon': page.get('icon'),
+            'sections': sections,
+        })
+    return {
+        'version': IR_VERSION,
+        'source': source_name,
+        'sha256': hashlib.sha256(source.encode('utf-8')).hexdigest(),
+        'pages': pages,
+    }
+
+
+def load_library_docs(path=DOCS_JSX, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the content IR for path, re-parsing only when the file changed"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, 'library-docs.ir.json')
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get('sha256') == digest and cached.get('version') == IR_VERSION:
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    ir = library_docs_ir(raw.decode('utf-8'), os.path.relpath(path, REPO_ROOT))
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cache_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(ir, f, indent=1)
+        os.replace(tmp, cache_path)
+    return ir
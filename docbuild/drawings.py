@@ -0,0 +1,148 @@
+"""Rendered drawings, cached by content and placed as form XObjects
+
+What a chart puts on the page depends only on its data and style, so a
+chart is rendered once per key, a hash of its description.  place() draws
+the rendering into a form XObject named after the key the first time a
+document shows it and only references the form after that, so a chart
+repeated within a document is stored once (and assemble_pdf() folds
+identical forms of separately rendered sections together).
+
+The operators a rendering produced are kept too: in memory, MAX_CACHED
+of them, and inside storing() as files in a directory (drawings/ in the
+section cache during cached builds; see docbuild.build), so an unchanged
+chart is not rendered again by a later build or another worker.  The key
+covers the source of the chart and drawing modules, so a change to the
+code that draws a chart does not reuse its old renderings.
+
+Only renderings in the standard PDF fonts are kept.  Their names in the
+operators are the document's own (/F1, /F2, ...), so they are kept by font
+and mapped to the names of the document that reuses them.  Renderings that
+select any other font (embedded TrueType subsets, say) or use any other
+named resource (transparency, patterns, images) are drawn every time.
+"""
+
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+
+MAX_CACHED = 256
+# renderings kept in a store; the least recently used are dropped first
+MAX_STORED = 1024
+STORE_VERSION = 2
+# modules whose code decides what a drawing looks like
+DRAWING_MODULES = ('charts', 'drawings')
+
+# any font selection, so that ones in fonts that cannot be kept are noticed
+_FONT = re.compile(r'(/[^\s/\[\]()<>{}%]+)( [-\d.]+ Tf)')
+_RESOURCE = re.compile(r' (gs|Do|sh|cs|CS)\b')
+
+_rendered = {}
+_store = None
+
+
+def drawing_key(description):
+    """The cache key of a drawing described by description"""
+    from reportlab import Version
+    from docbuild.fingerprint import fingerprint_sources
+
+    text = '%d:%s:%s:%s' % (STORE_VERSION, Version, fingerprint_sources(DRAWING_MODULES), description)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+@contextmanager
+def storing(directory):
+    """Keep renderings as files in directory inside the block (None keeps them in memory only)"""
+    global _store
+    previous = _store
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    _store = directory
+    try:
+        yield directory
+    finally:
+        _store = previous
+
+
+def _store_path(key):
+    return os.path.join(_store, key + '.json')
+
+
+def _lookup(key):
+    rendering = _rendered.get(key)
+    if rendering is None and _store is not None:
+        try:
+            with open(_store_path(key), encoding='utf-8') as f:
+                rendering = json.load(f)
+            os.utime(_store_path(key))
+        except (OSError, ValueError):
+            return None
+        _remember(key, rendering)
+    return rendering
+
+
+def _remember(key, rendering):
+    if len(_rendered) >= MAX_CACHED:
+        del _rendered[next(iter(_rendered))]
+    _rendered[key] = rendering
+
+
+def _keep(key, code, doc):
+    """Remember the operators code rendered for key in doc, if they can be reused"""
+    from reportlab.pdfbase.pdfmetrics import standardFonts
+
+    ops = '\n'.join(code)
+    if _RESOURCE.search(ops):
+        return
+    names = dict((internal, font) for font, internal in doc.fontMapping.items() if font in standardFonts)
+    fonts = {}
+    for match in _FONT.finditer(ops):
+        if match.group(1) not in names:
+            return
+        fonts[match.group(1)] = names[match.group(1)]
+    rendering = {'ops': ops, 'fonts': fonts}
+    _remember(key, rendering)
+    if _store is not None:
+        path = _store_path(key)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(rendering, f)
+        os.replace(path + '.tmp', path)
+
+
+def _reuse(rendering, doc):
+    """The operators of rendering with its fonts named as doc names them"""
+    fonts = dict((internal, doc.getInternalFontName(font)) for internal, font in rendering['fonts'].items())
+    return _FONT.sub(lambda match: fonts[match.group(1)] + match.group(2), rendering['ops'])
+
+
+def place(canv, key, width, height, render):
+    """Show the drawing of key, width by height, at the origin of canv
+
+    render(canv) draws it, and is only called when the drawing is neither
+    in the document nor cached yet.
+    """
+    name = 'Drawing' + key[:20]
+    if not canv.hasForm(name):
+        canv.beginForm(name, 0, 0, width, height)
+        rendering = _lookup(key)
+        if rendering is None:
+            start = len(canv._code)
+            render(canv)
+            _keep(key, canv._code[start:], canv._doc)
+        else:
+            canv._code.append(_reuse(rendering, canv._doc))
+        canv.endForm()
+    canv.doForm(name)
+
+
+def prune_store(directory, keep=MAX_STORED):
+    """Delete all but the keep most recently used renderings stored in directory"""
+    try:
+        entries = [os.path.join(directory, entry) for entry in os.listdir(directory) if entry.endswith('.json')]
+    except OSError:
+        return 0
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        os.remove(path)
+    return max(len(entries) - keep, 0)
@@ -0,0 +1,180 @@
+"""The protocol's fee schedule and a vectorized engine to evaluate it
+
+This module is the one place the fee model is written down; both
+generators render their fee tables and curves from it.  A completed task
+pays, out of its value:
+
+* the protocol fee, PROTOCOL_FEE percent, shared by PROTOCOL_SPLIT,
+* validator rewards, VALIDATOR_REWARD percent, shared by the validators
+  that verified the task,
+* network gas for the task's transactions, a flat amount in SOL.
+
+The robot operator receives the rest.  Because gas is flat, the share of
+a task's value that does not reach the operator (its take rate) is
+higher for small tasks.
+
+FeeModel.evaluate() works on NumPy arrays: the task values and every
+parameter may be scalars or arrays, broadcast against each other, so a
+grid of millions of (value, parameter) points is a handful of array
+operations.  NumPy is only imported when something is evaluated.
+"""
+
+# Percent of the task value
+PROTOCOL_FEE = 2.5
+VALIDATOR_REWARD = 0.5
+# Who gets the protocol fee and what for, in percent of the task value;
+# sums to PROTOCOL_FEE
+PROTOCOL_SPLIT = (
+    ("Treasury", 1.5, "development and grants"),
+    ("Token buyback", 0.5, "supports the governance token"),
+    ("Insurance fund", 0.5, "dispute resolution and refunds"),
+)
+VALIDATOR_PURPOSE = "shared by the validators of the task"
+
+# SOL per transaction, and the transactions of one task by step
+GAS_PER_TRANSACTION = 0.00025
+TASK_TRANSACTIONS = (("Task creation", 1), ("Bid submission", 1), ("Completion", 2))
+TRANSACTIONS_PER_TASK = sum(count for step, count in TASK_TRANSACTIONS)
+GAS_PER_TASK = GAS_PER_TRANSACTION * TRANSACTIONS_PER_TASK
+
+# What the documents show: the task value (SOL) the schedule is worked
+# through for, task values to tabulate, the range of the take rate curve
+# and the protocol fees (percent) of the sensitivity table
+EXAMPLE_VALUE = 100
+SAMPLE_VALUES = (0.1, 1, 10, 100, 1000)
+CURVE_VALUES = (0.01, 0.1, 1, 10, 100, 1000, 10000)
+SENSITIVITY_FEES = (1.5, 2.0, 2.5, 3.0, 3.5)
+
+
+class FeeBreakdown(object):
+    """Where task values go under a FeeModel
+
+    Every attribute is an array in SOL of the shape the inputs broadcast
+    to: value, protocol, validators, gas and robot (what the operator
+    receives), plus split, the protocol fee per recipient.  take_rate is
+    the fraction of value that does not reach the operator.
+    """
+
+    def __init__(self, value, protocol, validators, gas, split):
+        self.value = value
+        self.protocol = protocol
+        self.validators = validators
+        self.gas = gas
+        self.split = split
+        taken = protocol + validators + gas
+        self.robot = value - taken
+        self.take_rate = taken / value
+
+
+class FeeModel(object):
+    """The fee parameters of the protocol
+
+    protocol_fee and validator_reward are percentages of the task value;
+    split lists the protocol fee's (recipient, percent, purpose) shares
+    and is scaled with protocol_fee when that is overridden.  gas is the SOL
+    spent on a task's transactions.
+    """
+
+    def __init__(self, protocol_fee=PROTOCOL_FEE, validator_reward=VALIDATOR_REWARD, split=PROTOCOL_SPLIT,
+                 gas=GAS_PER_TASK):
+        self.protocol_fee = protocol_fee
+        self.validator_reward = validator_reward
+        self.split = tuple(split)
+        self.gas = gas
+
+    @property
+    def fee_rate(self):
+        """Percent of every task's value paid in fees, gas aside"""
+        return self.protocol_fee + self.validator_reward
+
+    def schedule(self):
+        """(component, percent, share of, purpose) rows of the fee schedule
+
+        share of names the component a row is part of, or is None.
+        """
+        rows = [("Protocol fee", self.protocol_fee, None, None)]
+        rows.extend((name, rate, "Protocol fee", purpose) for name, rate, purpose in self.split)
+        rows.append(("Validator rewards", self.validator_reward, None, VALIDATOR_PURPOSE))
+        return rows
+
+    def evaluate(self, values, protocol_fee=None, validator_reward=None, gas=None):
+        """The FeeBreakdown of task values (in SOL)
+
+        protocol_fee, validator_reward and gas override the model's own;
+        each may be an array broadcast against values.
+        """
+        import numpy as np
+
+        values, protocol_rate, validator_rate, gas = np.broadcast_arrays(
+            np.asarray(values, dtype=float),
+            np.asarray(self.protocol_fee if protocol_fee is None else protocol_fee, dtype=float) / 100,
+            np.asarray(self.validator_reward if validator_reward is None else validator_reward, dtype=float) / 100,
+            np.asarray(self.gas if gas is None else gas, dtype=float))
+        protocol = values * protocol_rate
+        validators = values * validator_rate
+        total = sum(rate for name, rate, purpose in self.split) or 1
+        split = dict((name, protocol * (rate / total)) for name, rate, purpose in self.split)
+        return FeeBreakdown(values, protocol, validators, gas, split)
+
+    def sensitivity(self, values, protocol_fees, validator_rewards=None):
+        """FeeBreakdown over the grid of every value by every parameter
+
+        The result's arrays are indexed [value, protocol_fee] or, with
+        validator_rewards, [value, protocol_fee, validator_reward].
+        """
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        protocol_fees = np.asarray(protocol_fees, dtype=float)
+        if validator_rewards is None:
+            return self.evaluate(values[:, None], protocol_fees[None, :])
+        validator_rewards = np.asarray(validator_rewards, dtype=float)
+        return self.evaluate(values[:, None, None], protocol_fees[None, :, None], validator_rewards[None, None, :])
+
+    def take_rate_curve(self, low, high, points=200):
+        """(values, take rates in percent) for task values from low to high SOL, log-spaced"""
+        import numpy as np
+
+        values = np.geomspace(low, high, points)
+        return values, self.evaluate(values).take_rate * 100
+
+
+FEES = FeeModel()
+
+
+def schedule_rows(model, value):
+    """The fee schedule applied to one task of value SOL, as table rows
+
+    Rows have an item, its rate in percent, its amount in SOL and its
+    purpose; shares of the protocol fee are marked with a leading '- '.
+    Network gas and what the robot operator receives close the list.
+    """
+    fees = model.evaluate(value)
+    amounts = dict(fees.split, **{"Protocol fee": fees.protocol, "Validator rewards": fees.validators})
+    rows = [{'item': name if share_of is None else '- ' + name, 'rate': rate, 'amount': float(amounts[name]),
+             'purpose': purpose}
+            for name, rate, share_of, purpose in model.schedule()]
+    rows.append({'item': "Network gas", 'amount': float(fees.gas),
+                 'purpose': "%d transactions of %g SOL" % (TRANSACTIONS_PER_TASK, GAS_PER_TRANSACTION)})
+    rows.append({'item': "Robot receives", 'rate': float(fees.robot / fees.value * 100), 'amount': float(fees.robot)})
+    return rows
+
+
+def take_rate_rows(model, values):
+    """Table rows of what tasks of each of values SOL pay: value, fees, gas, robot and take rate in percent"""
+    fees = model.evaluate(values)
+    return [{'value': float(value), 'fees': float(protocol + validators), 'gas': float(gas), 'robot': float(robot),
+             'take_rate': float(take_rate * 100)}
+            for value, protocol, validators, gas, robot, take_rate
+            in zip(fees.value, fees.protocol, fees.validators, fees.gas, fees.robot, fees.take_rate)]
+
+
+def sensitivity_rows(model, values, protocol_fees):
+    """Table rows of take rates in percent, one row per protocol fee
+
+    Each row has its protocol_fee and, keyed by each of values, the take
+    rate of a task of that value.
+    """
+    take_rates = model.sensitivity(values, protocol_fees).take_rate * 100
+    return [dict([('protocol_fee', float(fee))] + [(value, float(rate)) for value, rate in zip(values, column)])
+            for fee, column in zip(protocol_fees, take_rates.T)]
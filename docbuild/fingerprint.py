@@ -0,0 +1,160 @@
+"""Content fingerprints used to decide whether a section must be re-rendered
+
+A fingerprint is a hex sha256 over everything that can change the pages a
+section produces: its flowables, the styles they use, the document template
+and the page callbacks.  Flowables we do not know how to describe make the
+fingerprint None, which means "always re-render".
+
+Custom flowables opt in by defining a fingerprint() method that returns a
+string describing their content.  That only describes their data; the code
+that draws them is covered by fingerprint_sources(), a digest of the
+docbuild modules in RENDERING_MODULES, so editing one of them invalidates
+what it rendered without bumping FINGERPRINT_VERSION.
+"""
+
+import hashlib
+import inspect
+import os
+import types
+
+FINGERPRINT_VERSION = 1
+
+# docbuild modules whose code decides what the pages of a section look like
+RENDERING_MODULES = ('charts', 'drawings', 'flowables', 'forms', 'highlight', 'images', 'stream', 'tables', 'toc')
+
+_sources = {}
+
+
+def _digest(parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def fingerprint_style(style):
+    """Fingerprint a ParagraphStyle (or any reportlab PropertySet)"""
+    parts = [type(style).__name__]
+    for name in sorted(style.__dict__):
+        value = style.__dict__[name]
+        if name == 'parent':
+            value = getattr(value, 'name', None)
+        parts.append('%s=%r' % (name, value))
+    return _digest(parts)
+
+
+def fingerprint_stylesheet(styles):
+    """Fingerprint every style registered in a StyleSheet1"""
+    return _digest(['%s:%s' % (name, fingerprint_style(styles.byName[name]))
+                    for name in sorted(styles.byName)])
+
+
+def fingerprint_sources(modules=RENDERING_MODULES):
+    """Digest of the source files of the named docbuild modules, read once per version of the files"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.join(directory, name + '.py') for name in modules]
+    stats = tuple((path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+    digest = _sources.get(stats)
+    if digest is None:
+        parts = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                parts.append('%s:%s' % (os.path.basename(path), hashlib.sha256(f.read()).hexdigest()))
+        digest = _sources[stats] = _digest(parts)
+    return digest
+
+
+def _global_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _is_local(value, fn):
+    module = value.__module__ or ''
+    return module == fn.__module__ or module.split('.')[0] == __name__.split('.')[0]
+
+
+def fingerprint_callable(fn, _seen=None):
+    """Fingerprint a function by its source and the module globals it reads
+
+    Plain functions defined in the same module or in this package are
+    followed, so a page callback that delegates to a helper still changes
+    when the helper does.
+    """
+    if fn is None:
+        return 'None'
+    if _seen is None:
+        _seen = set()
+    _seen.add(fn)
+    try:
+        source = inspect.getsource(fn)
+    except (OSError, TypeError):
+        source = getattr(fn, '__qualname__', repr(fn))
+    parts = [source]
+    code = getattr(fn, '__code__', None)
+    if code is not None:
+        module_globals = fn.__globals__
+        for name in sorted(_global_names(code)):
+            if name not in module_globals:
+                continue
+            value = module_globals[name]
+            if isinstance(value, types.FunctionType):
+                if _is_local(value, fn) and value not in _seen:
+                    parts.append('%s:%s' % (name, fingerprint_callable(value, _seen)))
+            elif isinstance(value, (str, int, float, tuple)) or type(value).__name__ == 'Color':
+                parts.append('%s=%r' % (name, value))
+    return _digest(parts)
+
+
+def fingerprint_flowable(flowable, style_cache=None):
+    """Describe one flowable, or return None if it cannot be described"""
+    from reportlab.platypus import Paragraph, Spacer, PageBreak, CondPageBreak, KeepTogether
+
+    custom = getattr(flowable, 'fingerprint', None)
+    if custom is not None:
+        return '%s:%s' % (type(flowable).__name__, custom())
+    if isinstance(flowable, Paragraph):
+        style = flowable.style
+        if style_cache is None:
+            style_fp = fingerprint_style(style)
+        else:
+            style_fp = style_cache.get(id(style))
+            if style_fp is None:
+                style_fp = style_cache[id(style)] = fingerprint_style(style)
+        return 'Paragraph:%r:%r:%s' % (flowable.text, flowable.bulletText, style_fp)
+    if isinstance(flowable, Spacer):
+        return 'Spacer:%r:%r' % (flowable.width, flowable.height)
+    if isinstance(flowable, CondPageBreak):
+        return 'CondPageBreak:%r' % flowable.height
+    if isinstance(flowable, PageBreak):
+        return '%s:%r' % (type(flowable).__name__, flowable.nextTemplate)
+    if isinstance(flowable, KeepTogether):
+        inner = fingerprint_flowables(flowable._content, style_cache)
+        if inner is None:
+            return None
+        return 'KeepTogether:%r:%s' % (flowable._maxHeight, inner)
+    return None
+
+
+def fingerprint_flowables(flowables, style_cache=None):
+    """Fingerprint a list of flowables, or None if any is not describable"""
+    if style_cache is None:
+        style_cache = {}
+    parts = []
+    for flowable in flowables:
+        part = fingerprint_flowable(flowable, style_cache)
+        if part is None:
+            return None
+        parts.append(part)
+    return _digest(parts)
+
+
+def section_key(flowables_fp, *context):
+    """Combine a section's flowable fingerprint with its build context"""
+    if flowables_fp is None:
+        return None
+    return _digest([str(FINGERPRINT_VERSION), flowables_fp] + [str(c) for c in context])
@@ -0,0 +1,446 @@
+"""Custom flowables shared by the generator scripts
+
+These draw their content directly with canvas text operations instead of
+going through Paragraph markup, which keeps layout cheap for content that
+is line-oriented anyway.  Each defines fingerprint() so sections using them
+stay cacheable.
+"""
+
+import copy
+import re
+from bisect import bisect_right
+from xml.sax.saxutils import unescape
+
+from reportlab.lib.fonts import ps2tt, tt2ps
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus.flowables import Flowable
+
+from docbuild.fingerprint import fingerprint_style
+
+
+class LineBlock(Flowable):
+    """Base class for blocks of monospaced rows that split between rows
+
+    rows is a list of (content, style, continued) where continued marks a
+    row that carries on the previous one (no paragraph spacing before it).
+    Subclasses say how long a row's content is, how to cut it and how to
+    draw it; this class wraps over-wide rows by character, places rows and
+    splits.  Layout is computed once per width and a split only slices it,
+    so splitting a long block page by page stays linear.
+    """
+
+    def __init__(self):
+        Flowable.__init__(self)
+        self.rows = []
+        self._layout = None
+
+    def __repr__(self):
+        return '<%s %d rows>' % (type(self).__name__, len(self.rows))
+
+    def content_length(self, content):
+        raise NotImplementedError
+
+    def cut(self, content, start, end):
+        raise NotImplementedError
+
+    def draw_row(self, text, content, style, y):
+        """Add one row with its baseline at y to the text object"""
+        raise NotImplementedError
+
+    def draw_background(self):
+        pass
+
+    def set_font(self, text, style, fontName=None):
+        font = (fontName or style.fontName, style.fontSize, style.leading)
+        if font != self._font:
+            self._font = font
+            text.setFont(*font)
+
+    def set_color(self, text, color):
+        if color != self._color:
+            self._color = color
+            text.setFillColor(color)
+
+    def _fit(self, availWidth):
+        """self.rows with every row too wide for availWidth wrapped"""
+        rows = []
+        for content, style, continued in self.rows:
+            char = stringWidth('M', style.fontName, style.fontSize)
+            per_row = max(int((availWidth - style.leftIndent - style.rightIndent) // char), 1)
+            length = self.content_length(content)
+            if length <= per_row:
+                rows.append((content, style, continued))
+                continue
+            for i in range(0, length, per_row):
+                rows.append((self.cut(content, i, i + per_row), style, continued or i > 0))
+        return rows
+
+    @staticmethod
+    def _place(rows):
+        """Return the bottom of each row measured from the block's top
+
+        Rows are style.leading high, separated by the larger of the
+        previous row's spaceAfter and the next row's spaceBefore unless the
+        next row continues the previous one.
+        """
+        bottoms = []
+        top = 0
+        previous = None
+        for content, style, continued in rows:
+            if previous is not None and not continued:
+                top += max(previous.spaceAfter, style.spaceBefore)
+            top += style.leading
+            bottoms.append(top)
+            previous = style
+        return bottoms
+
+    def _part(self, availWidth, rows, bottoms, offset):
+        part = copy.copy(self)
+        # a fresh flowable as far as the doc template is concerned
+        part.__dict__.pop('_postponed', None)
+        part.rows = rows
+        part._layout = (availWidth, rows, bottoms, offset)
+        return part
+
+    def wrap(self, availWidth, availHeight):
+        if self._layout is None or self._layout[0] != availWidth:
+            rows = self._fit(availWidth)
+            self._layout = (availWidth, rows, self._place(rows), 0)
+        availWidth, rows, bottoms, offset = self._layout
+        self.width = availWidth
+        self.height = bottoms[-1] - offset if rows else 0
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.rows[0][1].spaceBefore if self.rows else 0
+
+    def getSpaceAfter(self):
+        return self.rows[-1][1].spaceAfter if self.rows else 0
+
+    def split(self, availWidth, availHeight):
+        self.wrap(availWidth, availHeight)
+        availWidth, rows, bottoms, offset = self._layout
+        if self.height <= availHeight:
+            return [self]
+        fits = bisect_right(bottoms, offset + availHeight)
+        if fits == 0:
+            return []
+        content, style, continued = rows[fits]
+        rest = rows[fits:]
+        rest[0] = (content, style, False)
+        return [self._part(availWidth, rows[:fits], bottoms[:fits], offset),
+                self._part(availWidth, rest, bottoms[fits:], bottoms[fits] - style.leading)]
+
+    def draw(self):
+        availWidth, rows, bottoms, offset = self._layout
+        self.draw_background()
+        text = self.canv.beginText()
+        self._font = self._color = None
+        for (content, style, continued), bottom in zip(rows, bottoms):
+            # same baseline as a Paragraph line: fontSize below the row's top
+            self.draw_row(text, content, style, self.height - (bottom - offset) + style.leading - style.fontSize)
+        self.canv.drawText(text)
+
+
+class TerminalBlock(LineBlock):
+    """A terminal session drawn as monospaced lines
+
+    lines are plain text (no markup) and keep their leading whitespace.
+    Lines starting with '#' use comment_style, lines starting with '$' use
+    prompt_style and all others style; each falls back to style.  Line
+    pitch follows the styles exactly as a run of one-line Paragraphs would.
+    """
+
+    def __init__(self, lines, style, comment_style=None, prompt_style=None):
+        LineBlock.__init__(self)
+        self.style = style
+        self.comment_style = comment_style or style
+        self.prompt_style = prompt_style or style
+        self.rows = [(line, self.line_style(line), False) for line in lines]
+
+    def fingerprint(self):
+        styles = {}
+        for text, style, continued in self.rows:
+            if style.name not in styles:
+                styles[style.name] = fingerprint_style(style)
+        return '%r:%r' % ([(text, style.name, continued) for text, style, continued in self.rows],
+                          sorted(styles.items()))
+
+    def line_style(self, line):
+        if line.startswith('#'):
+            return self.comment_style
+        if line.startswith('$'):
+            return self.prompt_style
+        return self.style
+
+    def content_length(self, content):
+        return len(content)
+
+    def cut(self, content, start, end):
+        return content[start:end]
+
+    def draw_row(self, text, content, style, y):
+        text.setTextOrigin(style.leftIndent, y)
+        self.set_font(text, style)
+        self.set_color(text, style.textColor)
+        text.textOut(content)
+
+
+class CodeBlock(LineBlock):
+    """A syntax-highlighted source listing
+
+    code is tokenized for language by docbuild.highlight (tokens are cached
+    by content hash) and drawn one row per source line, indentation kept,
+    in style's font.  palette maps token kinds to colours; kinds it does
+    not name use style.textColor.  style.backColor, if set, fills the
+    block between leftIndent and rightIndent, as it does for a Paragraph.
+    """
+
+    def __init__(self, code, language, style, palette=None):
+        from docbuild.highlight import tokenize
+
+        LineBlock.__init__(self)
+        self.code = code
+        self.language = language
+        self.style = style
+        self.palette = palette or {}
+        lines = tokenize(code, language)
+        while lines and not lines[-1]:
+            lines = lines[:-1]
+        self.rows = [(tokens, style, index > 0) for index, tokens in enumerate(lines)]
+
+    def fingerprint(self):
+        return '%r:%r:%s:%r' % (self.code, self.language, fingerprint_style(self.style),
+                                sorted((kind, str(color)) for kind, color in self.palette.items()))
+
+    def content_length(self, content):
+        return sum(len(value) for kind, value in content)
+
+    def cut(self, content, start, end):
+        tokens = []
+        position = 0
+        for kind, value in content:
+            low, high = max(start - position, 0), min(end - position, len(value))
+            if low < high:
+                tokens.append((kind, value[low:high]))
+            position += len(value)
+        return tokens
+
+    def draw_background(self):
+        style = self.style
+        if style.backColor is not None:
+            self.canv.saveState()
+            self.canv.setFillColor(style.backColor)
+            self.canv.rect(style.leftIndent, 0, self.width - style.leftIndent - style.rightIndent,
+                           self.height, stroke=0, fill=1)
+            self.canv.restoreState()
+
+    def draw_row(self, text, content, style, y):
+        text.setTextOrigin(style.leftIndent, y)
+        self.set_font(text, style)
+        for kind, value in content:
+            self.set_color(text, self.palette.get(kind, style.textColor))
+            text.textOut(value)
+
+
+_INLINE_TAG = re.compile(r'<(/?)(b|i|strong|em)>|<[^>]*>')
+_WORDS = re.compile(r'\S+|\s+')
+
+
+def inline_fragments(markup, fontName):
+    """Split Paragraph-style markup into (fontName, text) fragments
+
+    Only <b>/<strong>, <i>/<em> and XML entities are understood; anything
+    else raises ValueError, since that content needs a real Paragraph.
+    """
+    family, bold, italic = ps2tt(fontName)
+    fragments = []
+    position = 0
+    for match in _INLINE_TAG.finditer(markup):
+        if match.group(2) is None:
+            raise ValueError("unsupported markup %r in list item %r" % (match.group(), markup))
+        if match.start() > position:
+            fragments.append((tt2ps(family, bold, italic), unescape(markup[position:match.start()])))
+        on = not match.group(1)
+        if match.group(2) in ('b', 'strong'):
+            bold = int(on)
+        else:
+            italic = int(on)
+        position = match.end()
+    if position < len(markup):
+        fragments.append((tt2ps(family, bold, italic), unescape(markup[position:])))
+    return fragments
+
+
+def break_lines(fragments, fontSize, width):
+    """Greedily break (fontName, text) fragments into lines no wider than width
+
+    Whitespace collapses to single spaces as in a Paragraph; a word wider
+    than width gets a line to itself.  Returns a list of lines, each a list
+    of (fontName, text) pieces.
+    """
+    lines = [[]]
+    used = 0
+    space = None
+    for fontName, text in fragments:
+        for word in _WORDS.findall(text):
+            if word.isspace():
+                if lines[-1]:
+                    space = fontName
+                continue
+            word_width = stringWidth(word, fontName, fontSize)
+            gap = stringWidth(' ', space, fontSize) if space else 0
+            if lines[-1] and used + gap + word_width > width:
+                lines.append([])
+                used = gap = 0
+                space = None
+            line = lines[-1]
+            if space:
+                line.append((space, ' '))
+                space = None
+            line.append((fontName, word))
+            used += gap + word_width
+    merged = []
+    for line in lines:
+        pieces = []
+        for fontName, text in line:
+            if pieces and pieces[-1][0] == fontName:
+                pieces[-1] = (fontName, pieces[-1][1] + text)
+            else:
+                pieces.append((fontName, text))
+        merged.append(pieces)
+    return merged
+
+
+class ListBlock(LineBlock):
+    """A bulleted or numbered list laid out as one flowable
+
+    items use Paragraph markup limited to <b>, <i> and entities.  Every
+    item is drawn in style with the bullet (or its number followed by '.')
+    at style.leftIndent and the text after the widest marker, so wrapped
+    lines hang under the text.  Items are separated like consecutive
+    Paragraphs in style; the block splits between lines.
+    """
+
+    def __init__(self, items, style, bullet='\u2022', numbered=False, start=1):
+        LineBlock.__init__(self)
+        self.items = list(items)
+        self.style = style
+        self.bullet = bullet
+        self.numbered = numbered
+        self.start = start
+        markers = [self.marker(index) for index in range(len(self.items))]
+        self.marker_width = max([stringWidth(marker + ' ', style.fontName, style.fontSize)
+                                 for marker in markers] or [0])
+        self.rows = [((marker, inline_fragments(item, style.fontName)), style, False)
+                     for marker, item in zip(markers, self.items)]
+
+    def fingerprint(self):
+        return '%r:%s:%r:%r:%r' % (self.items, fingerprint_style(self.style),
+                                   self.bullet, self.numbered, self.start)
+
+    def marker(self, index):
+        if self.numbered:
+            return '%d.' % (self.start + index)
+        return self.bullet
+
+    def _fit(self, availWidth):
+        """Word-wrap every row to the width left after the markers"""
+        style = self.style
+        width = availWidth - style.leftIndent - style.rightIndent - self.marker_width
+        rows = []
+        for (marker, fragments), style, continued in self.rows:
+            for index, pieces in enumerate(break_lines(fragments, style.fontSize, width)):
+                rows.append(((marker if index == 0 else '', pieces), style, continued or index > 0))
+        return rows
+
+    def draw_row(self, text, content, style, y):
+        marker, pieces = content
+        self.set_color(text, style.textColor)
+        if marker:
+            text.setTextOrigin(style.leftIndent, y)
+            self.set_font(text, style)
+            text.textOut(marker)
+        text.setTextOrigin(style.leftIndent + self.marker_width, y)
+        for fontName, value in pieces:
+            self.set_font(text, style, fontName)
+            text.textOut(value)
+
+
+class Contents(LineBlock):
+    """A table of contents: section titles, dot leaders and page numbers
+
+    entries are section titles, exactly as in the DocumentSpec, or (title,
+    style) pairs for entries drawn in another style than style.  Page
+    numbers come from the build (see docbuild.toc): drawn as text when the
+    build knows them up front, as forms filled in on save in a single-pass
+    build.  The number column always has room for four digits, so the
+    layout is the same either way.
+    """
+
+    def __init__(self, entries, style, leader='.'):
+        from docbuild.toc import lookup
+
+        LineBlock.__init__(self)
+        self.entries = [entry if isinstance(entry, tuple) else (entry, style) for entry in entries]
+        self.style = style
+        self.leader = leader
+        titles = [title for title, entry_style in self.entries]
+        self.pages = lookup(titles)
+        self.number_width = max([stringWidth(' 0000', entry_style.fontName, entry_style.fontSize)
+                                 for title, entry_style in self.entries] or [0])
+        self.rows = [((title, title, page), entry_style, False)
+                     for (title, entry_style), page in zip(self.entries, self.pages or [None] * len(titles))]
+
+    def fingerprint(self):
+        styles = {}
+        for title, style in self.entries:
+            if style.name not in styles:
+                styles[style.name] = fingerprint_style(style)
+        return '%r:%r:%r:%r' % ([(title, style.name) for title, style in self.entries], self.pages,
+                                self.leader, sorted(styles.items()))
+
+    def content_length(self, content):
+        return len(content[0])
+
+    def cut(self, content, start, end):
+        label, title, page = content
+        if end < len(label):
+            # only the last line of a wrapped title carries the number
+            return label[start:end], None, None
+        return label[start:end], title, page
+
+    def _fit(self, availWidth):
+        return LineBlock._fit(self, availWidth - self.number_width)
+
+    def draw(self):
+        self._forms = []
+        LineBlock.draw(self)
+        for name, x, y in self._forms:
+            self.canv.saveState()
+            self.canv.translate(x, y)
+            self.canv.doForm(name)
+            self.canv.restoreState()
+
+    def draw_row(self, text, content, style, y):
+        label, title, page = content
+        self.set_font(text, style)
+        self.set_color(text, style.textColor)
+        text.setTextOrigin(style.leftIndent, y)
+        text.textOut(label)
+        if title is None:
+            return
+        right = self.width - style.rightIndent
+        if self.leader:
+            start = style.leftIndent + stringWidth(label + ' ', style.fontName, style.fontSize)
+            dot = stringWidth(self.leader, style.fontName, style.fontSize)
+            dots = int((right - self.number_width - start) // dot)
+            if dots > 0:
+                text.setTextOrigin(right - self.number_width - dots * dot, y)
+                text.textOut(self.leader * dots)
+        if page is not None:
+            number = str(page)
+            text.setTextOrigin(right - stringWidth(number, style.fontName, style.fontSize), y)
+            text.textOut(number)
+        elif self.pages is None and hasattr(self.canv, 'page_form'):
+            self._forms.append((self.canv.page_form(title, style), right, y))
@@ -0,0 +1,37 @@
+"""Reusable PDF form XObjects for static page artwork"""
+
+
+def _add_form_resources(canvas, name):
+    """Give a finished form its own ExtGState resources
+
+    reportlab records the transparency states a form uses but only writes
+    fonts and procsets into the form's resource dictionary, so `gs`
+    operators inside the form would point at nothing.  Build the resource
+    dictionary the way reportlab does for pages instead.
+    """
+    from reportlab.pdfbase.pdfdoc import PDFResourceDictionary
+
+    form = canvas._doc.idToObject[canvas._doc.getXObjectName(name)]
+    if not form.ExtGState or form.Resources:
+        return
+    resources = PDFResourceDictionary()
+    resources.basicFonts()
+    resources.basicProcs()
+    resources.ExtGState = form.ExtGState
+    form.Resources = resources
+
+
+def draw_form(canvas, name, draw):
+    """Draw the static artwork produced by draw(canvas) through a form XObject
+
+    The first call on a canvas records draw(canvas) as the form name; every
+    call then places the form with a single Do operator.  The artwork is
+    therefore stored once per document instead of once per page.  draw
+    must only depend on the canvas, not on the page being drawn.
+    """
+    if not canvas.hasForm(name):
+        canvas.beginForm(name)
+        draw(canvas)
+        canvas.endForm()
+        _add_form_resources(canvas, name)
+    canvas.doForm(name)
@@ -0,0 +1,113 @@
+"""Small regex tokenizers for the code snippets in the docs
+
+tokenize(code, language) returns the code as a list of lines, each a list
+of (kind, text) tokens whose texts concatenate back to the line.  Kinds
+are 'comment', 'string', 'keyword', 'number', 'variable', 'flag',
+'prompt', 'section', 'key' and 'plain'.  Languages are the `language`
+values used in Docs.jsx (javascript, bash, toml, text) plus a few aliases;
+unknown languages are treated as text.
+
+Results are memoized by a hash of (language, code), so a snippet that
+appears in several documents or builds in one process is tokenized once.
+"""
+
+import hashlib
+import re
+
+_JS_KEYWORDS = (
+    'async await break case catch class const continue default delete do else export extends false '
+    'finally for from function if import in instanceof let new null of return static switch this throw '
+    'true try typeof undefined var void while yield'
+)
+
+_LANGUAGES = {
+    'javascript': [
+        ('comment', r'//[^\n]*|/\*.*?\*/'),
+        ('string', r"'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"|`(?:\\.|[^`\\])*`"),
+        ('keyword', r'\b(?:%s)\b' % '|'.join(_JS_KEYWORDS.split())),
+        ('number', r'\b\d[\d_]*(?:\.\d+)?\b'),
+    ],
+    'bash': [
+        ('prompt', r'^\$(?= |$)'),
+        ('comment', r'(?:^|(?<=\s))#[^\n]*'),
+        ('string', r"'[^'\n]*'|\"(?:\\.|[^\"\\\n])*\""),
+        ('variable', r'\$\{[^}\n]*\}|\$\w+'),
+        ('flag', r'(?:^|(?<=\s))--?[A-Za-z][\w-]*'),
+        ('keyword', r'\b(?:sudo|export|cd|if|then|else|fi|for|do|done|echo)\b'),
+    ],
+    'toml': [
+        ('comment', r'#[^\n]*'),
+        ('section', r'^[ \t]*\[\[?[^\]\n]+\]\]?'),
+        ('key', r'^[ \t]*[\w.-]+(?=[ \t]*=)|(?<=[{,])[ \t]*[\w.-]+(?=[ \t]*=)'),
+        ('string', r"'''.*?'''|\"\"\".*?\"\"\"|'[^'\n]*'|\"(?:\\.|[^\"\\\n])*\""),
+        ('keyword', r'\b(?:true|false)\b'),
+        ('number', r'\b\d[\d_]*(?:\.\d+)?\b'),
+    ],
+    'text': [],
+}
+
+_ALIASES = {'js': 'javascript', 'jsx': 'javascript', 'sh': 'bash', 'shell': 'bash', 'console': 'bash'}
+
+_patterns = {}
+_cache = {}
+
+
+def _pattern(language):
+    pattern = _patterns.get(language)
+    if pattern is None:
+        rules = _LANGUAGES[language]
+        if rules:
+            pattern = re.compile('|'.join('(?P<%s>%s)' % rule for rule in rules), re.M | re.S)
+        _patterns[language] = pattern
+    return pattern
+
+
+def language_name(language):
+    """Canonical tokenizer name for a Docs.jsx language value"""
+    language = (language or 'text').lower()
+    language = _ALIASES.get(language, language)
+    return language if language in _LANGUAGES else 'text'
+
+
+def _tokens(code, language):
+    """Flat (kind, text) tokens covering all of code"""
+    pattern = _pattern(language)
+    if pattern is None:
+        return [('plain', code)]
+    tokens = []
+    position = 0
+    for match in pattern.finditer(code):
+        if match.start() > position:
+            tokens.append(('plain', code[position:match.start()]))
+        tokens.append((match.lastgroup, match.group()))
+        position = match.end()
+    if position < len(code):
+        tokens.append(('plain', code[position:]))
+    return tokens
+
+
+def _lines(tokens):
+    lines = [[]]
+    for kind, text in tokens:
+        parts = text.split('\n')
+        for index, part in enumerate(parts):
+            if index:
+                lines.append([])
+            if part:
+                lines[-1].append((kind, part))
+    return lines
+
+
+def tokenize(code, language):
+    """Return code as lines of (kind, text) tokens, memoized by content hash"""
+    language = language_name(language)
+    key = hashlib.sha256(('%s\0%s' % (language, code)).encode('utf-8')).hexdigest()
+    lines = _cache.get(key)
+    if lines is None:
+        lines = _cache[key] = _lines(_tokens(code.expandtabs(4), language))
+    return lines
+
+
+def cache_info():
+    """Number of distinct snippets tokenized in this process"""
+    return len(_cache)
@@ -0,0 +1,210 @@
+"""Raster images resampled for print, cached by content and embedded once
+
+prepare() turns a source image into the image placed on the page: its
+pixels are resampled to PRINT_DPI at the size it is placed at (an image
+with fewer pixels than that keeps them) and encoded again: as JPEG when it
+is opaque, which reportlab embeds without decoding, and otherwise as a
+palette PNG of PALETTE_COLORS colors, alpha included.  reportlab decodes a
+PNG and embeds its pixels again, and the fewer distinct colors they have,
+the smaller that stream.  An image that needs no resampling and would not
+get smaller is kept as it is, so a prepared file is never larger than its
+source at the same size.  The result is kept as a file in IMAGE_DIR named
+after a hash of the source's bytes and the placement, so later builds and
+other workers reuse it instead of resampling again.
+
+reportlab stores an image drawn from a file once per document however
+often it is drawn, and prepared files are named by content, so each
+distinct image is embedded once (assemble_pdf() folds together the copies
+of separately rendered sections).
+"""
+
+import hashlib
+import os
+import shutil
+
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus.flowables import Flowable
+
+from docbuild.content import DEFAULT_CACHE_DIR
+from docbuild.fingerprint import fingerprint_style
+
+IMAGE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'images')
+PRINT_DPI = 300
+JPEG_QUALITY = 88
+PALETTE_COLORS = 256
+STORE_VERSION = 2
+
+_sources = {}
+
+
+def _source(path):
+    """(sha1 of the bytes, pixel size) of the image at path, read once per version of the file"""
+    from PIL import Image
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    source = _sources.get(key)
+    if source is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        with Image.open(path) as image:
+            source = _sources[key] = (digest, image.size)
+    return source
+
+
+def image_size(path):
+    """The size of the image at path in pixels"""
+    return _source(path)[1]
+
+
+def print_size(path, width, height, dpi=PRINT_DPI):
+    """Pixels of the image at path placed width x height points at dpi, never more than it has"""
+    pixels = image_size(path)
+    scale = min(1.0, width * dpi / inch / pixels[0], height * dpi / inch / pixels[1])
+    return max(1, round(pixels[0] * scale)), max(1, round(pixels[1] * scale))
+
+
+def _transparent(image):
+    return image.mode in ('RGBA', 'LA', 'PA') and image.getchannel('A').getextrema()[0] < 255 \
+        or image.mode == 'P' and 'transparency' in image.info
+
+
+def _palette(image):
+    """image (RGBA) with PALETTE_COLORS colors, alpha included, as a palette image
+
+    Each palette entry takes the mean color and alpha of the pixels mapped
+    to it, so opaque and clear areas stay exactly opaque and clear.
+    """
+    import numpy as np
+    from PIL import Image
+
+    quantized = image.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+    index = np.asarray(quantized).ravel()
+    pixels = np.asarray(image).reshape(-1, 4)
+    counts = np.maximum(np.bincount(index, minlength=256), 1)
+    means = np.rint(np.stack([np.bincount(index, pixels[:, channel], minlength=256) / counts
+                              for channel in range(4)], 1)).astype(np.uint8)
+    quantized.putpalette(means[:, :3].tobytes())
+    quantized.info['transparency'] = means[:, 3].tobytes()
+    return quantized
+
+
+def prepare(path, width, height, dpi=PRINT_DPI, directory=IMAGE_DIR):
+    """Path of the image at path resampled for a width x height point placement"""
+    from PIL import Image
+
+    size = print_size(path, width, height, dpi)
+    key = hashlib.sha1(('%d:%s:%dx%d:%d:%d' % (STORE_VERSION, _source(path)[0], size[0], size[1], JPEG_QUALITY,
+                                               PALETTE_COLORS)).encode('utf-8')).hexdigest()
+    for ext in ('.png', '.jpg'):
+        prepared = os.path.join(directory, key + ext)
+        if os.path.exists(prepared):
+            return prepared
+    with Image.open(path) as image:
+        image.load()
+        transparent = _transparent(image)
+        resampled = image.size != size
+        image = image.convert('RGBA' if transparent else 'RGB')
+        if resampled:
+            image = image.resize(size, Image.LANCZOS)
+        if transparent:
+            image = _palette(image)
+            ext, options = '.png', {'optimize': True}
+        else:
+            ext, options = '.jpg', {'quality': JPEG_QUALITY, 'optimize': True}
+        os.makedirs(directory, exist_ok=True)
+        prepared = os.path.join(directory, key + ext)
+        temporary = '%s.%d.tmp' % (prepared, os.getpid())
+        image.save(temporary, 'PNG' if ext == '.png' else 'JPEG', **options)
+    if not resampled and os.path.splitext(path)[1].lower() == ext \
+            and os.path.getsize(temporary) >= os.path.getsize(path):
+        shutil.copyfile(path, temporary)
+    os.replace(temporary, prepared)
+    return prepared
+
+
+class Picture(Flowable):
+    """An image from a file, width points wide (and height high, by default
+    in the image's proportions), prepared for print by prepare()"""
+
+    def __init__(self, path, width, height=None, dpi=PRINT_DPI, hAlign='CENTER'):
+        Flowable.__init__(self)
+        self.path = path
+        self.width = width
+        if height is None:
+            pixels = image_size(path)
+            height = width * pixels[1] / pixels[0]
+        self.height = height
+        self.dpi = dpi
+        self.hAlign = hAlign
+
+    def __repr__(self):
+        return '<Picture %s %gx%g>' % (os.path.basename(self.path), self.width, self.height)
+
+    def fingerprint(self):
+        return '%s:%r:%r:%r' % (_source(self.path)[0], self.width, self.height, self.dpi)
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(prepare(self.path, self.width, self.height, self.dpi), 0, 0,
+                            self.width, self.height, mask='auto')
+
+
+class Gallery(Flowable):
+    """A row of captioned images, each fitted into an equal share of width
+    and image_height points high
+
+    entries are (path, caption) pairs; captions are set in style's font
+    and color and are translatable like chart texts.
+    """
+
+    def __init__(self, entries, style, width, image_height, gap=12, dpi=PRINT_DPI):
+        Flowable.__init__(self)
+        self.entries = list(entries)
+        self.style = style
+        self.width = width
+        self.image_height = image_height
+        self.gap = gap
+        self.dpi = dpi
+        self.height = image_height + gap / 2 + style.leading
+
+    def __repr__(self):
+        return '<Gallery %d images>' % len(self.entries)
+
+    def fingerprint(self):
+        return '%r:%s:%r:%r:%r:%r' % ([(_source(path)[0], caption) for path, caption in self.entries],
+                                      fingerprint_style(self.style), self.width, self.image_height, self.gap,
+                                      self.dpi)
+
+    def texts(self):
+        return [caption for path, caption in self.entries if caption]
+
+    def translated(self, messages):
+        return Gallery([(path, messages.get(caption, caption)) for path, caption in self.entries], self.style,
+                       self.width, self.image_height, self.gap, self.dpi)
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canv, style = self.canv, self.style
+        cell = (self.width - self.gap * (len(self.entries) - 1)) / max(len(self.entries), 1)
+        canv.saveState()
+        canv.setFillColor(style.textColor)
+        for index, (path, caption) in enumerate(self.entries):
+            pixels = image_size(path)
+            scale = min(cell / pixels[0], self.image_height / pixels[1])
+            width, height = pixels[0] * scale, pixels[1] * scale
+            left = index * (cell + self.gap)
+            canv.drawImage(prepare(path, width, height, self.dpi), left + (cell - width) / 2,
+                           self.height - (self.image_height + height) / 2, width, height, mask='auto')
+            if caption:
+                size = style.fontSize
+                while size > 6 and stringWidth(caption, style.fontName, size) > cell:
+                    size -= 0.5
+                canv.setFont(style.fontName, size)
+                canv.drawCentredString(left + cell / 2, style.leading - style.fontSize, caption)
+        canv.restoreState()
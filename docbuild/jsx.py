@@ -0,0 +1,236 @@
+"""Read JavaScript object literals out of the site's JSX sources
+
+The website keeps its documentation content in plain object literals (for
+example `const libraryDocs = {...}` in src/pages/Docs.jsx).  This module
+parses such literals into Python values without needing Node: objects,
+arrays, single/double quoted strings, template literals, numbers, booleans
+and null, with comments and trailing commas allowed.
+
+Template literal interpolations (`${...}`) are kept verbatim; the content we
+read only uses them inside code samples, where the raw text is what we want
+to show.
+"""
+
+import re
+
+
+class JSXParseError(ValueError):
+    """Raised when a literal cannot be parsed"""
+
+    def __init__(self, message, source, pos):
+        line = source.count('\n', 0, pos) + 1
+        col = pos - (source.rfind('\n', 0, pos) + 1) + 1
+        ValueError.__init__(self, "%s at line %d, column %d" % (message, line, col))
+        self.line = line
+        self.column = col
+
+
+_IDENT = re.compile(r'[A-Za-z_$][A-Za-z0-9_$]*')
+_NUMBER = re.compile(r'-?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_SIMPLE_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0',
+}
+_KEYWORDS = {'true': True, 'false': False, 'null': None}
+
+
+class _Parser(object):
+
+    def __init__(self, source, pos):
+        self.source = source
+        self.pos = pos
+
+    def error(self, message):
+        raise JSXParseError(message, self.source, self.pos)
+
+    def skip(self):
+        """Skip whitespace and comments"""
+        source = self.source
+        while self.pos < len(source):
+            ch = source[self.pos]
+            if ch.isspace():
+                self.pos += 1
+            elif source.startswith('//', self.pos):
+                end = source.find('\n', self.pos)
+                self.pos = len(source) if end < 0 else end + 1
+            elif source.startswith('/*', self.pos):
+                end = source.find('*/', self.pos + 2)
+                if end < 0:
+                    self.error("Unterminated comment")
+                self.pos = end + 2
+            else:
+                break
+
+    def peek(self):
+        self.skip()
+        if self.pos >= len(self.source):
+            self.error("Unexpected end of input")
+        return self.source[self.pos]
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            self.error("Expected %r" % ch)
+        self.pos += 1
+
+    def value(self):
+        ch = self.peek()
+        if ch == '{':
+            return self.object()
+        if ch == '[':
+            return self.array()
+        if ch in '\'"':
+            return self.string(ch)
+        if ch == '`':
+            return self.template()
+        match = _NUMBER.match(self.source, self.pos)
+        if match:
+            self.pos = match.end()
+            text = match.group()
+            if text.lower().startswith(('0x', '-0x')):
+                return int(text, 16)
+            number = float(text)
+            return int(number) if number.is_integer() and not re.search(r'[.eE]', text) else number
+        match = _IDENT.match(self.source, self.pos)
+        if match and match.group() in _KEYWORDS:
+            self.pos = match.end()
+            return _KEYWORDS[match.group()]
+        self.error("Unsupported value")
+
+    def key(self):
+        ch = self.peek()
+        if ch in '\'"':
+            return self.string(ch)
+        match = _IDENT.match(self.source, self.pos) or _NUMBER.match(self.source, self.pos)
+        if not match:
+            self.error("Expected property name")
+        self.pos = match.end()
+        return match.group()
+
+    def object(self):
+        self.expect('{')
+        result = {}
+        while self.peek() != '}':
+            name = self.key()
+            self.expect(':')
+            result[name] = self.value()
+            if self.peek() == ',':
+                self.pos += 1
+            elif self.peek() != '}':
+                self.error("Expected ',' or '}'")
+        self.pos += 1
+        return result
+
+    def array(self):
+        self.expect('[')
+        result = []
+        while self.peek() != ']':
+            result.append(self.value())
+            if self.peek() == ',':
+                self.pos += 1
+            elif self.peek() != ']':
+                self.error("Expected ',' or ']'")
+        self.pos += 1
+        return result
+
+    def escape(self):
+        """Decode the escape sequence after a backslash at self.pos"""
+        source = self.source
+        ch = source[self.pos]
+        if ch in _SIMPLE_ESCAPES:
+            self.pos += 1
+            return _SIMPLE_ESCAPES[ch]
+        if ch == 'x':
+            code = source[self.pos + 1:self.pos + 3]
+            self.pos += 3
+            return chr(int(code, 16))
+        if ch == 'u':
+            if source[self.pos + 1] == '{':
+                end = source.index('}', self.pos)
+                code = source[self.pos + 2:end]
+                self.pos = end + 1
+            else:
+                code = source[self.pos + 1:self.pos + 5]
+                self.pos += 5
+            return chr(int(code, 16))
+        if ch == '\r' and source.startswith('\r\n', self.pos):
+            self.pos += 2
+            return ''
+        self.pos += 1
+        if ch in '\n  ':
+            return ''
+        return ch
+
+    def string(self, quote):
+        source = self.source
+        self.pos += 1
+        out = []
+        while True:
+            if self.pos >= len(source):
+                self.error("Unterminated string")
+            ch = source[self.pos]
+            if ch == quote:
+                self.pos += 1
+                return ''.join(out)
+            if ch == '\n':
+                self.error("Newline in string")
+            self.pos += 1
+            out.append(self.escape() if ch == '\\' else ch)
+
+    def template(self):
+        source = self.source
+        self.pos += 1
+        out = []
+        while True:
+            if self.pos >= len(source):
+                self.error("Unterminated template literal")
+            ch = source[self.pos]
+            if ch == '`':
+                self.pos += 1
+                return ''.join(out)
+            if ch == '\\':
+                self.pos += 1
+                out.append(self.escape())
+            elif source.startswith('${', self.pos):
+                out.append(self.interpolation())
+            else:
+                out.append(ch)
+                self.pos += 1
+
+    def interpolation(self):
+        """Return the raw text of a ${...} expression"""
+        source = self.source
+        start = self.pos
+        depth = 0
+        while self.pos < len(source):
+            ch = source[self.pos]
+            if ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    self.pos += 1
+                    return source[start:self.pos]
+            elif ch in '\'"`':
+                # skip nested string literals so their braces do not count
+                if ch == '`':
+                    self.template()
+                else:
+                    self.string(ch)
+                continue
+            self.pos += 1
+        self.error("Unterminated template interpolation")
+
+
+def parse_literal(source, pos=0):
+    """Parse the literal starting at pos; return (value, end position)"""
+    parser = _Parser(source, pos)
+    value = parser.value()
+    return value, parser.pos
+
+
+def extract_const(source, name):
+    """Return the value of `const <name> = <literal>` in source"""
+    match = re.search(r'\b(?:const|let|var)\s+%s\s*=\s*' % re.escape(name), source)
+    if not match:
+        raise KeyError("No declaration of %r found" % name)
+    value, end = parse_literal(source, match.end())
+    return value
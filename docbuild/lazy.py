@@ -0,0 +1,93 @@
+"""Deferred imports for the generator scripts
+
+The generators use reportlab names (Paragraph, ParagraphStyle, letter, ...)
+throughout, but only rendering needs them; listing sections or checking
+paths should not pay for importing reportlab.  lazy_import() binds every
+name of a group to a placeholder.  The first time any placeholder is
+called, indexed or has an attribute read, the whole group is imported
+and the real objects replace the placeholders in the module's globals,
+so every later use is an ordinary global lookup.
+
+Merely passing a placeholder along (pagesize=letter) does not count as a
+use, and placeholders do no arithmetic, so a number used in expressions
+(inch) is better a plain constant than a lazy name.  The generators' create_styles(), which every build calls before
+anything else, uses several names and so always imports the group first.
+"""
+
+import importlib
+import time
+
+_groups = []
+
+
+class LazyImports(object):
+    """A group of `from module import names` bound on first use"""
+
+    def __init__(self, namespace, imports):
+        self.namespace = namespace
+        self.imports = [(module, names.split()) for module, names in imports]
+        self.seconds = None
+        for module, names in self.imports:
+            for name in names:
+                namespace[name] = _Placeholder(self, name)
+
+    @property
+    def loaded(self):
+        return self.seconds is not None
+
+    def load(self):
+        """Import the group now (if it is not already) and bind the real names"""
+        if self.seconds is None:
+            start = time.perf_counter()
+            values = {}
+            for module, names in self.imports:
+                imported = importlib.import_module(module)
+                for name in names:
+                    values[name] = getattr(imported, name)
+            self.namespace.update(values)
+            self.seconds = time.perf_counter() - start
+        return self
+
+
+class _Placeholder(object):
+    __slots__ = ('_group', '_name')
+
+    def __init__(self, group, name):
+        self._group = group
+        self._name = name
+
+    def _resolve(self):
+        return self._group.load().namespace[self._name]
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, key):
+        return self._resolve()[key]
+
+    def __repr__(self):
+        return '<lazy %s>' % self._name
+
+
+def lazy_import(namespace, imports):
+    """Bind each (module, 'name name ...') of imports in namespace lazily
+
+    Returns the LazyImports group, whose load() imports it on demand.
+    """
+    group = LazyImports(namespace, imports)
+    _groups.append(group)
+    return group
+
+
+def load_all():
+    """Import every group not imported yet"""
+    for group in _groups:
+        group.load()
+
+
+def import_seconds():
+    """Total time spent importing lazy groups so far"""
+    return sum(group.seconds for group in _groups if group.seconds is not None)
@@ -0,0 +1,316 @@
+"""Opt-in memory accounting of builds with tracemalloc
+
+With a MemoryProfiler installed, the memory Python allocates during a
+build is accounted to the section being built and, while a flowable is
+added to or split in a frame, to the flowable's type.  Each gets its peak,
+the most allocated at once above what was in use when it started, and
+what it retained, the allocations it left behind (pages waiting to be
+written, caches).  Flowables nested in another one (the contents of a
+KeepTogether, say) count towards the outer flowable's type.
+
+The layout engine reads the story ahead, so in a single-pass build a
+section is mostly built while the one before it is still being laid out;
+accounted_spec() accounts the building to the section built rather than
+to the one being laid out.
+
+With a budget, the build is aborted with MemoryBudgetExceeded as soon as
+the memory traced exceeds it, at the next flowable or section boundary.
+
+Sections are accounted in the process that builds them, so while a
+profiler is installed build_sections() renders every section here instead
+of in a process pool.  Nothing is patched, nothing traced and
+tracemalloc not even imported unless install() is called.
+"""
+
+import sys
+from contextlib import contextmanager, nullcontext
+from functools import partial
+
+_active = None
+_originals = {}
+_SectionMark = None
+
+
+def format_bytes(count):
+    """count bytes for people: '812 B', '36.4 KB', '12.1 MB'"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(count) < 1024:
+            return ('%d %s' if unit == 'B' else '%.1f %s') % (count, unit)
+        count /= 1024.0
+    return '%.2f GB' % count
+
+
+def max_rss():
+    """The largest resident set size of this process so far in bytes, or None where unknown"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class Usage(object):
+    """Memory accounted to one section or flowable type"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.peak = 0
+        self.retained = 0
+
+    def add(self, peak, retained):
+        self.calls += 1
+        self.peak = max(self.peak, peak)
+        self.retained += retained
+
+
+class MemoryBudgetExceeded(Exception):
+    """The memory traced during a build went over the profiler's budget"""
+
+    def __init__(self, profiler, where):
+        Exception.__init__(self, "memory budget of %s exceeded in %s (%s traced)" % (
+            format_bytes(profiler.budget), where, format_bytes(profiler.peak)))
+        self.profiler = profiler
+        self.where = where
+
+
+class MemoryProfiler(object):
+    """Collects per-section and per-flowable-type memory usage for one process
+
+    budget, if given, is the most memory in bytes the build may trace.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.sections = []
+        self.flowables = {}
+        self.peak = 0
+        self.exceeded = None
+        self._by_title = {}
+        self._section = None
+        # [memory at start, peak seen, label, bytes excluded, isolated] of every open
+        # measurement; an isolated one and what it retains are hidden from those below it
+        self._stack = []
+
+    def _checkpoint(self):
+        """Memory in use now; the peak since the last checkpoint is folded into the open measurements"""
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for measurement in reversed(self._stack):
+            measurement[1] = max(measurement[1], peak - measurement[3])
+            if measurement[4]:
+                break
+        self.peak = max(self.peak, peak)
+        return current
+
+    def _check(self):
+        if self.budget is not None and self.exceeded is None and self.peak > self.budget:
+            self.exceeded = ', '.join(measurement[2] for measurement in self._stack) or 'the build'
+            raise MemoryBudgetExceeded(self, self.exceeded)
+
+    def _begin(self, label, isolated=False):
+        current = self._checkpoint()
+        self._stack.append([current, current, label, 0, isolated])
+        self._check()
+
+    def _end(self, usage):
+        current = self._checkpoint()
+        start, peak, label, excluded, isolated = self._stack[-1]
+        retained = current - start - excluded
+        usage.add(peak - start, retained)
+        if isolated:
+            for measurement in self._stack[:-1]:
+                measurement[3] += retained
+        try:
+            self._check()
+        finally:
+            self._stack.pop()
+
+    @contextmanager
+    def measure(self, kind):
+        """Account what runs inside the block to flowable type kind"""
+        usage = self.flowables.get(kind)
+        if usage is None:
+            usage = self.flowables[kind] = Usage(kind)
+        self._begin(kind)
+        try:
+            yield
+        finally:
+            self._end(usage)
+
+    def begin_section(self, title):
+        """Close the open section, if any, and account what follows to section title
+
+        A section begun again (built once to fingerprint it and once to
+        render it, say) adds to what it was accounted before.
+        """
+        self.end_section()
+        self._section = self._section_usage(title)
+        self._begin('section %r' % title)
+
+    def end_section(self):
+        """Close the open section, if any"""
+        usage, self._section = self._section, None
+        if usage is not None:
+            self._end(usage)
+
+    @contextmanager
+    def section(self, title):
+        self.begin_section(title)
+        try:
+            yield
+        finally:
+            self.end_section()
+
+    @contextmanager
+    def building(self, title):
+        """Account what runs inside the block to section title, and not to any open section or flowable"""
+        self._begin('building section %r' % title, isolated=True)
+        try:
+            yield
+        finally:
+            self._end(self._section_usage(title))
+
+    def _section_usage(self, title):
+        usage = self._by_title.get(title)
+        if usage is None:
+            usage = self._by_title[title] = Usage(title)
+            self.sections.append(usage)
+        return usage
+
+    def report(self):
+        """The accounting as text, sections in build order and flowable types by peak"""
+        summary = "memory: %s traced at peak" % format_bytes(self.peak)
+        if self.budget is not None:
+            summary += " (budget %s)" % format_bytes(self.budget)
+        rss = max_rss()
+        if rss is not None:
+            summary += ", process max RSS %s" % format_bytes(rss)
+        lines = [summary, "  %3s  %-44s %12s %12s" % ('#', 'section', 'peak', 'retained')]
+        for index, usage in enumerate(self.sections, 1):
+            lines.append("  %3d  %-44s %12s %12s" % (index, usage.name[:44], format_bytes(usage.peak),
+                                                     format_bytes(usage.retained)))
+        lines.append("  %-30s %8s %12s %12s" % ('flowable type', 'calls', 'peak', 'retained'))
+        for usage in sorted(self.flowables.values(), key=lambda usage: -usage.peak):
+            lines.append("  %-30s %8d %12s %12s" % (usage.name[:30], usage.calls, format_bytes(usage.peak),
+                                                    format_bytes(usage.retained)))
+        return '\n'.join(lines) + '\n'
+
+
+def active():
+    """The installed MemoryProfiler, or None"""
+    return _active
+
+
+def section(title):
+    """Account what runs inside the block to section title of the installed profiler, if any"""
+    if _active is None:
+        return nullcontext()
+    return _active.section(title)
+
+
+def section_mark(profiler, title):
+    """A never-drawn flowable that accounts what follows it to section title
+
+    Placed in front of each section's flowables, it is applied when the
+    layout engine reaches the section, so laying the section out is
+    accounted to it however far ahead the story was read.
+    """
+    global _SectionMark
+    if _SectionMark is None:
+        from reportlab.platypus.doctemplate import ActionFlowable
+
+        class SectionMark(ActionFlowable):
+            def __init__(self, profiler, title):
+                ActionFlowable.__init__(self)
+                self.profiler = profiler
+                self.title = title
+
+            def apply(self, doc):
+                self.profiler.begin_section(self.title)
+
+        _SectionMark = SectionMark
+    return _SectionMark(profiler, title)
+
+
+def accounted_section(profiler, title, build, styles):
+    """Section builder: build(styles), with building each flowable accounted to section title"""
+    with profiler.building(title):
+        flowables = iter(build(styles))
+    while True:
+        with profiler.building(title):
+            flowable = next(flowables, None)
+        if flowable is None:
+            return
+        yield flowable
+
+
+def accounted_spec(profiler, spec):
+    """spec with its sections built through accounted_section()"""
+    from docbuild.spec import DocumentSpec
+
+    sections = [(title, partial(accounted_section, profiler, title, build)) for title, build in spec.sections]
+    return DocumentSpec(spec.name, sections, spec.create_styles, spec.create_doc, spec.on_first_page,
+                        spec.on_later_pages, spec.draw_page_number, spec.sources, spec.personalization)
+
+
+def _measured(method):
+    def measured(frame, flowable, *args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return method(frame, flowable, *args, **kwargs)
+        with profiler.measure(type(flowable).__name__):
+            return method(frame, flowable, *args, **kwargs)
+    measured.__wrapped__ = method
+    return measured
+
+
+def install(profiler):
+    """Make profiler the active MemoryProfiler, start tracemalloc and hook Frame.add() and Frame.split()
+
+    Every flowable is laid out through its frame's add() and split(), so
+    hooking the frame accounts flowables of every class, including ones
+    imported later.
+    """
+    global _active
+    import tracemalloc
+    from reportlab.platypus.frames import Frame
+
+    if not _originals:
+        for method in ('add', 'split'):
+            _originals[method] = Frame.__dict__[method]
+            setattr(Frame, method, _measured(_originals[method]))
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _originals['tracemalloc'] = True
+    _active = profiler
+    return profiler
+
+
+def uninstall():
+    """Remove the hooks installed by install() and stop tracemalloc if install() started it"""
+    global _active
+    import tracemalloc
+    from reportlab.platypus.frames import Frame
+
+    if _originals.pop('tracemalloc', False):
+        tracemalloc.stop()
+    for method, original in _originals.items():
+        setattr(Frame, method, original)
+    _originals.clear()
+    _active = None
+
+
+@contextmanager
+def profiling(budget=None):
+    """Account the memory of everything inside the block; yields the MemoryProfiler"""
+    profiler = install(MemoryProfiler(budget))
+    try:
+        yield profiler
+    finally:
+        profiler.end_section()
+        uninstall()
@@ -0,0 +1,117 @@
+"""Reproducible, content-addressed output files
+
+In deterministic mode reportlab leaves out everything that varies between
+runs (creation dates, random document IDs), so the same input gives the
+same bytes, for single-pass and section builds alike.
+
+Builds write to a staging path next to the output; publish() then
+replaces the output only if the bytes changed.  An unchanged PDF keeps its
+modification time, so nothing downstream (copies into public/, deploys)
+sees a change.
+
+update_manifest() additionally keeps a copy of each output under a name
+carrying its content hash, e.g. TaskBoard_Documentation.3f2a9c1b0d4e.pdf,
+and records it in a JSON manifest shaped like Vite's build manifest:
+
+    {"TaskBoard_Documentation.pdf": {"file": "TaskBoard_Documentation.3f2a9c1b0d4e.pdf",
+                                     "sha256": "...", "size": 56601,
+                                     "previous": ["TaskBoard_Documentation.9b0e47d2c5a1.pdf"]}}
+
+Paths are relative to the manifest's directory.  A hashed file never
+changes, so it can be served with a far-future cache lifetime.  The copies
+of the KEEP_COPIES - 1 builds before the current one are kept as well (and
+listed, newest first, under "previous"), so pages and links still holding
+an older name keep working for a while after a deploy.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+# hashed copies kept of each output, the current one included
+KEEP_COPIES = 3
+
+
+def make_deterministic():
+    """Make every PDF this process writes from now on reproducible"""
+    from reportlab import rl_config
+
+    rl_config.invariant = 1
+
+
+def file_digest(path):
+    """Hex sha256 of the file at path"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def staging_path(output):
+    """Where to build output before publish() decides whether to keep it"""
+    return output + '.new'
+
+
+def publish(staged, output):
+    """Move the file at staged to output unless output already has its bytes
+
+    Returns (digest, changed).
+    """
+    digest = file_digest(staged)
+    if os.path.exists(output) and file_digest(output) == digest:
+        os.remove(staged)
+        return digest, False
+    os.replace(staged, output)
+    return digest, True
+
+
+def hashed_name(output, digest):
+    """output's file name with the first 12 hex digits of digest before the extension"""
+    stem, ext = os.path.splitext(os.path.basename(output))
+    return '%s.%s%s' % (stem, digest[:12], ext)
+
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_manifest(path, outputs):
+    """Record the (output, digest) pairs in outputs in the manifest at path
+
+    Each output gets a content-hashed copy in its own directory; of the
+    copies it replaces in the manifest the newest KEEP_COPIES - 1 are kept
+    and older ones deleted.  Returns the hashed paths.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    manifest = load_manifest(path)
+    hashed = []
+    for output, digest in outputs:
+        target = os.path.join(os.path.dirname(output), hashed_name(output, digest))
+        if not os.path.exists(target):
+            shutil.copyfile(output, target + '.tmp')
+            os.replace(target + '.tmp', target)
+        name = os.path.relpath(os.path.abspath(output), base)
+        entry = {'file': os.path.relpath(os.path.abspath(target), base),
+                 'sha256': digest, 'size': os.path.getsize(target)}
+        old = manifest.get(name, {})
+        previous = [file for file in [old.get('file')] + old.get('previous', []) if file and file != entry['file']]
+        entry['previous'] = previous[:KEEP_COPIES - 1]
+        for file in previous[KEEP_COPIES - 1:]:
+            stale = os.path.join(base, file)
+            if os.path.exists(stale):
+                os.remove(stale)
+        manifest[name] = entry
+        hashed.append(target)
+    os.makedirs(base, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
+    return hashed
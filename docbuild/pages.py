@@ -0,0 +1,242 @@
+"""Per-page content hashes of built PDFs and page-level diffs between builds
+
+A page's hash covers what the page shows: its content stream (decoded,
+so compression does not matter), everything its resources hold (fonts,
+images, form XObjects, transparency states) and its size and rotation.
+Resources shared by many pages are hashed once per document.  The footer
+page number is left out: builds draw it through numbered(), which marks
+it as marked content tagged PageNumber, so a page inserted in the middle
+does not make every page after it differ.
+
+update_page_manifest() records the hashes of each output in a JSON page
+manifest, keyed like the content-hashed manifest of docbuild.output, and
+with each entry what changed since the build recorded before it:
+
+    {"TaskBoard_Documentation.pdf": {
+        "sha256": "...", "version": 2, "mode": "sections", "pages": ["3f2a9c1b0d4e5a6b7c8d9e0f", ...],
+        "changes": {"changed": [[4, 4]], "added": [28], "removed": []}}}
+
+changed pairs an old page number with the new one showing different
+content in its place; added and removed are new and old page numbers.
+Downstream steps (publishing, previews, review notices) can then work on
+those pages only.  diff_pages() compares two builds the same way.
+
+Page hashes depend on the build mode as well as on the content: a
+document assembled from separately rendered sections (docbuild.assemble)
+stores its fonts and page numbers differently from a single-pass build
+of the same content, so every page of one differs from the other.  Each
+entry records its build mode, "sections" or "single-pass" (read from the
+PDF, see build_mode()); update_page_manifest() compares a build only
+with one recorded in the same mode, and load_pages() gives the mode so
+that diff-pages can refuse to compare builds of different modes.
+
+Requires pypdf (pip install pypdf).
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+
+from docbuild.output import file_digest, load_manifest
+
+# hex digits kept of each page's sha256
+PAGE_HASH_DIGITS = 24
+PAGE_HASH_VERSION = 2
+
+# what numbered() draws, in a decoded content stream
+_PAGE_NUMBER = re.compile(rb'/PageNumber\s+BMC\b(.*?)\bEMC\b', re.S)
+
+# keys that say how an object is stored, or point back up the page tree
+_STORAGE_KEYS = frozenset(['/Length', '/Filter', '/DecodeParms', '/Parent'])
+
+
+def _digest(obj, memo):
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        digest = memo.get(key)
+        if digest is None:
+            memo[key] = b''
+            digest = memo[key] = _digest(obj.get_object(), memo)
+        return digest
+    h = hashlib.sha256(type(obj).__name__.encode('ascii'))
+    if isinstance(obj, StreamObject):
+        h.update(obj.get_data())
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj):
+            if key not in _STORAGE_KEYS:
+                h.update(key.encode('utf-8'))
+                h.update(_digest(obj.raw_get(key), memo))
+    elif isinstance(obj, ArrayObject):
+        for item in list.__iter__(obj):
+            h.update(_digest(item, memo))
+    elif isinstance(obj, bytes):
+        h.update(obj)
+    else:
+        h.update(str(obj).encode('utf-8'))
+    return h.digest()
+
+
+def numbered(draw_page_number):
+    """draw_page_number(canvas, page_num) with what it draws marked as the page number"""
+    def draw(canvas, page_num):
+        canvas.addLiteral('/PageNumber BMC')
+        draw_page_number(canvas, page_num)
+        canvas.addLiteral('EMC')
+    return draw
+
+
+def has_page_number(content):
+    """Whether a decoded content stream draws anything as a page number"""
+    return any(match.group(1).strip() for match in _PAGE_NUMBER.finditer(content))
+
+
+def unnumbered(content):
+    """A decoded content stream without its page number"""
+    return _PAGE_NUMBER.sub(b'', content)
+
+
+def page_hash(page, memo):
+    """Hex hash of what page shows; memo holds the digests of objects already hashed in its document"""
+    h = hashlib.sha256(b'%d' % PAGE_HASH_VERSION)
+    contents = page.get_contents()
+    h.update(unnumbered(contents.get_data()) if contents is not None else b'')
+    h.update(_digest(page.get('/Resources'), memo))
+    h.update(str([float(value) for value in page.mediabox]).encode('ascii'))
+    h.update(str(page.rotation).encode('ascii'))
+    return h.hexdigest()[:PAGE_HASH_DIGITS]
+
+
+def build_mode(reader):
+    """'sections' for a PDF put together by docbuild.assemble, 'single-pass' for any other"""
+    from docbuild.assemble import PRODUCER
+
+    return 'sections' if (reader.metadata or {}).get('/Producer') == PRODUCER else 'single-pass'
+
+
+def _reader(path):
+    from docbuild.assemble import _require_pypdf
+
+    return _require_pypdf().PdfReader(path)
+
+
+def read_pages(path):
+    """(build mode, page hashes in page order) of the PDF at path"""
+    reader = _reader(path)
+    memo = {}
+    return build_mode(reader), [page_hash(page, memo) for page in reader.pages]
+
+
+class PageDiff(object):
+    """What changed between two builds, page by page
+
+    changed holds (old page, new page) pairs showing different content in
+    the same place, added new page numbers and removed old page numbers;
+    unchanged counts the pages found in both.  Pages are numbered from 1.
+    """
+
+    def __init__(self, changed=(), added=(), removed=(), unchanged=0):
+        self.changed = list(changed)
+        self.added = list(added)
+        self.removed = list(removed)
+        self.unchanged = unchanged
+
+    def __bool__(self):
+        return bool(self.changed or self.added or self.removed)
+
+    def as_dict(self):
+        return {'changed': [list(pair) for pair in self.changed], 'added': self.added, 'removed': self.removed}
+
+    def summary(self):
+        return "%d changed, %d added, %d removed, %d unchanged" % (
+            len(self.changed), len(self.added), len(self.removed), self.unchanged)
+
+
+def diff_pages(old, new):
+    """PageDiff between two lists of page hashes
+
+    Pages are matched in order, so pages inserted or deleted in the middle
+    show up as added or removed rather than shifting every page after them
+    (page hashes leave footer page numbers out, so the pages after them
+    still look the same).
+    """
+    diff = PageDiff()
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            diff.unchanged += old_end - old_start
+            continue
+        paired = min(old_end - old_start, new_end - new_start) if tag == 'replace' else 0
+        diff.changed.extend((old_start + offset + 1, new_start + offset + 1) for offset in range(paired))
+        diff.removed.extend(range(old_start + paired + 1, old_end + 1))
+        diff.added.extend(range(new_start + paired + 1, new_end + 1))
+    return diff
+
+
+def page_ranges(pages):
+    """'3, 5-7, 12' for [3, 5, 6, 7, 12]"""
+    ranges = []
+    for page in sorted(pages):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return ', '.join('%d' % first if first == last else '%d-%d' % (first, last) for first, last in ranges)
+
+
+def load_pages(path, name=None):
+    """(build mode, page hashes) of a PDF, or of an entry of a page manifest (a .json file)
+
+    A manifest holding several documents needs name, the file name of the
+    document wanted.  The mode of an entry recorded before modes were is
+    None.
+    """
+    if not path.endswith('.json'):
+        return read_pages(path)
+    manifest = load_manifest(path)
+    entries = [(key, entry) for key, entry in sorted(manifest.items()) if 'pages' in entry]
+    if name is not None and len(entries) > 1:
+        entries = [(key, entry) for key, entry in entries
+                   if os.path.basename(key) == os.path.basename(name)] or entries
+    if not entries:
+        raise ValueError("%s: no page hashes" % path)
+    if len(entries) > 1:
+        raise ValueError("%s: pages of several documents (%s)" % (path, ', '.join(key for key, entry in entries)))
+    return entries[0][1].get('mode'), entries[0][1]['pages']
+
+
+def update_page_manifest(path, outputs):
+    """Record the page hashes of each PDF in outputs in the page manifest at path
+
+    An output whose bytes are the ones recorded keeps its entry without
+    being read.  Returns a PageDiff per output, against the build recorded
+    before (every page added if there was none, or if it was built in
+    another mode).
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    manifest = load_manifest(path)
+    diffs = []
+    for output in outputs:
+        name = os.path.relpath(os.path.abspath(output), base)
+        previous = manifest.get(name, {})
+        digest = file_digest(output)
+        if previous.get('sha256') == digest and previous.get('version') == PAGE_HASH_VERSION:
+            diff = PageDiff(unchanged=len(previous['pages']))
+            mode, pages = previous.get('mode') or build_mode(_reader(output)), previous['pages']
+        else:
+            mode, pages = read_pages(output)
+            comparable = previous.get('version') == PAGE_HASH_VERSION and previous.get('mode') == mode
+            diff = diff_pages(previous['pages'] if comparable else [], pages)
+        manifest[name] = {'sha256': digest, 'version': PAGE_HASH_VERSION, 'mode': mode, 'pages': pages,
+                          'changes': diff.as_dict()}
+        diffs.append(diff)
+    os.makedirs(base, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
+    return diffs
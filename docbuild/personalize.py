@@ -0,0 +1,354 @@
+"""Personalized copies of a document, stamped onto one rendered base
+
+A personalized copy differs from the shared document only in a few
+overlays, such as a cover block naming the recipient.  Laying the whole
+document out again for every recipient would repeat identical work, so
+the document is rendered once as a base PDF and each copy is written as
+the base's bytes plus a PDF incremental update: the recipient's overlay
+as a form XObject and the stamped pages rewritten to draw it, appended
+after the untouched original objects.  A copy costs one small overlay
+canvas and a couple of kilobytes of output however long the document is.
+
+Recipients come from a CSV file with a header row or a JSONL file with
+one object per line.  A Personalization says which fields a recipient
+must have, which pages get an overlay, how to draw it and what each copy
+is called.  personalize() hands the recipients to a process pool in
+chunks; the base is parsed once per worker.
+
+Requires pypdf (pip install pypdf).
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from docbuild.assemble import _require_pypdf
+from docbuild.output import publish, staging_path
+
+# recipients handed to a worker at a time
+CHUNK_SIZE = 64
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+class Personalization(object):
+    """How the copies of a document are personalized
+
+    draw(canvas, page_num, recipient) draws the overlay of page page_num
+    (counted from 1) for each page in pages.  fields must be present and
+    non-empty in every recipient.  filename is a str.format() template of
+    a copy's file name, filled in with the recipient's fields and index,
+    its position in the recipient list.
+    """
+
+    def __init__(self, draw, fields=(), pages=(1,), filename='{index:05d}.pdf'):
+        self.draw = draw
+        self.fields = tuple(fields)
+        self.pages = tuple(pages)
+        self.filename = filename
+
+    def filename_for(self, recipient, index):
+        """The file name of recipient's copy, with unsafe characters replaced"""
+        return _UNSAFE.sub('_', self.filename.format_map(dict(recipient, index=index)))
+
+
+def _csv_rows(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _jsonl_rows(path):
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                raise ValueError("%s:%d: %s" % (path, number, e))
+
+
+def read_recipients(path, fields=()):
+    """Yield the recipients of a .csv or .jsonl file as dicts
+
+    Raises ValueError naming the line of a recipient without one of fields.
+    """
+    rows = _csv_rows(path) if path.endswith('.csv') else _jsonl_rows(path)
+    for number, recipient in rows:
+        for field in fields:
+            if recipient.get(field) in (None, ''):
+                raise ValueError("%s:%d: recipient has no %s" % (path, number, field))
+        yield recipient
+
+
+def recipient_overlay(personalization, recipient, page_sizes):
+    """PDF bytes with one overlay page for recipient per entry in page_sizes"""
+    from reportlab.pdfgen.canvas import Canvas
+
+    buf = io.BytesIO()
+    canvas = Canvas(buf)
+    for page_num, size in zip(personalization.pages, page_sizes):
+        canvas.setPageSize(size)
+        personalization.draw(canvas, page_num, recipient)
+        canvas.showPage()
+    canvas.save()
+    return buf.getvalue()
+
+
+def _pdf(value):
+    """value as a pypdf object; plain dicts and lists are converted"""
+    from pypdf.generic import ArrayObject, DictionaryObject, NameObject
+
+    if isinstance(value, dict) and not isinstance(value, DictionaryObject):
+        dictionary = DictionaryObject()
+        for key, item in value.items():
+            dictionary[NameObject(key)] = _pdf(item)
+        return dictionary
+    if isinstance(value, list) and not isinstance(value, ArrayObject):
+        return ArrayObject(_pdf(item) for item in value)
+    return value
+
+
+def _serialize(obj):
+    buf = io.BytesIO()
+    _pdf(obj).write_to_stream(buf)
+    return buf.getvalue()
+
+
+class _Update(object):
+    """The objects of one incremental update, serialized as they are added
+
+    Objects copied from another PDF (the overlay) are renumbered after the
+    base's last object; references into the base are written as they are.
+    """
+
+    def __init__(self, size, offset):
+        self.size = size
+        self.offset = offset
+        self.chunks = []
+        self.xref = []
+        self.copied = {}
+
+    def allocate(self):
+        self.size += 1
+        return self.size - 1
+
+    def write(self, number, obj, generation=0):
+        data = b'%d %d obj\n%s\nendobj\n' % (number, generation, _serialize(obj))
+        self._append(number, generation, data)
+
+    def write_stream(self, number, dictionary, data):
+        """Write a stream object with data compressed and dictionary's own filters dropped"""
+        from pypdf.generic import NameObject, NumberObject
+
+        data = zlib.compress(data)
+        dictionary = dict((key, value) for key, value in dict.items(dictionary)
+                          if key not in ('/Filter', '/DecodeParms', '/Length'))
+        dictionary['/Filter'] = NameObject('/FlateDecode')
+        dictionary['/Length'] = NumberObject(len(data))
+        self._append(number, 0, b'%d 0 obj\n%s\nstream\n%s\nendstream\nendobj\n' % (
+            number, _serialize(dictionary), data))
+
+    def add_stream(self, dictionary, data):
+        """Write a new stream object and return a reference to it"""
+        from pypdf.generic import IndirectObject
+
+        number = self.allocate()
+        self.write_stream(number, dictionary, data)
+        return IndirectObject(number, 0, None)
+
+    def _append(self, number, generation, data):
+        self.xref.append((number, generation, self.offset))
+        self.chunks.append(data)
+        self.offset += len(data)
+
+    def copy(self, obj):
+        """obj of the overlay, with every object it refers to copied into the update"""
+        from pypdf.generic import ArrayObject, IndirectObject, StreamObject
+
+        if isinstance(obj, IndirectObject):
+            number = self.copied.get(obj.idnum)
+            if number is None:
+                number = self.copied[obj.idnum] = self.allocate()
+                target = obj.get_object()
+                if isinstance(target, StreamObject):
+                    self.write_stream(number, self.copy(dict(dict.items(target))), target.get_data())
+                else:
+                    self.write(number, self.copy(target))
+            return IndirectObject(number, 0, None)
+        if isinstance(obj, dict):
+            return _pdf(dict((key, self.copy(value)) for key, value in dict.items(obj)))
+        if isinstance(obj, list):
+            return ArrayObject(self.copy(value) for value in obj)
+        return obj
+
+    def tail(self, trailer, prev):
+        """The update's objects, cross-reference section and trailer"""
+        from pypdf.generic import NumberObject
+
+        # readers take a section not starting at object 0 for a broken table
+        xref = [b'xref\n0 1\n0000000000 65535 f \n']
+        entries = sorted(self.xref)
+        start = 0
+        while start < len(entries):
+            end = start + 1
+            while end < len(entries) and entries[end][0] == entries[end - 1][0] + 1:
+                end += 1
+            xref.append(b'%d %d\n' % (entries[start][0], end - start))
+            xref.extend(b'%010d %05d n \n' % (offset, generation) for number, generation, offset in entries[start:end])
+            start = end
+        trailer = dict(trailer, **{'/Size': NumberObject(self.size), '/Prev': NumberObject(prev)})
+        return b''.join(self.chunks + xref + [b'trailer\n', _serialize(trailer),
+                                              b'\nstartxref\n%d\n%%%%EOF\n' % self.offset])
+
+
+class Stamper(object):
+    """Writes personalized copies of the base PDF at path
+
+    The base is parsed once; stamp() only serializes the update.  Bases
+    whose cross-references are streams (reportlab never writes those) are
+    stamped through pypdf's incremental writer instead, which parses the
+    whole base again for every copy.
+    """
+
+    def __init__(self, path, personalization):
+        pypdf = _require_pypdf()
+        with open(path, 'rb') as f:
+            self.base = f.read()
+        self.personalization = personalization
+        reader = pypdf.PdfReader(io.BytesIO(self.base))
+        if reader.is_encrypted:
+            raise ValueError("%s is encrypted" % path)
+        pages = reader.pages
+        for page_num in personalization.pages:
+            if not 1 <= page_num <= len(pages):
+                raise ValueError("%s has %d pages, cannot stamp page %d" % (path, len(pages), page_num))
+        self.pages = [pages[page_num - 1] for page_num in personalization.pages]
+        self.sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in self.pages]
+        self.size = reader.trailer['/Size']
+        self.trailer = [(key, value) for key, value in dict.items(reader.trailer) if key in ('/Root', '/Info', '/ID')]
+        tail = self.base.rstrip()
+        self.startxref = int(tail[tail.rindex(b'startxref') + len(b'startxref'):].split()[0])
+        self.xref_table = self.base[self.startxref:self.startxref + 4] == b'xref'
+        if not self.base.endswith(b'\n'):
+            self.base += b'\n'
+
+    def stamp(self, recipient):
+        """The bytes of recipient's copy"""
+        from pypdf.generic import DictionaryObject, FloatObject, NameObject
+
+        pypdf = _require_pypdf()
+        overlay = pypdf.PdfReader(io.BytesIO(recipient_overlay(self.personalization, recipient, self.sizes)))
+        if not self.xref_table:
+            return self._stamp_cloned(overlay)
+        update = _Update(self.size, len(self.base))
+        # the stamped pages' own content runs inside q ... Q
+        save = update.add_stream({}, b'q')
+        for page, stamp, (width, height) in zip(self.pages, overlay.pages, self.sizes):
+            contents = stamp.get_contents()
+            form = update.add_stream({
+                '/Type': NameObject('/XObject'), '/Subtype': NameObject('/Form'),
+                '/BBox': [FloatObject(value) for value in (0, 0, width, height)],
+                '/Resources': update.copy(dict.get(stamp, '/Resources', DictionaryObject())),
+            }, contents.get_data() if contents is not None else b'')
+
+            inherited = page
+            while '/Resources' not in inherited and '/Parent' in inherited:
+                inherited = inherited['/Parent']
+            resources = dict(dict.get(inherited, '/Resources', DictionaryObject()).get_object())
+            xobjects = dict(resources.get('/XObject', DictionaryObject()).get_object())
+            name = '/Stamp'
+            while name in xobjects:
+                name += '_'
+            xobjects[name] = form
+            resources['/XObject'] = xobjects
+            draw = update.add_stream({}, b'Q q 1 0 0 1 %s %s cm %s Do Q' % (
+                _serialize(page.mediabox.left), _serialize(page.mediabox.bottom), name.encode('ascii')))
+
+            original = dict.get(page, '/Contents')
+            original = list(original.get_object()) if isinstance(original.get_object(), list) else [original]
+            rewritten = dict(dict.items(page))
+            rewritten['/Contents'] = [save] + original + [draw]
+            rewritten['/Resources'] = resources
+            reference = page.indirect_reference
+            update.write(reference.idnum, rewritten, reference.generation)
+        return self.base + update.tail(self.trailer, self.startxref)
+
+    def _stamp_cloned(self, overlay):
+        pypdf = _require_pypdf()
+        writer = pypdf.PdfWriter(pypdf.PdfReader(io.BytesIO(self.base)), incremental=True)
+        for page_num, stamp in zip(self.personalization.pages, overlay.pages):
+            page = writer.pages[page_num - 1]
+            page.merge_page(stamp)
+            page.compress_content_streams()
+        buf = io.BytesIO()
+        writer.write(buf)
+        return buf.getvalue()
+
+
+# Stamper per base path; personalize() fills it in before the pool forks
+_stampers = {}
+
+
+def _stamp_job(base, personalization, chunk):
+    """Worker entry point: write the copies in chunk, a list of (recipient, output)
+
+    Returns how many copies changed.
+    """
+    stamper = _stampers.get(base)
+    if stamper is None:
+        stamper = _stampers[base] = Stamper(base, personalization)
+    changed = 0
+    for recipient, output in chunk:
+        staged = staging_path(output)
+        with open(staged, 'wb') as f:
+            f.write(stamper.stamp(recipient))
+        changed += publish(staged, output)[1]
+    return changed
+
+
+def _chunks(recipients, personalization, out_dir, chunk_size):
+    """Yield lists of (recipient, output path), refusing two copies of one name"""
+    seen = {}
+    chunk = []
+    for index, recipient in enumerate(recipients):
+        name = personalization.filename_for(recipient, index)
+        if name in seen:
+            raise ValueError("recipients %d and %d would both be written to %s" % (seen[name], index, name))
+        seen[name] = index
+        chunk.append((recipient, os.path.join(out_dir, name)))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def personalize(base, recipients, personalization, out_dir, jobs=0, chunk_size=CHUNK_SIZE):
+    """Write a copy of the PDF at base per recipient into out_dir
+
+    jobs is the pool size (0 = one per CPU, 1 = stamp in this process).
+    Copies whose bytes did not change are left untouched.  Returns
+    (copies, changed).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    # parsed here so that forked workers start with it
+    _stampers[base] = Stamper(base, personalization)
+    try:
+        chunks = _chunks(recipients, personalization, out_dir, chunk_size)
+        if jobs == 1:
+            done = [(len(chunk), _stamp_job(base, personalization, chunk)) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+                futures = [(len(chunk), pool.submit(_stamp_job, base, personalization, chunk)) for chunk in chunks]
+                done = [(count, future.result()) for count, future in futures]
+    finally:
+        _stampers.pop(base, None)
+    return sum(count for count, changed in done), sum(changed for count, changed in done)
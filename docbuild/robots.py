@@ -0,0 +1,189 @@
+"""Robot catalog records, streamed from Robots.jsx or a JSONL export
+
+A catalog is a stream of robot records, one dict per SKU:
+
+    {"sku": "DRONE-STANDARD", "category": "Aerial Drones", "name": "DJI Matrice 30",
+     "tier": "standard", "price_usd": 12000, "maintenance_usd": 1200,
+     "specs": {"Battery": "41 min", "Payload": "2.7 kg"}}
+
+Only sku, category and name are required.  read_records() yields them from
+src/pages/Robots.jsx (one record per model of the ROI calculator, in the
+category of the same icon) or from a JSONL file with one record per line,
+which is how a full fleet inventory is exported.
+
+Catalogs can be far larger than memory allows to hold as flowables, or
+even as records.  sort_records() is an external merge sort: it sorts runs
+of RUN_SIZE records, spills each to a temporary JSONL file and merges the
+runs lazily, so at most one run is held in memory.  catalog_groups()
+groups the sorted stream by category without materialising a group, and
+spec_sheet() turns one record into the label/value rows of its sheet.
+
+A section builder consuming catalog_groups() lazily therefore lays out the
+whole appendix with memory bounded by the run size (plus reportlab's few
+hundred bytes per finished page, see docbuild.stream), however many SKUs
+the catalog has.
+"""
+
+import heapq
+import json
+import os
+import tempfile
+from itertools import groupby
+
+from docbuild.content import REPO_ROOT
+from docbuild.jsx import extract_const
+
+ROBOTS_JSX = os.path.join(REPO_ROOT, 'src', 'pages', 'Robots.jsx')
+
+RUN_SIZE = 10000
+
+_TIER_ORDER = {'budget': 0, 'standard': 1, 'premium': 2}
+
+
+def jsx_categories(path=ROBOTS_JSX):
+    """robotCategories from Robots.jsx, as a dict by category name"""
+    with open(path, encoding='utf-8') as f:
+        categories = extract_const(f.read(), 'robotCategories')
+    return dict((category['name'], category) for category in categories)
+
+
+def jsx_records(path=ROBOTS_JSX):
+    """Yield a record per model of the ROI calculator data in Robots.jsx"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    categories = dict((category.get('icon'), category['name'])
+                      for category in extract_const(source, 'robotCategories'))
+    for key, robot in extract_const(source, 'roiData').items():
+        category = categories.get(robot.get('icon'), robot.get('name', key))
+        for tier, model in robot.get('models', {}).items():
+            specs = {}
+            for field in ('battery', 'payload'):
+                if model.get(field):
+                    specs[field.capitalize()] = model[field]
+            if model.get('efficiency') is not None:
+                specs['Revenue efficiency'] = '%d%%' % round(model['efficiency'] * 100)
+            yield {
+                'sku': '%s-%s' % (key.upper(), tier.upper()),
+                'category': category,
+                'name': model['name'],
+                'tier': tier,
+                'price_usd': model.get('price'),
+                'maintenance_usd': model.get('maintenance'),
+                'specs': specs,
+            }
+
+
+def jsonl_records(path):
+    """Yield the records of a JSONL file, one line at a time"""
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError("%s:%d: %s" % (path, number, e))
+            for field in ('sku', 'category', 'name'):
+                if not record.get(field):
+                    raise ValueError("%s:%d: record has no %s" % (path, number, field))
+            yield record
+
+
+def read_records(path=ROBOTS_JSX):
+    """Yield the robot records of a .jsx page or a .jsonl export"""
+    if path.endswith('.jsx'):
+        return jsx_records(path)
+    return jsonl_records(path)
+
+
+def export_jsonl(records, path):
+    """Write records to path as JSONL; returns how many were written"""
+    count = 0
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+
+def catalog_order(record):
+    """Sort key of the catalog: category, then tier, price and SKU"""
+    return (record['category'], _TIER_ORDER.get(record.get('tier'), len(_TIER_ORDER)),
+            record.get('price_usd') or 0, record['sku'])
+
+
+def _spill(run, directory, number):
+    path = os.path.join(directory, 'run-%05d.jsonl' % number)
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in run:
+            f.write(json.dumps(record))
+            f.write('\n')
+    return path
+
+
+def _read_run(f):
+    for line in f:
+        yield json.loads(line)
+
+
+def sort_records(records, key=catalog_order, run_size=RUN_SIZE, tmpdir=None):
+    """Yield records sorted by key, holding at most run_size of them in memory
+
+    Streams that fit in one run are sorted in memory; longer ones are
+    sorted run by run into temporary files and merged.  The files are
+    removed when the generator finishes or is closed.
+    """
+    run = []
+    runs = []
+    with tempfile.TemporaryDirectory(prefix='catalog-', dir=tmpdir) as workdir:
+        for record in records:
+            run.append(record)
+            if len(run) >= run_size:
+                run.sort(key=key)
+                runs.append(_spill(run, workdir, len(runs)))
+                run = []
+        run.sort(key=key)
+        if not runs:
+            yield from run
+            return
+        if run:
+            runs.append(_spill(run, workdir, len(runs)))
+        run = []
+        files = [open(path, encoding='utf-8') for path in runs]
+        try:
+            yield from heapq.merge(*[_read_run(f) for f in files], key=key)
+        finally:
+            for f in files:
+                f.close()
+
+
+def catalog_groups(records, run_size=RUN_SIZE):
+    """Yield (category, records) for the catalog in order
+
+    Each group's records are an iterator over the sorted stream, so they
+    have to be consumed before moving on to the next group.
+    """
+    for category, group in groupby(sort_records(records, run_size=run_size), key=lambda record: record['category']):
+        yield category, group
+
+
+def _usd(value):
+    return '$%s' % format(value, ',') if isinstance(value, int) else '$%s' % format(value, ',.2f')
+
+
+def spec_sheet(record):
+    """The (label, value) rows of a record's spec sheet"""
+    rows = [('SKU', record['sku'])]
+    if record.get('tier'):
+        rows.append(('Tier', record['tier'].capitalize()))
+    if record.get('price_usd') is not None:
+        rows.append(('Price', _usd(record['price_usd'])))
+    if record.get('maintenance_usd') is not None:
+        rows.append(('Maintenance', '%s / year' % _usd(record['maintenance_usd'])))
+    for label, value in (record.get('specs') or {}).items():
+        rows.append((label, str(value)))
+    return rows
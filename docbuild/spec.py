@@ -0,0 +1,77 @@
+"""Document description shared by the generator scripts"""
+
+
+class DocumentSpec(object):
+    """An ordered list of sections and the settings used to lay them out
+
+    sections is a list of (title, build) pairs; build(styles) returns (or
+    yields) the flowables of one section.  Sections always start on a new
+    page.  sections may also be a function returning that list, called
+    the first time the sections are needed, for documents whose sections
+    are read from a file.
+
+    create_doc(filename) returns the document template, on_first_page and
+    on_later_pages are the usual SimpleDocTemplate page callbacks and
+    draw_page_number(canvas, page_num) draws the footer number.  When the
+    document is assembled from separately rendered sections the page
+    callbacks must not draw page numbers themselves; draw_page_number is
+    stamped onto the merged pages instead.
+
+    sources lists the files, besides the module defining the spec, that
+    its content is read from; watch mode rebuilds when one changes.
+    personalization, a docbuild.personalize.Personalization, lets the
+    document be stamped into a copy per recipient.
+    """
+
+    def __init__(self, name, sections, create_styles, create_doc,
+                 on_first_page=None, on_later_pages=None, draw_page_number=None, sources=(),
+                 personalization=None):
+        self.name = name
+        self._sections = sections if callable(sections) else list(sections)
+        self.create_styles = create_styles
+        self.create_doc = create_doc
+        self.on_first_page = on_first_page
+        self.on_later_pages = on_later_pages
+        self.draw_page_number = draw_page_number
+        self.sources = list(sources)
+        self.personalization = personalization
+
+    @property
+    def sections(self):
+        if callable(self._sections):
+            self._sections = list(self._sections())
+        return self._sections
+
+    def section_titles(self):
+        return [title for title, build in self.sections]
+
+    def page_callbacks(self, index):
+        """Return (onFirstPage, onLaterPages) for the section at index"""
+        if index == 0:
+            return self.on_first_page, self.on_later_pages
+        return self.on_later_pages, self.on_later_pages
+
+    def iter_story(self, styles, marks=(), build_section=None):
+        """Yield the whole document's flowables, building sections on demand
+
+        A section is only built when the layout reaches it, and its builder
+        may itself be a generator.  Each of marks is called with a section's
+        title and the flowable it returns is put in front of the section.
+        build_section, if given, builds each section instead of calling its
+        builder: it is called with the title, the builder and styles.
+        """
+        from reportlab.platypus import PageBreak
+
+        for index, (title, build) in enumerate(self.sections):
+            if index:
+                yield PageBreak()
+            for mark in marks:
+                yield mark(title)
+            if build_section is None:
+                yield from build(styles)
+            else:
+                yield from build_section(title, build, styles)
+
+    def build_story(self, styles):
+        """Return the whole document as one story list"""
+        return list(self.iter_story(styles))
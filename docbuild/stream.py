@@ -0,0 +1,122 @@
+"""Feed reportlab a story that is produced while it is being laid out
+
+BaseDocTemplate.build() consumes its story from the front: it looks at
+flowables[0], deletes it once handled and pushes split remainders back
+with insert()/slice assignment.  FlowableStream offers exactly that list
+interface over an iterator, pulling flowables only when the layout engine
+gets to them.  A drawn flowable is dropped from the buffer straight away,
+so the memory held by flowables depends on the largest section rather than
+on the length of the document.
+
+What still grows with page count is reportlab's own output document, which
+keeps every finished page's content stream until it is saved.  Left alone
+that is the uncompressed stream, around 3 KB for a page of dense text;
+compact_canvas() compresses each page as soon as it is finished, which
+cuts that to a few hundred bytes and gives byte-identical output.
+"""
+
+_CompactCanvas = None
+
+
+class FlowableStream(object):
+    """List-like, lazily filled view of an iterable of flowables
+
+    lookahead is how many flowables len() makes sure are buffered; reportlab
+    only ever peeks a few items ahead (for keepWithNext chains), so a small
+    window is enough.
+    """
+
+    def __init__(self, iterable, lookahead=16):
+        self._source = iter(iterable)
+        self._buffer = []
+        self.lookahead = lookahead
+        self.pulled = 0
+
+    def _fill(self, count):
+        buffer = self._buffer
+        while len(buffer) < count and self._source is not None:
+            try:
+                buffer.append(next(self._source))
+            except StopIteration:
+                self._source = None
+            else:
+                self.pulled += 1
+
+    def __len__(self):
+        self._fill(self.lookahead)
+        return len(self._buffer)
+
+    def __bool__(self):
+        self._fill(1)
+        return bool(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0:
+                self._fill(float('inf'))
+            else:
+                self._fill(index.stop)
+            return self._buffer[index]
+        if index < 0:
+            self._fill(float('inf'))
+        else:
+            self._fill(index + 1)
+        return self._buffer[index]
+
+    def __setitem__(self, index, value):
+        self._buffer[index] = value
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            self._fill(index.stop if index.stop is not None else float('inf'))
+        else:
+            self._fill(index + 1)
+        del self._buffer[index]
+
+    def insert(self, index, value):
+        self._buffer.insert(index, value)
+
+
+def compact_canvas():
+    """Canvas class that compresses every page's content when the page is done
+
+    reportlab compresses page streams only when the document is saved;
+    this applies the same filters right away, so a finished page is held
+    compressed.  Pages are left to reportlab when page compression is off.
+    """
+    global _CompactCanvas
+    if _CompactCanvas is None:
+        from reportlab import rl_config
+        from reportlab.pdfbase.pdfdoc import PDFArray, PDFBase85Encode, PDFName, PDFStream, PDFZCompress
+        from reportlab.pdfgen.canvas import Canvas
+
+        class CompactCanvas(Canvas):
+            def showPage(self):
+                Canvas.showPage(self)
+                page = self._doc.Pages.pages[-1]
+                if page.compression and page.stream:
+                    # the filters PDFPage would use, applied last to first;
+                    # a stream that has a Filter already is written as it is
+                    filters = [PDFBase85Encode, PDFZCompress] if rl_config.useA85 else [PDFZCompress]
+                    content = page.stream
+                    for f in reversed(filters):
+                        content = f.encode(content)
+                    stream = PDFStream(content=content)
+                    stream.dictionary['Filter'] = PDFArray([PDFName(f.pdfname) for f in filters])
+                    stream.__Comment__ = 'page stream'
+                    page.Contents = stream
+                    page.stream = None
+
+        _CompactCanvas = CompactCanvas
+    return _CompactCanvas
+
+
+def build_streaming(doc, flowables, **kwargs):
+    """doc.build() over an iterable of flowables, consuming it lazily
+
+    Finished pages are held compressed (see compact_canvas()) unless
+    kwargs name another canvasmaker.
+    """
+    kwargs.setdefault('canvasmaker', compact_canvas())
+    doc.build(FlowableStream(flowables), **kwargs)
+    return doc
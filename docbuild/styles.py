@@ -0,0 +1,124 @@
+"""Frozen, per-theme stylesheet registry
+
+A generator's create_styles() builds a reportlab StyleSheet1 from
+getSampleStyleSheet() plus a dozen or so ParagraphStyles.  Decorated with
+@stylesheet(theme), it runs once per process: the result is frozen and
+every later call, from any build in the process, returns the same sheet.
+Forked workers inherit the parent's sheets; spawned workers build their
+own once.
+
+Frozen styles reject attribute assignment, and a frozen sheet rejects
+add(), so builds sharing a sheet cannot change each other's styles.  A
+derived style is made with clone(), which returns an ordinary, mutable
+style.  Style inheritance needs no work at lookup time: reportlab copies a
+parent's attributes into the child when it is created.
+"""
+
+from functools import wraps
+
+_themes = {}
+_frozen_classes = {}
+
+
+class FrozenError(TypeError):
+    """Raised on an attempt to modify a frozen style or stylesheet"""
+
+
+class _FrozenStyleMixin(object):
+    def __setattr__(self, name, value):
+        raise FrozenError("style %r is frozen; clone() it to derive a new style" % self.name)
+
+    def __delattr__(self, name):
+        raise FrozenError("style %r is frozen" % self.name)
+
+    def clone(self, name, parent=None, **kwds):
+        base = type(self).__bases__[1]
+        style = base.__new__(base)
+        style.__dict__.update(self.__dict__)
+        style.name = name
+        style.parent = parent if parent is not None else self
+        style._setKwds(**kwds)
+        return style
+
+
+def _frozen_class(cls):
+    """The frozen counterpart of a PropertySet subclass, created on first use
+
+    The classes are published in this module so frozen styles pickle.
+    """
+    frozen = _frozen_classes.get(cls)
+    if frozen is None:
+        name = 'Frozen' + cls.__name__
+        frozen = type(name, (_FrozenStyleMixin, cls), {'__module__': __name__})
+        globals()[name] = _frozen_classes[cls] = frozen
+    return frozen
+
+
+def freeze_style(style):
+    """Make style (and its parent chain) read-only in place"""
+    if isinstance(style, _FrozenStyleMixin):
+        return style
+    parent = style.__dict__.get('parent')
+    if parent is not None:
+        freeze_style(parent)
+    object.__setattr__(style, '__class__', _frozen_class(type(style)))
+    return style
+
+
+def freeze_stylesheet(styles):
+    """Return a read-only copy of the StyleSheet1 styles with frozen styles"""
+    return _rebuild_stylesheet(
+        dict((name, freeze_style(style)) for name, style in styles.byName.items()),
+        dict((alias, freeze_style(style)) for alias, style in styles.byAlias.items()))
+
+
+_FrozenStyleSheet = None
+
+
+def _rebuild_stylesheet(by_name, by_alias):
+    frozen = _frozen_sheet_class()()
+    frozen.byName = by_name
+    frozen.byAlias = by_alias
+    return frozen
+
+
+def _frozen_sheet_class():
+    global _FrozenStyleSheet, FrozenStyleSheet
+    if _FrozenStyleSheet is None:
+        from reportlab.lib.styles import StyleSheet1
+
+        class FrozenStyleSheet(StyleSheet1):
+            """StyleSheet1 whose set of styles cannot change"""
+
+            def add(self, style, alias=None):
+                raise FrozenError("stylesheet is frozen; cannot add %r" % style.name)
+
+            def __reduce__(self):
+                return _rebuild_stylesheet, (self.byName, self.byAlias)
+
+        _FrozenStyleSheet = FrozenStyleSheet
+    return _FrozenStyleSheet
+
+
+def stylesheet(theme):
+    """Decorator making a create_styles() function a memoized frozen sheet
+
+    The decorated function builds the sheet for theme at most once per
+    process and returns that same frozen sheet on every call.
+    """
+    def decorate(create):
+        entry = _themes[theme] = {'create': create, 'sheet': None}
+
+        @wraps(create)
+        def cached():
+            if entry['sheet'] is None:
+                entry['sheet'] = freeze_stylesheet(create())
+            return entry['sheet']
+        cached.theme = theme
+        return cached
+    return decorate
+
+
+def registered_themes():
+    """Names of the themes registered so far"""
+    return sorted(_themes)
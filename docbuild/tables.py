@@ -0,0 +1,318 @@
+"""Data-driven tables
+
+DataTable draws row-oriented data, a list of dicts with one per row, in
+columns described by Column objects and styled by a TableTheme.  Unlike
+reportlab's Table it is meant for long tables:
+
+* Column widths come from measuring every cell once.  They are cached by
+  the table's fingerprint, which section builds compute anyway, so a
+  table built again (to fingerprint its section and then to render it,
+  or in a later build in the same process) is measured once.
+* Row heights are computed once per width and a split only slices them,
+  so a table of thousands of rows is split page by page in linear time
+  instead of being measured again for every page.
+
+The header row is repeated at the top of every page a table continues on.
+"""
+
+import copy
+import hashlib
+from bisect import bisect_right
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus.flowables import Flowable
+
+from docbuild.fingerprint import fingerprint_style
+from docbuild.flowables import break_lines
+
+# tables whose column widths are kept; the oldest are dropped first
+MAX_CACHED = 256
+
+_widths = {}
+
+
+def measure(texts, fontName, fontSize):
+    """Width of the widest of texts in the given font"""
+    return max([stringWidth(text, fontName, fontSize) for text in texts] or [0])
+
+
+def _share(widths, flexible, natural, minimum, available):
+    """Share what the other columns leave of available among the flexible
+    ones, in proportion to their natural widths but never below their minimum"""
+    flexible = list(flexible)
+    while flexible:
+        room = available - sum(width for index, width in enumerate(widths) if index not in flexible)
+        total = sum(natural[index] for index in flexible) or 1
+        pinned = [index for index in flexible if room * natural[index] / total < minimum[index]]
+        if not pinned:
+            for index in flexible:
+                widths[index] = room * natural[index] / total
+            return
+        for index in pinned:
+            widths[index] = minimum[index]
+            flexible.remove(index)
+
+
+def fit_widths(natural, minimum, wrap, available):
+    """Column widths for a table available wide
+
+    natural and minimum are per-column widths (the widest cell and the
+    widest word); wrap says which columns may wrap.  Columns that do not
+    wrap keep their natural width.  The wrapping columns share the rest in
+    proportion to their natural widths, but never go below their minimum,
+    so the table fills the width whether it has room to spare or not.
+
+    When the columns that do not wrap leave the others less than their
+    minimum, those keep their minimum and the columns that do not wrap
+    share the rest the same way (and wrap after all).  A table whose
+    minimum widths add up to more than available raises LayoutError.
+    """
+    from reportlab.platypus.doctemplate import LayoutError
+
+    if sum(minimum) > available:
+        raise LayoutError("table needs %.1f points, only %.1f available" % (sum(minimum), available))
+    widths = list(natural)
+    fixed = [index for index, wraps in enumerate(wrap) if not wraps]
+    if len(fixed) == len(natural):
+        fixed = []
+    _share(widths, [index for index in range(len(natural)) if index not in fixed], natural, minimum, available)
+    if fixed and sum(widths) > available:
+        _share(widths, fixed, natural, minimum, available)
+    return widths
+
+
+class Column(object):
+    """One column of a DataTable
+
+    key picks the value out of each row; title heads the column.  Values
+    that are not strings are formatted with format ('%.2f', '%d%%', ...,
+    or str.format style when it has braces, '{:,.0f}'); a missing or None
+    value is an empty cell.  align is 'left', 'right' or
+    'centre'.  Columns with wrap=False keep the width of their widest cell;
+    the others share the rest of the width and wrap by word.
+    """
+
+    def __init__(self, key, title=None, format='%s', align='left', wrap=True):
+        self.key = key
+        self.title = key if title is None else title
+        self.format = format
+        self.align = align
+        self.wrap = wrap
+
+    def __repr__(self):
+        return 'Column(%r, %r, %r, %r, %r)' % (self.key, self.title, self.format, self.align, self.wrap)
+
+    def text(self, row):
+        value = row.get(self.key)
+        if value is None:
+            return ''
+        if isinstance(value, str):
+            return value
+        if '{' in self.format:
+            return self.format.format(value)
+        return self.format % value
+
+
+class TableTheme(object):
+    """How a DataTable looks
+
+    header_style and body_style are ParagraphStyles; their font, leading
+    and textColor are used, and the table takes its spaceBefore from
+    header_style and its spaceAfter from body_style.  header_fill fills
+    the header row; row_fills cycle over the body rows (None leaves a row
+    unfilled).  rule_color, if set, rules off the header and, with
+    row_rules, separates the body rows.  padding surrounds every cell's
+    text.
+    """
+
+    def __init__(self, header_style, body_style, header_fill=None, row_fills=(None,), rule_color=None,
+                 row_rules=False, padding=4):
+        self.header_style = header_style
+        self.body_style = body_style
+        self.header_fill = header_fill
+        self.row_fills = tuple(row_fills) or (None,)
+        self.rule_color = rule_color
+        self.row_rules = row_rules
+        self.padding = padding
+
+    def fingerprint(self):
+        return '%s:%s:%r' % (fingerprint_style(self.header_style), fingerprint_style(self.body_style),
+                             [str(value) for value in (self.header_fill, self.row_fills, self.rule_color,
+                                                       self.row_rules, self.padding)])
+
+
+class DataTable(Flowable):
+    """A table of rows (dicts) in columns, split between rows across pages
+
+    columns are Column objects or keys.  With repeat_header every page the
+    table continues on starts with the header row again.
+    """
+
+    def __init__(self, rows, columns, theme, repeat_header=True):
+        Flowable.__init__(self)
+        self.data = list(rows)
+        self.columns = [column if isinstance(column, Column) else Column(column) for column in columns]
+        self.theme = theme
+        self.repeat_header = repeat_header
+        self.cells = [[column.text(row) for column in self.columns] for row in self.data]
+        self.header = any(column.title for column in self.columns)
+        self._fingerprint = None
+        self._widths = None
+        self._layout = None
+        self._start, self._end = 0, len(self.cells)
+        self._show_header = self.header
+
+    def __repr__(self):
+        return '<DataTable %d rows x %d columns>' % (self._end - self._start, len(self.columns))
+
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = '%r:%r:%s:%r' % (self.columns, self.cells, self.theme.fingerprint(),
+                                                 self.repeat_header)
+        return self._fingerprint
+
+    def measure(self):
+        """(natural, minimum) width of every column, padding included"""
+        if self._widths is None:
+            key = hashlib.sha1(self.fingerprint().encode('utf-8')).hexdigest()
+            self._widths = _widths.get(key)
+            if self._widths is None:
+                if len(_widths) >= MAX_CACHED:
+                    del _widths[next(iter(_widths))]
+                self._widths = _widths[key] = self._measure()
+        return self._widths
+
+    def _measure(self):
+        header, body = self.theme.header_style, self.theme.body_style
+        pad = 2 * self.theme.padding
+        natural, minimum = [], []
+        for index, column in enumerate(self.columns):
+            texts = [cells[index] for cells in self.cells]
+            words = [word for text in texts for word in text.split()]
+            title_words = column.title.split()
+            natural.append(pad + max(measure(texts, body.fontName, body.fontSize),
+                                     measure([column.title], header.fontName, header.fontSize)))
+            minimum.append(pad + max(measure(words, body.fontName, body.fontSize),
+                                     measure(title_words, header.fontName, header.fontSize)))
+        return natural, minimum
+
+    def _lines(self, text, style, width, natural):
+        if width >= natural or not text:
+            return [text]
+        return [''.join(value for fontName, value in pieces)
+                for pieces in break_lines([(style.fontName, text)], style.fontSize, width)]
+
+    def _row(self, cells, style, widths, natural):
+        """(lines per cell, height) of one row"""
+        pad = self.theme.padding
+        lines = [self._lines(text, style, width - 2 * pad, width_natural - 2 * pad)
+                 for text, width, width_natural in zip(cells, widths, natural)]
+        return lines, max(len(cell) for cell in lines) * style.leading + 2 * pad
+
+    def _compute(self, availWidth):
+        natural, minimum = self.measure()
+        widths = fit_widths(natural, minimum, [column.wrap for column in self.columns], availWidth)
+        header = self._row([column.title for column in self.columns], self.theme.header_style, widths, natural)
+        rows = []
+        bottoms = []
+        top = 0
+        body = self.theme.body_style
+        for cells in self.cells:
+            lines, height = self._row(cells, body, widths, natural)
+            top += height
+            rows.append(lines)
+            bottoms.append(top)
+        return availWidth, widths, header, rows, bottoms
+
+    def _base(self):
+        bottoms = self._layout[4]
+        return bottoms[self._start - 1] if self._start else 0
+
+    def wrap(self, availWidth, availHeight):
+        if self._layout is None or self._layout[0] != availWidth:
+            self._layout = self._compute(availWidth)
+        availWidth, widths, header, rows, bottoms = self._layout
+        self.width = sum(widths)
+        body = bottoms[self._end - 1] - self._base() if self._end > self._start else 0
+        self.height = body + (header[1] if self._show_header else 0)
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.theme.header_style.spaceBefore
+
+    def getSpaceAfter(self):
+        return self.theme.body_style.spaceAfter
+
+    def _part(self, start, end, show_header):
+        part = copy.copy(self)
+        # a fresh flowable as far as the doc template is concerned
+        part.__dict__.pop('_postponed', None)
+        part._start, part._end, part._show_header = start, end, show_header
+        return part
+
+    def split(self, availWidth, availHeight):
+        self.wrap(availWidth, availHeight)
+        if self.height <= availHeight:
+            return [self]
+        availWidth, widths, header, rows, bottoms = self._layout
+        room = availHeight - (header[1] if self._show_header else 0)
+        fits = bisect_right(bottoms, self._base() + room, self._start, self._end)
+        if fits == self._start:
+            return []
+        return [self._part(self._start, fits, self._show_header),
+                self._part(fits, self._end, self.header and self.repeat_header)]
+
+    def draw(self):
+        availWidth, widths, header, rows, bottoms = self._layout
+        theme = self.theme
+        canv = self.canv
+        lefts = [sum(widths[:index]) for index in range(len(widths))]
+        top = self.height
+        bands = []
+        if self._show_header:
+            bands.append((header[0], top - header[1], header[1], theme.header_style, theme.header_fill))
+            top -= header[1]
+        base = self._base()
+        for index in range(self._start, self._end):
+            height = bottoms[index] - (bottoms[index - 1] if index else 0)
+            bands.append((rows[index], top - (bottoms[index] - base), height, theme.body_style,
+                          theme.row_fills[index % len(theme.row_fills)]))
+
+        canv.saveState()
+        for lines, y, height, style, fill in bands:
+            if fill is not None:
+                canv.setFillColor(fill)
+                canv.rect(0, y, self.width, height, stroke=0, fill=1)
+        if theme.rule_color is not None:
+            canv.setStrokeColor(theme.rule_color)
+            canv.setLineWidth(0.5)
+            # a rule along the top of every band but the first
+            ruled = bands[1:] if theme.row_rules else bands[1:2] if self._show_header else []
+            for lines, y, height, style, fill in ruled:
+                canv.line(0, y + height, self.width, y + height)
+            canv.line(0, 0, self.width, 0)
+        canv.restoreState()
+
+        text = canv.beginText()
+        font = color = None
+        pad = theme.padding
+        for lines, y, height, style, fill in bands:
+            if (style.fontName, style.fontSize, style.leading) != font:
+                font = (style.fontName, style.fontSize, style.leading)
+                text.setFont(*font)
+            if style.textColor != color:
+                color = style.textColor
+                text.setFillColor(color)
+            for column, left, width, cell in zip(self.columns, lefts, widths, lines):
+                baseline = y + height - pad - style.fontSize
+                for line in cell:
+                    if column.align == 'right':
+                        x = left + width - pad - stringWidth(line, style.fontName, style.fontSize)
+                    elif column.align == 'centre':
+                        x = left + (width - stringWidth(line, style.fontName, style.fontSize)) / 2.0
+                    else:
+                        x = left + pad
+                    text.setTextOrigin(x, baseline)
+                    text.textOut(line)
+                    baseline -= style.leading
+        canv.drawText(text)
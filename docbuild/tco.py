@@ -0,0 +1,342 @@
+"""Monte Carlo total cost of ownership of robot fleets
+
+The price ranges the site advertises, per robot category, are ranges:
+what a fleet costs to own and what it earns depend on where in them a
+buyer lands, how busy the robots are and how large the fleet is.  This
+module simulates that.  A scenario draws, uniformly from its range:
+
+* the robot's price and the fleet's one-off integration cost
+  (basePrice and integrationCost of robotCategories in Robots.jsx),
+* yearly maintenance as a share of the price and revenue efficiency
+  (the budget to premium models of the ROI calculator's roiData),
+* the hourly revenue of a task (the calculator's task types),
+* utilization, the hours a robot works on paid tasks per working day,
+  and the fleet size, UTILIZATION and FLEET_SIZE.
+
+As in the calculator, a year has WORK_DAYS working days and a working
+hour costs ENERGY_PER_HOUR in energy.  Revenue pays the protocol's fees
+(docbuild.fees, gas aside) and the fleet is held for YEARS.  TCOModel.outcomes() turns arrays of scenarios into
+per-robot outcomes: the cost of ownership, its cost per operating hour,
+net value (revenue after fees less cost) and months to pay back.
+
+simulate() draws scenarios in shards of SHARD_SIZE, each from its own
+seed spawned from one SeedSequence, and runs the shards in a process pool.
+A shard returns a histogram per outcome over bounds fixed in advance
+rather than its samples, so shards merge by adding counts and memory and
+IPC stay flat however many scenarios run; percentiles are read from the
+merged histograms to within 1/BINS of the outcome's range.  The same seed
+gives the same results whatever the pool size.  simulated(), which the
+section builders call, uses the pool size set by simulating(), so a
+document can hand the simulation its build's --jobs.  NumPy is only
+imported when something is simulated.
+"""
+
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from docbuild.fees import FEES
+from docbuild.jsx import extract_const
+from docbuild.robots import ROBOTS_JSX
+
+# As the ROI calculator of Robots.jsx has them
+WORK_DAYS = 260
+ENERGY_PER_HOUR = 0.5
+# Years a fleet is held, and the hours a robot works per working day and
+# the robots in a fleet as (low, high)
+YEARS = 5
+UTILIZATION = (4, 12)
+FLEET_SIZE = (1, 20)
+
+# Scenarios per category in the documents, and their seed
+SCENARIOS = 250000
+SEED = 2025
+SHARD_SIZE = 50000
+BINS = 4096
+PERCENTILES = (10, 50, 90)
+
+OUTCOMES = ('tco', 'hourly_cost', 'net_value', 'payback')
+
+
+class CostRanges(object):
+    """What one category of robot costs and earns, as (low, high) ranges
+
+    price and integration are USD, integration per fleet; maintenance is
+    a yearly share of the price, revenue USD per working hour and
+    efficiency a factor on revenue.
+    """
+
+    def __init__(self, category, price, integration, maintenance, revenue, efficiency):
+        self.category = category
+        self.price = tuple(price)
+        self.integration = tuple(integration)
+        self.maintenance = tuple(maintenance)
+        self.revenue = tuple(revenue)
+        self.efficiency = tuple(efficiency)
+
+    def __repr__(self):
+        return 'CostRanges(%r, %r, %r, %r, %r, %r)' % (self.category, self.price, self.integration,
+                                                       self.maintenance, self.revenue, self.efficiency)
+
+
+def _span(values):
+    values = list(values)
+    return min(values), max(values)
+
+
+def jsx_ranges(path=ROBOTS_JSX):
+    """CostRanges of every robot category in Robots.jsx, in page order"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    calculator = dict((robot.get('icon'), robot) for robot in extract_const(source, 'roiData').values())
+    ranges = []
+    for category in extract_const(source, 'robotCategories'):
+        robot = calculator.get(category.get('icon'))
+        if robot is None:
+            continue
+        models = list(robot['models'].values())
+        ranges.append(CostRanges(
+            category['name'],
+            (category['basePrice']['min'], category['basePrice']['max']),
+            (category['integrationCost']['min'], category['integrationCost']['max']),
+            _span(model['maintenance'] / float(model['price']) for model in models),
+            _span(task['hourlyRevenue'] for task in robot['taskTypes'].values()),
+            _span(model['efficiency'] for model in models)))
+    return ranges
+
+
+class TCOModel(object):
+    """The assumptions scenarios are drawn and evaluated under
+
+    utilization (hours per working day) and fleet_size are (low, high)
+    ranges; fee_rate is the percent of revenue paid in fees.  Payback is
+    capped at twice the holding period, which also stands for never.
+    """
+
+    def __init__(self, years=YEARS, utilization=UTILIZATION, fleet_size=FLEET_SIZE, fee_rate=None):
+        self.years = years
+        self.utilization = tuple(utilization)
+        self.fleet_size = tuple(fleet_size)
+        self.fee_rate = FEES.fee_rate if fee_rate is None else fee_rate
+
+    def __repr__(self):
+        return 'TCOModel(%r, %r, %r, %r)' % (self.years, self.utilization, self.fleet_size, self.fee_rate)
+
+    @property
+    def months(self):
+        return self.years * 12
+
+    def ranges(self, costs):
+        """(low, high) of every scenario parameter for a category"""
+        return {'price': costs.price, 'integration': costs.integration, 'maintenance': costs.maintenance,
+                'revenue': costs.revenue, 'efficiency': costs.efficiency, 'utilization': self.utilization,
+                'fleet': self.fleet_size}
+
+    def sample(self, costs, count, rng):
+        """count scenarios of a category drawn with rng, as arrays by parameter"""
+        scenarios = {}
+        for name, (low, high) in sorted(self.ranges(costs).items()):
+            if name == 'fleet':
+                scenarios[name] = rng.integers(low, high, count, endpoint=True).astype(float)
+            else:
+                scenarios[name] = rng.uniform(low, high, count)
+        return scenarios
+
+    def outcomes(self, scenarios):
+        """Per-robot outcomes of scenarios, as arrays by name in OUTCOMES
+
+        tco (purchase, integration, maintenance and energy) is USD over
+        the holding period, hourly_cost USD per working hour, net_value
+        USD after fees and cost, payback months.
+        """
+        import numpy as np
+
+        hours = scenarios['utilization'] * WORK_DAYS
+        earned = hours * scenarios['revenue'] * scenarios['efficiency'] * (1 - self.fee_rate / 100.0)
+        upkeep = scenarios['price'] * scenarios['maintenance'] + hours * ENERGY_PER_HOUR
+        capital = scenarios['price'] + scenarios['integration'] / scenarios['fleet']
+        tco = capital + upkeep * self.years
+        margin = (earned - upkeep) / 12
+        limit = 2 * self.months
+        with np.errstate(divide='ignore'):
+            payback = np.where(margin > 0, np.minimum(capital / margin, limit), limit)
+        return {'tco': tco, 'hourly_cost': tco / (hours * self.years), 'net_value': earned * self.years - tco,
+                'payback': payback}
+
+    def bounds(self, costs):
+        """(low, high) of every outcome of a category
+
+        Each outcome is monotonic in every parameter, so its extremes are
+        at corners of the parameter ranges.
+        """
+        import numpy as np
+
+        ranges = sorted(self.ranges(costs).items())
+        corners = np.array(list(itertools.product(*[span for name, span in ranges])), dtype=float)
+        outcomes = self.outcomes(dict((name, corners[:, index]) for index, (name, span) in enumerate(ranges)))
+        bounds = {}
+        for name in OUTCOMES:
+            low, high = float(outcomes[name].min()), float(outcomes[name].max())
+            bounds[name] = (low, high if high > low else low + 1)
+        return bounds
+
+
+class Distribution(object):
+    """Histograms of the outcomes of a category's simulated scenarios
+
+    bounds are the (low, high) of each outcome, counts its BINS counts.
+    """
+
+    def __init__(self, category, bounds, counts):
+        self.category = category
+        self.bounds = bounds
+        self.counts = counts
+
+    def __repr__(self):
+        return '<Distribution %s: %d scenarios>' % (self.category, self.scenarios)
+
+    @property
+    def scenarios(self):
+        return int(self.counts[OUTCOMES[0]].sum())
+
+    def percentile(self, name, q):
+        """The q-th percentile of an outcome"""
+        import numpy as np
+
+        counts = self.counts[name]
+        low, high = self.bounds[name]
+        width = (high - low) / len(counts)
+        cumulative = np.cumsum(counts)
+        target = q / 100.0 * cumulative[-1]
+        index = min(int(np.searchsorted(cumulative, target)), len(counts) - 1)
+        before = cumulative[index - 1] if index else 0
+        inside = (target - before) / counts[index] if counts[index] else 0
+        return low + (index + inside) * width
+
+    def share_below(self, name, values):
+        """Fraction of scenarios whose outcome is at most each of values"""
+        import numpy as np
+
+        counts = self.counts[name]
+        low, high = self.bounds[name]
+        edges = np.linspace(low, high, len(counts) + 1)
+        cumulative = np.concatenate([[0], np.cumsum(counts)]) / float(counts.sum())
+        return np.interp(values, edges, cumulative)
+
+
+def histogram(values, bounds, bins=BINS):
+    """Counts of values in bins equal bins between bounds, ends included"""
+    import numpy as np
+
+    low, high = bounds
+    index = ((values - low) * (bins / (high - low))).astype(np.intp)
+    np.clip(index, 0, bins - 1, out=index)
+    return np.bincount(index, minlength=bins)
+
+
+def _shard(job):
+    """Histograms of one shard of scenarios"""
+    import numpy as np
+
+    model, costs, bounds, count, seed = job
+    outcomes = model.outcomes(model.sample(costs, count, np.random.default_rng(seed)))
+    return dict((name, histogram(outcomes[name], bounds[name])) for name in OUTCOMES)
+
+
+def _shards(ranges, bounds, model, scenarios, seed, shard_size):
+    """(category index, shard job) for every shard of every category"""
+    import numpy as np
+
+    shards = int(math.ceil(scenarios / float(shard_size)))
+    seeds = np.random.SeedSequence(seed).spawn(len(ranges))
+    for index, (costs, category_bounds, category_seed) in enumerate(zip(ranges, bounds, seeds)):
+        for number, shard_seed in enumerate(category_seed.spawn(shards)):
+            count = min(shard_size, scenarios - number * shard_size)
+            yield index, (model, costs, category_bounds, count, shard_seed)
+
+
+def simulate(ranges, scenarios=SCENARIOS, model=None, seed=SEED, jobs=1, shard_size=SHARD_SIZE):
+    """Distribution of scenarios simulated per CostRanges of ranges
+
+    jobs is the pool size (0 = one per CPU, 1 = simulate in this process).
+    """
+    model = model or TCOModel()
+    ranges = list(ranges)
+    bounds = [model.bounds(costs) for costs in ranges]
+    placed = list(_shards(ranges, bounds, model, scenarios, seed, shard_size))
+    if jobs == 1 or len(placed) < 2:
+        done = [_shard(job) for index, job in placed]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(placed))) as pool:
+            done = list(pool.map(_shard, [job for index, job in placed]))
+    merged = [dict((name, 0) for name in OUTCOMES) for costs in ranges]
+    for (index, job), counts in zip(placed, done):
+        for name in OUTCOMES:
+            merged[index][name] = merged[index][name] + counts[name]
+    return [Distribution(costs.category, category_bounds, counts)
+            for costs, category_bounds, counts in zip(ranges, bounds, merged)]
+
+
+_simulated = {}
+_jobs = 1
+
+
+@contextmanager
+def simulating(jobs):
+    """Run simulated() with a pool of jobs (as simulate() counts them) inside the block"""
+    global _jobs
+    previous = _jobs
+    _jobs = jobs
+    try:
+        yield jobs
+    finally:
+        _jobs = previous
+
+
+def simulated(ranges, scenarios=SCENARIOS, model=None, seed=SEED):
+    """simulate() with the pool size of simulating(), remembered for the same arguments
+
+    Section builders run more than once per build (see
+    docbuild.build.build_sections); the simulation only runs once.  The
+    pool size does not change the result, so it is not part of the key.
+    """
+    model = model or TCOModel()
+    key = repr((ranges, scenarios, model, seed))
+    if key not in _simulated:
+        _simulated.clear()
+        _simulated[key] = simulate(ranges, scenarios, model, seed, _jobs)
+    return _simulated[key]
+
+
+def percentile_rows(distributions, name, percentiles=PERCENTILES):
+    """Table rows of an outcome's percentiles: category and, keyed by each percentile, its value"""
+    return [dict([('category', distribution.category)] +
+                 [(q, float(distribution.percentile(name, q))) for q in percentiles])
+            for distribution in distributions]
+
+
+def summary_rows(distributions, model=None):
+    """Table rows of the median hourly cost and payback of each category
+
+    Rows have the category, hourly_cost, payback (months, or a string when
+    the median robot does not pay back within the holding period) and
+    paid_back, the percent of scenarios that do.
+    """
+    model = model or TCOModel()
+    rows = []
+    for distribution in distributions:
+        payback = float(distribution.percentile('payback', 50))
+        rows.append({'category': distribution.category,
+                     'hourly_cost': float(distribution.percentile('hourly_cost', 50)),
+                     'payback': payback if payback <= model.months else "over %d months" % model.months,
+                     'paid_back': float(distribution.share_below('payback', model.months) * 100)})
+    return rows
+
+
+def payback_curves(distributions, model=None, step=1):
+    """Per category, (month, percent of scenarios paid back by then) points over the holding period"""
+    model = model or TCOModel()
+    months = list(range(0, model.months + 1, step))
+    return [list(zip(months, distribution.share_below('payback', months) * 100)) for distribution in distributions]
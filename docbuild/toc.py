@@ -0,0 +1,162 @@
+"""Page numbers for tables of contents
+
+A table of contents (flowables.Contents) shows the page each section
+starts on, which is only known once everything in front of that section
+has been laid out.  Rather than laying the document out twice the way
+multiBuild() does:
+
+Single-pass builds draw each number as a PDF form that is only defined
+when the document is saved.  A mark in front of every section records the
+page it starts on, and the canvas (contents_canvas()) fills the forms in
+from those records in save(), so the numbers are exact after one pass.
+
+Section builds render the contents on its own, so it is drawn from a
+PageMap of where sections started in the previous build, worked out from
+the page counts in the cache manifest.  build_sections() compares those
+with the real start pages once every section is rendered and re-renders
+only the sections that looked pages up, and only when one of the pages
+they show has moved.
+"""
+
+import hashlib
+from contextlib import contextmanager
+
+
+def start_pages(titles, counts):
+    """Map each section title to its first page, given every section's page count"""
+    pages = {}
+    page = 1
+    for title, count in zip(titles, counts):
+        pages.setdefault(title, page)
+        page += count
+    return pages
+
+
+def estimate_pages(titles, manifest):
+    """Start pages for titles from the page counts of a previous build's manifest
+
+    Sections the manifest does not know about are assumed to be one page.
+    """
+    counts = {}
+    for entry in manifest:
+        counts.setdefault(entry['title'], entry['pages'])
+    return start_pages(titles, [counts.get(title, 1) for title in titles])
+
+
+class PageMap(object):
+    """Section start pages as seen by the contents built from them
+
+    Every lookup is recorded, so a build can tell which sections depend on
+    the map and whether the pages they show are still right.
+    """
+
+    def __init__(self, pages=None):
+        self.pages = dict(pages or {})
+        self.lookups = 0
+        self.looked_up = set()
+
+    def get(self, title):
+        self.lookups += 1
+        self.looked_up.add(title)
+        return self.pages.get(title)
+
+    def stale(self, actual):
+        """Whether any page looked up so far differs from actual"""
+        return any(self.pages.get(title) != actual.get(title) for title in self.looked_up)
+
+
+_active = None
+
+
+def active():
+    """The PageMap contents are built from, or None in a single-pass build"""
+    return _active
+
+
+@contextmanager
+def using(pages):
+    """Build contents from the PageMap pages inside the block"""
+    global _active
+    previous = _active
+    _active = pages
+    try:
+        yield pages
+    finally:
+        _active = previous
+
+
+def lookup(titles):
+    """Page numbers for titles from the active map; None when there is none"""
+    if _active is None:
+        return None
+    return [_active.get(title) for title in titles]
+
+
+def form_name(title):
+    return 'SectionPage' + hashlib.sha1(title.encode('utf-8')).hexdigest()[:16]
+
+
+_SectionStart = None
+_ContentsCanvas = None
+
+
+def section_mark(title):
+    """A never-drawn flowable recording the page the section title starts on
+
+    It only has an effect on a contents_canvas().
+    """
+    global _SectionStart
+    if _SectionStart is None:
+        from reportlab.platypus.doctemplate import ActionFlowable
+
+        class SectionStart(ActionFlowable):
+            def __init__(self, title):
+                ActionFlowable.__init__(self)
+                self.title = title
+
+            def apply(self, doc):
+                pages = getattr(doc.canv, 'section_pages', None)
+                if pages is not None:
+                    pages.setdefault(self.title, doc.page)
+
+        _SectionStart = SectionStart
+    return _SectionStart(title)
+
+
+def contents_canvas():
+    """compact_canvas() class whose save() defines the page number forms contents used"""
+    global _ContentsCanvas
+    if _ContentsCanvas is None:
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from docbuild.stream import compact_canvas
+
+        Canvas = compact_canvas()
+
+        class ContentsCanvas(Canvas):
+            def __init__(self, *args, **kwargs):
+                Canvas.__init__(self, *args, **kwargs)
+                self.section_pages = {}
+                self._page_forms = {}
+
+            def page_form(self, title, style):
+                """Name of the form showing the first page of section title"""
+                name = form_name(title)
+                self._page_forms.setdefault(name, (title, style))
+                return name
+
+            def save(self):
+                for name, (title, style) in sorted(self._page_forms.items()):
+                    page = self.section_pages.get(title)
+                    number = '' if page is None else str(page)
+                    width = stringWidth(number, style.fontName, style.fontSize)
+                    # the number is drawn right-aligned at the form's origin
+                    self.beginForm(name, -width - 1, -style.fontSize, 1, style.fontSize * 2)
+                    if number:
+                        self.setFont(style.fontName, style.fontSize)
+                        self.setFillColor(style.textColor)
+                        self.drawRightString(0, 0, number)
+                    self.endForm()
+                Canvas.save(self)
+
+        _ContentsCanvas = ContentsCanvas
+    return _ContentsCanvas
@@ -0,0 +1,215 @@
+"""Opt-in build tracing in Chrome trace-event format
+
+With a Tracer installed, every flowable's wrap/split/draw, every page
+callback, every canvas save and every section of a build is recorded as a
+complete ("X") event.  Tracer.save() writes the events as a JSON object
+that chrome://tracing, Perfetto and speedscope open directly.
+
+Nothing is patched unless install() is called, so an untraced build runs
+the stock reportlab code paths.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+
+_active = None
+_originals = {}
+
+
+def now():
+    return time.perf_counter_ns() // 1000
+
+
+class Tracer(object):
+    """Collects trace events for one process"""
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+        self._section = None
+        self._open = set()
+
+    def complete(self, name, cat, start, args=None):
+        """Record a span that began at start (a now() value) and ends now"""
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': start, 'dur': now() - start,
+                 'pid': self.pid, 'tid': threading.get_ident()}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, name, cat='build', **args):
+        start = now()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start, args)
+
+    def wrap_callback(self, callback, name):
+        """Return callback(canvas, doc) recording each call as a span"""
+        if callback is None:
+            return None
+
+        def traced(canvas, doc):
+            start = now()
+            try:
+                callback(canvas, doc)
+            finally:
+                self.complete(name, 'page', start, {'page': canvas.getPageNumber()})
+        return traced
+
+    def begin_section(self, title):
+        self.end_section()
+        self._section = (title, now())
+
+    def end_section(self):
+        """Close the open section span, if any"""
+        section = self._section
+        if section is not None:
+            title, start = section
+            self._section = None
+            self.complete(title, 'section', start)
+
+    def process_name(self, name):
+        self.events.append({'name': 'process_name', 'ph': 'M', 'pid': self.pid,
+                            'tid': threading.get_ident(), 'args': {'name': name}})
+
+    def extend(self, events):
+        """Add events recorded elsewhere, e.g. by a worker process"""
+        self.events.extend(events)
+
+    def save(self, path):
+        data = {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+def active():
+    """The installed Tracer, or None"""
+    return _active
+
+
+def _traced_method(cls, method, label, cat):
+    original = cls.__dict__[method]
+
+    def traced(self, *args, **kwargs):
+        tracer = _active
+        key = (id(self), label)
+        if tracer is None or key in tracer._open:
+            # untraced, or a subclass method delegating to its base class
+            return original(self, *args, **kwargs)
+        tracer._open.add(key)
+        start = now()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            tracer._open.discard(key)
+            tracer.complete('%s.%s' % (type(self).__name__, label), cat, start)
+    traced.__wrapped__ = original
+    return original, traced
+
+
+def _subclasses(cls):
+    yield cls
+    for sub in cls.__subclasses__():
+        yield from _subclasses(sub)
+
+
+def install(tracer):
+    """Make tracer the active Tracer and hook reportlab's layout entry points
+
+    Frames call wrap() and split() directly and every flowable class
+    defines its own, so those are hooked on each Flowable subclass that
+    exists at this point; drawOn() and Canvas.save() are hooked where they
+    are defined.  The generators' lazily imported groups (see
+    docbuild.lazy) are imported first, so the docbuild flowables they bind
+    exist by then.
+    """
+    global _active
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus.flowables import Flowable
+    from docbuild.lazy import load_all
+
+    load_all()
+
+    if not _originals:
+        hooks = [(Canvas, 'save', 'save', 'write')]
+        for cls in set(_subclasses(Flowable)):
+            for method, label in (('wrap', 'wrap'), ('split', 'split'), ('drawOn', 'draw')):
+                if method in cls.__dict__:
+                    hooks.append((cls, method, label, 'flowable'))
+        for cls, method, label, cat in hooks:
+            original, traced = _traced_method(cls, method, label, cat)
+            _originals[cls, method] = original
+            setattr(cls, method, traced)
+    _active = tracer
+    return tracer
+
+
+def uninstall():
+    """Remove the hooks installed by install()"""
+    global _active
+    for (cls, method), original in _originals.items():
+        setattr(cls, method, original)
+    _originals.clear()
+    _active = None
+
+
+@contextmanager
+def tracing(path, process_name='docbuild'):
+    """Trace everything inside the block and write the trace to path"""
+    tracer = Tracer()
+    tracer.process_name(process_name)
+    install(tracer)
+    try:
+        yield tracer
+    finally:
+        uninstall()
+        tracer.save(path)
+
+
+_SectionMark = None
+
+
+def section_mark(tracer, title):
+    """A never-drawn flowable that closes the previous section span and opens the next
+
+    Placed in front of each section's flowables, it is applied when the
+    layout engine reaches the section, so the spans cover layout time rather
+    than the moment the story happened to be read ahead.
+    """
+    global _SectionMark
+    if _SectionMark is None:
+        from reportlab.platypus.doctemplate import ActionFlowable
+
+        class SectionMark(ActionFlowable):
+            def __init__(self, tracer, title):
+                ActionFlowable.__init__(self)
+                self.tracer = tracer
+                self.title = title
+
+            def apply(self, doc):
+                self.tracer.begin_section(self.title)
+
+        _SectionMark = SectionMark
+    return _SectionMark(tracer, title)
+
+
+def _story_span(tracer, title, build, styles):
+    with tracer.span(title, 'story'):
+        return build(styles)
+
+
+def traced_story(tracer, spec, styles, marks=()):
+    """spec.iter_story(styles, marks) with section marks and story-building spans
+
+    The story span times the section builder call; for a generator builder
+    that is only its creation, the rest shows up inside the section span.
+    """
+    return spec.iter_story(styles, [partial(section_mark, tracer)] + list(marks), partial(_story_span, tracer))
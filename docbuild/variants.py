@@ -0,0 +1,264 @@
+"""Build every document variant in one run
+
+A variant is one output PDF: a generator's DocumentSpec, optionally
+translated into a locale.  build_variants() imports reportlab and the
+generator modules and builds each theme's frozen stylesheet once in the
+parent process, then fans the variants out over a process pool whose
+workers fork with all of that already loaded.
+
+Translations are message catalogs in locales/<lang>/<document>.json:
+
+    {"messages": {"<source paragraph markup>": "<translated markup>", ...}}
+
+Paragraphs, list items and section titles whose text has no non-empty
+translation are kept in the source language.
+"""
+
+import copy
+import importlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from docbuild.cache import SectionCache
+from docbuild.content import REPO_ROOT
+from docbuild.spec import DocumentSpec
+
+LOCALES_DIR = os.path.join(REPO_ROOT, 'locales')
+DEFAULT_OUT_DIR = os.path.join(REPO_ROOT, 'build', 'pdf')
+
+# document name -> generator module whose SPEC describes it
+DOCUMENTS = {
+    'whitepaper': 'generate_docs',
+    'technical-docs': 'generate_pdf',
+}
+
+
+class Variant(object):
+    """One output of a multi-variant build"""
+
+    def __init__(self, document, locale=None, catalog=None):
+        self.document = document
+        self.locale = locale
+        self.catalog = catalog
+
+    @property
+    def name(self):
+        if self.locale:
+            return '%s.%s' % (self.document, self.locale)
+        return self.document
+
+    def filename(self):
+        return 'TaskBoard-%s.pdf' % self.name
+
+    def spec(self):
+        spec = importlib.import_module(DOCUMENTS[self.document]).SPEC
+        if self.catalog is None:
+            return spec
+        return localize_spec(spec, self.locale, self.catalog)
+
+
+def load_catalog(path):
+    """Return the translated messages of a catalog file"""
+    with open(path, encoding='utf-8') as f:
+        messages = json.load(f).get('messages', {})
+    return dict((source, text) for source, text in messages.items() if text)
+
+
+def find_variants(documents=None, locales=None, locales_dir=LOCALES_DIR):
+    """The source-language variants plus one per catalog in locales_dir
+
+    documents and locales optionally restrict which variants are returned;
+    'en' selects the untranslated documents.
+    """
+    documents = list(documents or DOCUMENTS)
+    variants = []
+    if not locales or 'en' in locales:
+        variants.extend(Variant(document) for document in documents)
+    if os.path.isdir(locales_dir):
+        for locale in sorted(os.listdir(locales_dir)):
+            if locales and locale not in locales:
+                continue
+            for document in documents:
+                path = os.path.join(locales_dir, locale, document + '.json')
+                if os.path.exists(path):
+                    variants.append(Variant(document, locale, path))
+    return variants
+
+
+_catalogs = {}
+
+
+def _messages(catalog):
+    messages = _catalogs.get(catalog)
+    if messages is None:
+        messages = _catalogs[catalog] = load_catalog(catalog)
+    return messages
+
+
+def forget_catalogs():
+    """Drop the catalogs read so far, so changed files are read again"""
+    _catalogs.clear()
+
+
+def translate_flowables(flowables, messages):
+    """Yield flowables with Paragraph, list item, contents, table, chart and caption text replaced from messages"""
+    from reportlab.platypus import Paragraph, KeepTogether
+    from docbuild.charts import Chart
+    from docbuild.flowables import Contents, ListBlock
+    from docbuild.images import Gallery
+    from docbuild.tables import DataTable
+
+    for flowable in flowables:
+        if type(flowable) is Paragraph and flowable.text in messages:
+            flowable = Paragraph(messages[flowable.text], flowable.style, bulletText=flowable.bulletText)
+        elif isinstance(flowable, ListBlock) and any(item in messages for item in flowable.items):
+            flowable = ListBlock([messages.get(item, item) for item in flowable.items], flowable.style,
+                                 flowable.bullet, flowable.numbered, flowable.start)
+        elif isinstance(flowable, Contents) and any(title in messages for title, style in flowable.entries):
+            # the entries name sections, which localize_spec() retitles the same way
+            flowable = Contents([(messages.get(title, title), style) for title, style in flowable.entries],
+                                flowable.style, flowable.leader)
+        elif isinstance(flowable, DataTable) and any(text in messages for text in table_texts(flowable)):
+            flowable = translate_table(flowable, messages)
+        elif isinstance(flowable, (Chart, Gallery)) and any(text in messages for text in flowable.texts()):
+            flowable = flowable.translated(messages)
+        elif isinstance(flowable, KeepTogether):
+            flowable = KeepTogether(list(translate_flowables(flowable._content, messages)),
+                                    maxHeight=flowable._maxHeight)
+        yield flowable
+
+
+def table_texts(table):
+    """The translatable texts of a DataTable: column titles and string cells"""
+    texts = [column.title for column in table.columns if column.title]
+    for row in table.data:
+        texts.extend(value for value in row.values() if isinstance(value, str) and value)
+    return texts
+
+
+def translate_table(table, messages):
+    """table with its column titles and string cells replaced from messages"""
+    from docbuild.tables import DataTable
+
+    columns = []
+    for column in table.columns:
+        column = copy.copy(column)
+        column.title = messages.get(column.title, column.title)
+        columns.append(column)
+    rows = [dict((key, messages.get(value, value) if isinstance(value, str) else value) for key, value in row.items())
+            for row in table.data]
+    return DataTable(rows, columns, table.theme, table.repeat_header)
+
+
+def translated_section(build, catalog, styles):
+    """Section builder: build(styles) run through a message catalog"""
+    return translate_flowables(build(styles), _messages(catalog))
+
+
+def localize_spec(spec, locale, catalog):
+    """spec with its section titles and paragraphs translated by catalog"""
+    messages = _messages(catalog)
+    sections = [(messages.get(title, title), partial(translated_section, build, catalog))
+                for title, build in spec.sections]
+    return DocumentSpec('%s.%s' % (spec.name, locale), sections, spec.create_styles, spec.create_doc,
+                        spec.on_first_page, spec.on_later_pages, spec.draw_page_number,
+                        spec.sources + [catalog], spec.personalization)
+
+
+def extract_catalog(document, path):
+    """Write (or extend) a catalog at path with every paragraph of document
+
+    Existing translations are kept; new source texts get an empty
+    translation for the translator to fill in.
+    """
+    from reportlab.platypus import Paragraph
+    from docbuild.charts import Chart
+    from docbuild.flowables import ListBlock
+    from docbuild.images import Gallery
+    from docbuild.tables import DataTable
+
+    spec = importlib.import_module(DOCUMENTS[document]).SPEC
+    messages = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            messages = json.load(f).get('messages', {})
+    styles = spec.create_styles()
+    for title, build in spec.sections:
+        messages.setdefault(title, '')
+        for flowable in build(styles):
+            if type(flowable) is Paragraph:
+                messages.setdefault(flowable.text, '')
+            elif isinstance(flowable, ListBlock):
+                for item in flowable.items:
+                    messages.setdefault(item, '')
+            elif isinstance(flowable, DataTable):
+                for text in table_texts(flowable):
+                    messages.setdefault(text, '')
+            elif isinstance(flowable, (Chart, Gallery)):
+                for text in flowable.texts():
+                    messages.setdefault(text, '')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'messages': messages}, f, indent=1, ensure_ascii=False)
+    return len(messages)
+
+
+def _build_variant(variant, output, cache_dir=None, deterministic=False):
+    """Worker entry point: build one variant
+
+    Returns (pages, digest, changed) as for output.publish().
+    """
+    from docbuild.build import build_sections, build_single_pass
+    from docbuild.output import make_deterministic, publish, staging_path
+
+    if deterministic:
+        make_deterministic()
+    spec = variant.spec()
+    staged = staging_path(output)
+    if cache_dir:
+        # pruning here could delete sections another variant has rendered
+        # but not yet recorded; build_variants() prunes once at the end
+        results = build_sections(spec, staged, cache_dir, prune=False)
+        pages = sum(pages for title, pages, reused in results)
+    else:
+        pages = build_single_pass(spec, staged)
+    digest, changed = publish(staged, output)
+    return pages, digest, changed
+
+
+def build_variants(variants, out_dir=DEFAULT_OUT_DIR, cache_dir=None, jobs=0, deterministic=False, manifest=None):
+    """Build every variant into out_dir, one worker process per variant
+
+    jobs is the pool size (0 = one per CPU, 1 = build in this process).
+    Outputs whose bytes did not change are left untouched; deterministic
+    and manifest work as for the generator scripts, with one manifest
+    entry per variant.  Returns a list of (variant, output path, pages,
+    changed).
+    """
+    from docbuild.output import update_manifest
+
+    deterministic = deterministic or bool(manifest)
+    # Import the generators and build their stylesheets before the pool
+    # forks, so workers start with both already done.
+    for variant in variants:
+        variant.spec().create_styles()
+
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = [os.path.join(out_dir, variant.filename()) for variant in variants]
+    if jobs == 1 or len(variants) < 2:
+        built = [_build_variant(variant, output, cache_dir, deterministic)
+                 for variant, output in zip(variants, outputs)]
+    else:
+        workers = min(jobs or os.cpu_count() or 1, len(variants))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_build_variant, variant, output, cache_dir, deterministic)
+                       for variant, output in zip(variants, outputs)]
+            built = [future.result() for future in futures]
+    if cache_dir:
+        SectionCache(cache_dir).prune()
+    if manifest:
+        update_manifest(manifest, [(output, digest) for output, (pages, digest, changed) in zip(outputs, built)])
+    return [(variant, output, pages, changed)
+            for variant, output, (pages, digest, changed) in zip(variants, outputs, built)]
@@ -0,0 +1,162 @@
+"""Keep a warm process that rebuilds documents when their sources change
+
+Running a generator from scratch pays interpreter start-up, the reportlab
+import and a full layout for every edit.  watch() pays the first two once:
+it builds its targets through a section cache, then polls their sources
+and on a change reloads the generator modules involved and rebuilds with
+build_sections(), which re-renders only the sections whose fingerprint
+changed.  A typical edit re-renders one section and reassembles the PDF
+in a fraction of a second.
+
+A target's sources are its generator module plus the spec's sources
+(Docs.jsx for the technical docs, the catalog for a translation).  A
+change to the docbuild package itself cannot be picked up by reloading,
+so the process restarts itself instead.  Section keys include the source
+of the modules that draw sections (see fingerprint_sources() in
+docbuild.fingerprint), so the restarted build re-renders every section an
+edit to one of them can change instead of reusing the cached pages.
+"""
+
+import importlib
+import os
+import sys
+import time
+import traceback
+
+from docbuild.content import DEFAULT_CACHE_DIR
+from docbuild.variants import DOCUMENTS, forget_catalogs
+
+DEFAULT_WATCH_CACHE = os.path.join(DEFAULT_CACHE_DIR, 'sections')
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def package_files():
+    """The docbuild modules, whose changes need a restart"""
+    return sorted(os.path.join(PACKAGE_DIR, name) for name in os.listdir(PACKAGE_DIR) if name.endswith('.py'))
+
+
+def target_sources(variant):
+    """Files whose change means variant has to be rebuilt"""
+    module = importlib.import_module(DOCUMENTS[variant.document])
+    return [os.path.abspath(module.__file__)] + [os.path.abspath(path) for path in variant.spec().sources]
+
+
+def rebuild(variant, output, cache_dir):
+    """Build variant into output through the section cache
+
+    Returns (build_sections() results, whether the output changed).
+    """
+    from docbuild.build import build_sections
+    from docbuild.output import publish, staging_path
+
+    staged = staging_path(output)
+    results = build_sections(variant.spec(), staged, cache_dir)
+    digest, changed = publish(staged, output)
+    return results, changed
+
+
+def describe(results, changed):
+    """What a rebuild did, for the watch log"""
+    rendered = [title for title, pages, reused in results if not reused]
+    text = "%d of %d sections rendered" % (len(rendered), len(results))
+    if rendered and len(rendered) <= 3:
+        text += " (%s)" % ', '.join(rendered)
+    if not changed:
+        text += ", output unchanged"
+    return text
+
+
+class Watcher(object):
+    """Rebuilds a list of (variant, output path) targets as their sources change"""
+
+    def __init__(self, targets, cache_dir=DEFAULT_WATCH_CACHE, interval=0.2):
+        self.targets = list(targets)
+        self.cache_dir = cache_dir
+        self.interval = interval
+        self.sources = {}
+        self.mtimes = {}
+
+    def scan(self):
+        """Work out every target's sources and remember their mtimes"""
+        for variant, output in self.targets:
+            try:
+                self.sources[variant.name] = target_sources(variant)
+            except Exception:
+                # keep watching what we knew; the next save may fix it
+                traceback.print_exc()
+        paths = set(package_files())
+        for sources in self.sources.values():
+            paths.update(sources)
+        self.mtimes = dict((path, _mtime(path)) for path in paths)
+
+    def changed_files(self):
+        return set(path for path, mtime in self.mtimes.items() if _mtime(path) != mtime)
+
+    def build(self, targets, started):
+        for variant, output in targets:
+            try:
+                results, changed = rebuild(variant, output, self.cache_dir)
+            except Exception:
+                traceback.print_exc()
+                print("%s: build failed" % variant.name)
+                continue
+            print("[%s] %s: %s in %.0f ms" % (time.strftime('%H:%M:%S'), variant.name, describe(results, changed),
+                                             (time.perf_counter() - started) * 1000))
+            sys.stdout.flush()
+
+    def reload(self, changed):
+        """Reload the generator modules whose targets depend on changed files
+
+        Returns the targets to rebuild; targets whose module fails to
+        reload are left out.
+        """
+        affected = [(variant, output) for variant, output in self.targets
+                    if changed & set(self.sources.get(variant.name, ()))]
+        forget_catalogs()
+        failed = set()
+        for name in sorted(set(DOCUMENTS[variant.document] for variant, output in affected)):
+            try:
+                importlib.reload(importlib.import_module(name))
+            except Exception:
+                traceback.print_exc()
+                print("%s: not rebuilt, fix the error and save again" % name)
+                failed.add(name)
+        return [(variant, output) for variant, output in affected if DOCUMENTS[variant.document] not in failed]
+
+    def run(self):
+        for variant, output in self.targets:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        self.scan()
+        self.build(self.targets, time.perf_counter())
+        print("Watching %d files for changes (Ctrl-C to stop)" % len(self.mtimes))
+        sys.stdout.flush()
+        try:
+            while True:
+                time.sleep(self.interval)
+                changed = self.changed_files()
+                if not changed:
+                    continue
+                started = time.perf_counter()
+                if changed & set(package_files()):
+                    print("docbuild changed, restarting")
+                    sys.stdout.flush()
+                    os.execv(sys.executable, [sys.executable] + sys.argv)
+                for path in sorted(changed):
+                    print("changed: %s" % os.path.relpath(path))
+                targets = self.reload(changed)
+                self.scan()
+                self.build(targets, started)
+        except KeyboardInterrupt:
+            return 0
+
+
+def watch(targets, cache_dir=None, interval=0.2):
+    """Build targets, then keep rebuilding them on change until interrupted"""
+    return Watcher(targets, cache_dir or DEFAULT_WATCH_CACHE, interval).run()
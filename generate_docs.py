@@ -1,24 +1,71 @@
 #!/usr/bin/env python3
 """Generate comprehensive dark-themed PDF documentation for TaskBoard Protocol"""
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.colors import HexColor
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.lib import colors
+import os
+import sys
+from xml.sax.saxutils import escape
+
+from docbuild import DocumentSpec, build_pdf
+from docbuild.cli import main
+from docbuild.lazy import lazy_import
+from docbuild.styles import stylesheet
+from docbuild.forms import draw_form
+from docbuild.personalize import Personalization
+from docbuild.fees import (CURVE_VALUES, EXAMPLE_VALUE, FEES, GAS_PER_TRANSACTION, SAMPLE_VALUES, SENSITIVITY_FEES,
+                           TRANSACTIONS_PER_TASK, schedule_rows, sensitivity_rows, take_rate_rows)
+from docbuild.robots import ROBOTS_JSX, RUN_SIZE, catalog_groups, jsx_categories, read_records, spec_sheet
+from docbuild.content import PUBLIC_DIR
+from docbuild.tco import (FLEET_SIZE, PERCENTILES, SCENARIOS, UTILIZATION, YEARS, TCOModel, jsx_ranges,
+                          payback_curves, percentile_rows, simulated, simulating, summary_rows)
+
+# reportlab is only imported once something is rendered
+REPORTLAB = lazy_import(globals(), [
+    ('reportlab.lib.pagesizes', 'letter'),
+    ('reportlab.lib.styles', 'getSampleStyleSheet ParagraphStyle'),
+    ('reportlab.platypus', 'SimpleDocTemplate Paragraph Spacer PageBreak KeepTogether'),
+    ('reportlab.lib.enums', 'TA_CENTER TA_LEFT TA_JUSTIFY'),
+    ('docbuild.flowables', 'Contents ListBlock TerminalBlock'),
+    ('docbuild.tables', 'Column DataTable TableTheme'),
+    ('docbuild.charts', 'BarChart ChartTheme Gauge GaugeChart LineChart'),
+    ('docbuild.images', 'Gallery Picture'),
+])
 
 # Brand Colors
-PRIMARY = HexColor('#0BA360')
-SECONDARY = HexColor('#22AE77')
-ACCENT = HexColor('#3CBA92')
-BG_DARK = HexColor('#002130')
-BG_CARD = HexColor('#00314D')
-TEXT_WHITE = HexColor('#FFFFFF')
-TEXT_GRAY = HexColor('#AEAEAE')
-TERMINAL_BG = HexColor('#0a1a1f')
-
-def draw_page_background(canvas, doc):
+PRIMARY = '#0BA360'
+SECONDARY = '#22AE77'
+ACCENT = '#3CBA92'
+BG_DARK = '#002130'
+BG_CARD = '#00314D'
+TEXT_WHITE = '#FFFFFF'
+TEXT_GRAY = '#AEAEAE'
+TERMINAL_BG = '#0a1a1f'
+# Chart series after the brand green
+CHART_BLUE = '#4FC3F7'
+CHART_AMBER = '#F2C94C'
+CHART_CORAL = '#EF7B6C'
+
+# Quick stats: transactions per second, USD per transaction, settlement ms
+TPS_CAPACITY = 65000
+TX_COST = 0.00025
+SETTLEMENT_MS = 400
+# Market inefficiency analysis: the RaaS market today
+SEARCH_COST = 450
+SETTLEMENT_DAYS = 47
+DISPUTE_RATE = 12
+FLEET_UTILIZATION = 52
+SMB_ADOPTION = 8
+# Solution impact projection, in percent
+SEARCH_COST_REDUCTION = 95
+DISPUTE_RATE_TARGET = 1
+FLEET_UTILIZATION_TARGET = 80
+FEE_REDUCTION = 70
+
+LOGO = os.path.join(PUBLIC_DIR, 'logo.png')
+# robot category icon (Robots.jsx) -> picture of the site
+ROBOT_IMAGES = dict((icon, os.path.join(PUBLIC_DIR, 'robot-%s.png' % icon))
+                    for icon in ('drone', 'humanoid', 'delivery', 'industrial'))
+
+def page_decoration_artwork(canvas):
     """Draw dark background and decorative elements"""
     canvas.saveState()
     
@@ -43,13 +90,6 @@ def draw_page_background(canvas, doc):
     canvas.setFillAlpha(0.03)
     canvas.circle(80, letter[1] - 120, 100, fill=1, stroke=0)
     
-    canvas.setFillColor(TEXT_GRAY)
-    canvas.setFillAlpha(1)
-    canvas.setFont('Courier', 9)
-    page_num = canvas.getPageNumber()
-    if page_num > 1:
-        canvas.drawCentredString(letter[0] / 2, 30, str(page_num))
-    
     canvas.setStrokeColor(ACCENT)
     canvas.setStrokeAlpha(0.2)
     canvas.setLineWidth(0.5)
@@ -57,7 +97,21 @@ def draw_page_background(canvas, doc):
     
     canvas.restoreState()
 
-def draw_title_page(canvas, doc):
+def draw_page_decoration(canvas, doc):
+    """Place the page decoration, drawn once per document as a form XObject"""
+    draw_form(canvas, 'PageDecoration', page_decoration_artwork)
+
+def draw_page_number(canvas, page_num):
+    """Draw the footer page number (the title page is not numbered)"""
+    if page_num <= 1:
+        return
+    canvas.saveState()
+    canvas.setFillColor(TEXT_GRAY)
+    canvas.setFont('Courier', 9)
+    canvas.drawCentredString(letter[0] / 2, 30, str(page_num))
+    canvas.restoreState()
+
+def title_page_artwork(canvas):
     """Title page background"""
     canvas.saveState()
     
@@ -85,6 +139,48 @@ def draw_title_page(canvas, doc):
     
     canvas.restoreState()
 
+def draw_title_page(canvas, doc):
+    """Place the title page background as a form XObject"""
+    draw_form(canvas, 'TitlePage', title_page_artwork)
+
+def format_stake(stake):
+    """A recipient's stake for print; plain amounts are in SOL"""
+    try:
+        amount = float(stake)
+    except (TypeError, ValueError):
+        return str(stake)
+    return '%s SOL' % format(int(amount) if amount.is_integer() else amount, ',')
+
+def draw_recipient(canvas, page_num, recipient):
+    """Cover block of a personalized copy: operator, robot and stake"""
+    width, height, bottom = 320, 92, 120
+    centre = letter[0] / 2
+    canvas.saveState()
+    canvas.setFillColor(BG_CARD)
+    canvas.setStrokeColor(ACCENT)
+    canvas.setLineWidth(0.5)
+    canvas.roundRect(centre - width / 2, bottom, width, height, 6, stroke=1, fill=1)
+    canvas.setFillColor(PRIMARY)
+    canvas.setFont('Courier-Bold', 9)
+    canvas.drawCentredString(centre, bottom + height - 20, "PREPARED FOR OPERATOR")
+    name = str(recipient['name'])
+    size = 14
+    while size > 8 and canvas.stringWidth(name, 'Courier-Bold', size) > width - 24:
+        size -= 1
+    canvas.setFillColor(TEXT_WHITE)
+    canvas.setFont('Courier-Bold', size)
+    canvas.drawCentredString(centre, bottom + height - 44, name)
+    canvas.setFillColor(TEXT_GRAY)
+    canvas.setFont('Courier', 10)
+    canvas.drawCentredString(centre, bottom + 28, "Robot %s" % recipient['robot_id'])
+    canvas.drawCentredString(centre, bottom + 14, "Stake %s" % format_stake(recipient['stake']))
+    canvas.restoreState()
+
+# One copy per operator: the rendered whitepaper with a cover block stamped on
+PERSONALIZATION = Personalization(draw_recipient, fields=('name', 'robot_id', 'stake'),
+                                  filename='TaskBoard-whitepaper-{robot_id}.pdf')
+
+@stylesheet('dark')
 def create_styles():
     styles = getSampleStyleSheet()
     
@@ -100,18 +196,49 @@ def create_styles():
     styles.add(ParagraphStyle(name='Version', fontSize=11, textColor=ACCENT, fontName='Courier', alignment=TA_CENTER))
     styles.add(ParagraphStyle(name='TOC', fontSize=11, textColor=TEXT_WHITE, fontName='Courier', spaceAfter=8, leftIndent=20))
     styles.add(ParagraphStyle(name='WhiteHead', fontSize=12, textColor=TEXT_WHITE, fontName='Courier-Bold', spaceBefore=10, spaceAfter=6))
+    styles.add(ParagraphStyle(name='TableHead', fontSize=9, textColor=PRIMARY, fontName='Courier-Bold', leading=12, spaceBefore=6))
+    styles.add(ParagraphStyle(name='TableCell', fontSize=9, textColor=TEXT_GRAY, fontName='Helvetica', leading=12, spaceAfter=10))
     styles.add(ParagraphStyle(name='SmallNote', fontSize=8, textColor=TEXT_GRAY, fontName='Helvetica', alignment=TA_CENTER, spaceBefore=5))
     
     return styles
 
-def create_pdf():
-    doc = SimpleDocTemplate("/home/claude/taskboard/TaskBoard_Documentation.pdf", pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
-    
-    styles = create_styles()
+def terminal(lines, styles):
+    """Terminal mock-up: '#' lines as comments, everything else as output"""
+    return TerminalBlock(lines, styles['Terminal'], styles['TerminalComment'])
+
+def data_table(rows, columns, styles):
+    """Table of rows (dicts) in the dark theme"""
+    theme = TableTheme(styles['TableHead'], styles['TableCell'], header_fill=BG_CARD,
+                       row_fills=(None, TERMINAL_BG), rule_color=ACCENT)
+    return DataTable(rows, columns, theme)
+
+def chart_theme():
+    return ChartTheme((PRIMARY, CHART_BLUE, CHART_AMBER, CHART_CORAL), TEXT_GRAY, ACCENT, font_name='Courier',
+                      track_color=BG_CARD)
+
+def line_chart(series, x_ticks, **options):
+    """Line chart in the dark theme, as wide as the text"""
+    return LineChart(series, chart_theme(), letter[0] - 144, 180, x_ticks, **options)
+
+def bar_chart(categories, series, **options):
+    """Bar chart in the dark theme, as wide as the text"""
+    height = 40 + 16 * len(categories) * len(series)
+    return BarChart(categories, series, chart_theme(), letter[0] - 144, height, **options)
+
+def gauge_chart(gauges):
+    """A row of gauges in the dark theme, as wide as the text"""
+    return GaugeChart(gauges, chart_theme(), letter[0] - 144, 110)
+
+def percent_gauge(label, value):
+    return Gauge(label, value, 100, '%d%%' % value, ends=('0', '100%'))
+
+def section_title(styles):
+    """Title page"""
     story = []
     
-    # TITLE PAGE
-    story.append(Spacer(1, 150))
+    story.append(Spacer(1, 50))
+    story.append(Picture(LOGO, 80))
+    story.append(Spacer(1, 20))
     story.append(Paragraph("TaskBoard", styles['BrandTitle']))
     story.append(Spacer(1, 10))
     story.append(Paragraph("RaaS Protocol", styles['BrandSubtitle']))
@@ -122,42 +249,49 @@ def create_pdf():
     story.append(Paragraph("v1.0", styles['Version']))
     story.append(Spacer(1, 30))
     story.append(Paragraph("2025", styles['SmallNote']))
-    story.append(PageBreak())
     
-    # TABLE OF CONTENTS
+    return story
+
+def section_contents(styles):
+    """Table of contents"""
+    story = []
+    
     story.append(Paragraph("Contents", styles['SectionTitle']))
     story.append(Spacer(1, 20))
     
-    toc = ["01  Executive Summary", "02  Introduction", "03  Problem Statement", "04  Solution Overview", 
-           "05  Protocol Architecture", "06  Task Lifecycle", "07  Robot SDK", "08  Verification System",
-           "09  Protocol Economics", "10  Use Cases", "11  Technical Specifications",
-           "12  Governance", "13  Security", "14  Glossary", "15  Conclusion"]
-    for item in toc:
-        story.append(Paragraph(item, styles['TOC']))
+    story.append(Contents([title for title, build in SECTIONS[2:]], styles['TOC']))
     
-    story.append(PageBreak())
+    return story
+
+def section_executive_summary(styles):
+    """01 Executive Summary"""
+    story = []
     
-    # 1. EXECUTIVE SUMMARY
     story.append(Paragraph("01 Executive Summary", styles['SectionTitle']))
     story.append(Paragraph("TaskBoard is a decentralized protocol that creates the first trustless marketplace for Robot-as-a-Service (RaaS) on the Solana blockchain. The protocol enables businesses to hire autonomous robots for tasks ranging from warehouse operations to last-mile delivery, with smart contracts handling payment escrow, task verification, and settlement.", styles['Body']))
     
     story.append(Spacer(1, 10))
     story.append(Paragraph("Key Highlights", styles['SubSection']))
     
-    for h in ["First decentralized RaaS marketplace built on Solana", "Trustless escrow system with cryptographic proof verification", 
-              "Sub-second finality and near-zero transaction costs", "Open SDK supporting all major robotics platforms",
-              "Decentralized governance through DAO structure", "Projected $3.2B addressable market by 2027"]:
-        story.append(Paragraph("  * " + h, styles['BulletItem']))
+    story.append(ListBlock(["First decentralized RaaS marketplace built on Solana", "Trustless escrow system with cryptographic proof verification", 
+                            "Sub-second finality and near-zero transaction costs", "Open SDK supporting all major robotics platforms",
+                            "Decentralized governance through DAO structure", "Projected $3.2B addressable market by 2027"], styles['BulletItem'], bullet='*'))
     
     story.append(Spacer(1, 15))
-    story.append(Paragraph("# Quick stats", styles['TerminalComment']))
-    for line in ["$ taskboard info --summary", "> Protocol: TaskBoard v1.0", "> Blockchain: Solana", 
-                 "> TPS Capacity: 65,000+", "> Avg Tx Cost: $0.00025", "> Settlement Time: ~400ms"]:
-        story.append(Paragraph(line, styles['Terminal']))
-    
-    story.append(PageBreak())
+    story.append(KeepTogether([
+        terminal(["# Quick stats", "$ taskboard info --summary", "> Protocol: TaskBoard v1.0", "> Blockchain: Solana", 
+                  "> TPS Capacity: {:,}+".format(TPS_CAPACITY), "> Avg Tx Cost: $%g" % TX_COST,
+                  "> Settlement Time: ~%dms" % SETTLEMENT_MS], styles),
+        gauge_chart([Gauge("Throughput (tx/s)", TPS_CAPACITY, 100000, "%dk" % (TPS_CAPACITY // 1000), ends=('0', '100k')),
+                     Gauge("Settlement time", SETTLEMENT_MS, 1000, "%dms" % SETTLEMENT_MS, ends=('0', '1s')),
+                     Gauge("Cost per transaction", TX_COST, 0.01, "$%g" % TX_COST, ends=('$0', '1 cent'))])]))
+    
+    return story
+
+def section_introduction(styles):
+    """02 Introduction"""
+    story = []
     
-    # 2. INTRODUCTION
     story.append(Paragraph("02 Introduction", styles['SectionTitle']))
     story.append(Paragraph("The robotics industry is undergoing a fundamental transformation. As autonomous systems become more capable and affordable, businesses increasingly seek flexible access to robotic labor without the capital expenditure of purchasing equipment. This shift from ownership to access mirrors the broader trend toward as-a-service models across technology sectors.", styles['Body']))
     story.append(Paragraph("However, the current RaaS landscape remains fragmented, inefficient, and trust-dependent. Businesses struggle to find reliable robot operators, negotiate fair pricing, and verify task completion. Robot operators face inconsistent demand, delayed payments, and limited market reach. These inefficiencies represent a significant drag on industry growth.", styles['Body']))
@@ -169,9 +303,12 @@ def create_pdf():
     story.append(Paragraph("Mission", styles['SubSection']))
     story.append(Paragraph("To build the most efficient, transparent, and accessible marketplace for robotic services, enabling businesses and robot operators to transact directly with cryptographic guarantees of fairness and completion.", styles['Body']))
     
-    story.append(PageBreak())
+    return story
+
+def section_problem_statement(styles):
+    """03 Problem Statement"""
+    story = []
     
-    # 3. PROBLEM STATEMENT
     story.append(Paragraph("03 Problem Statement", styles['SectionTitle']))
     story.append(Paragraph("Industry Challenges", styles['SubSection']))
     story.append(Paragraph("The Robot-as-a-Service industry faces several structural challenges that limit growth and adoption. These problems affect all participants in the ecosystem and represent significant opportunities for disruption.", styles['Body']))
@@ -189,15 +326,19 @@ def create_pdf():
         story.append(Paragraph(desc, styles['Body']))
     
     story.append(Spacer(1, 10))
-    story.append(Paragraph("# Market inefficiency analysis", styles['TerminalComment']))
-    for line in ["$ taskboard analytics --market-gaps", "> Search Cost per Transaction: $450 avg", 
-                 "> Payment Settlement: 47 days avg", "> Dispute Rate: 12% of transactions",
-                 "> Fleet Utilization: 52% avg", "> SMB Adoption: 8% penetration"]:
-        story.append(Paragraph(line, styles['Terminal']))
-    
-    story.append(PageBreak())
+    story.append(KeepTogether([
+        terminal(["# Market inefficiency analysis", "$ taskboard analytics --market-gaps", "> Search Cost per Transaction: $%d avg" % SEARCH_COST, 
+                  "> Payment Settlement: %d days avg" % SETTLEMENT_DAYS, "> Dispute Rate: %d%% of transactions" % DISPUTE_RATE,
+                  "> Fleet Utilization: %d%% avg" % FLEET_UTILIZATION, "> SMB Adoption: %d%% penetration" % SMB_ADOPTION], styles),
+        gauge_chart([percent_gauge("Dispute rate", DISPUTE_RATE), percent_gauge("Fleet utilization", FLEET_UTILIZATION),
+                     percent_gauge("SMB adoption", SMB_ADOPTION)])]))
+    
+    return story
+
+def section_solution_overview(styles):
+    """04 Solution Overview"""
+    story = []
     
-    # 4. SOLUTION OVERVIEW
     story.append(Paragraph("04 Solution Overview", styles['SectionTitle']))
     story.append(Paragraph("TaskBoard solves these challenges through a decentralized protocol that creates trustless interactions between task posters and robot operators. The solution combines several key innovations:", styles['Body']))
     
@@ -214,25 +355,29 @@ def create_pdf():
         story.append(Paragraph(desc, styles['Body']))
     
     story.append(Spacer(1, 10))
-    story.append(Paragraph("# Solution impact projection", styles['TerminalComment']))
-    for line in ["$ taskboard analytics --solution-impact", "> Search Cost Reduction: 95%", 
-                 "> Settlement Time: 400ms", "> Dispute Rate Target: <1%",
-                 "> Utilization Target: 80%+", "> Fee Reduction: 70%"]:
-        story.append(Paragraph(line, styles['Terminal']))
-    
-    story.append(PageBreak())
+    story.append(terminal(["# Solution impact projection", "$ taskboard analytics --solution-impact", "> Search Cost Reduction: %d%%" % SEARCH_COST_REDUCTION, 
+                           "> Settlement Time: %dms" % SETTLEMENT_MS, "> Dispute Rate Target: <%d%%" % DISPUTE_RATE_TARGET,
+                           "> Utilization Target: %d%%+" % FLEET_UTILIZATION_TARGET, "> Fee Reduction: %d%%" % FEE_REDUCTION], styles))
+    story.append(KeepTogether([
+        Paragraph("Today and with TaskBoard", styles['WhiteHead']),
+        bar_chart(["Fleet utilization", "Dispute rate"], [[FLEET_UTILIZATION, DISPUTE_RATE], [FLEET_UTILIZATION_TARGET, DISPUTE_RATE_TARGET]],
+                  names=["Today", "With TaskBoard"], value_format='%d%%', value_max=100)]))
+    
+    return story
+
+def section_protocol_architecture(styles):
+    """05 Protocol Architecture"""
+    story = []
     
-    # 5. PROTOCOL ARCHITECTURE
     story.append(Paragraph("05 Protocol Architecture", styles['SectionTitle']))
     story.append(Paragraph("TaskBoard consists of four interconnected layers that work together to provide a seamless robot-as-a-service experience. Each layer is designed for modularity, scalability, and security.", styles['Body']))
     
     story.append(Paragraph("Layer 1: Smart Contract Layer", styles['SubSection']))
     story.append(Paragraph("The foundation of TaskBoard is a set of Solana programs written in the Anchor framework. These programs handle all on-chain logic including task creation, bidding, escrow management, verification, and settlement. Key contracts include:", styles['Body']))
     
-    for c in ["TaskManager - Handles task lifecycle from creation to completion", "EscrowVault - Manages locked funds with conditional release logic",
-              "VerificationOracle - Coordinates validator consensus for proofs", "ReputationRegistry - Tracks and updates participant reputation scores",
-              "GovernanceModule - Manages DAO voting and protocol upgrades"]:
-        story.append(Paragraph("  * " + c, styles['BulletItem']))
+    story.append(ListBlock(["TaskManager - Handles task lifecycle from creation to completion", "EscrowVault - Manages locked funds with conditional release logic",
+                            "VerificationOracle - Coordinates validator consensus for proofs", "ReputationRegistry - Tracks and updates participant reputation scores",
+                            "GovernanceModule - Manages DAO voting and protocol upgrades"], styles['BulletItem'], bullet='*'))
     
     story.append(Paragraph("Layer 2: Verification Layer", styles['SubSection']))
     story.append(Paragraph("A decentralized network of validators confirms task completion through cryptographic proofs. Validators stake tokens to participate and earn rewards for accurate verification. The system uses a Byzantine fault-tolerant consensus mechanism requiring 2/3 agreement for proof acceptance.", styles['Body']))
@@ -244,74 +389,75 @@ def create_pdf():
     story.append(Paragraph("User-facing applications provide intuitive access to protocol functionality. This includes a web dashboard for task management, mobile apps for operators, CLI tools for developers, and API endpoints for enterprise integrations.", styles['Body']))
     
     story.append(Spacer(1, 10))
-    story.append(Paragraph("# Contract addresses (Devnet)", styles['TerminalComment']))
-    for line in ["$ taskboard contracts --list --network devnet", "> TaskManager: TBrd...7xKm", "> EscrowVault: TBes...9pQn",
-                 "> VerificationOracle: TBvf...3rWs", "> ReputationRegistry: TBrp...2mNk", 
-                 "> GovernanceModule: TBgv...8jLp", "> Treasury: TBtr...5yZt"]:
-        story.append(Paragraph(line, styles['Terminal']))
-    
-    story.append(PageBreak())
+    story.append(Paragraph("Contract Addresses (Devnet)", styles['WhiteHead']))
+    contracts = [{'contract': "TaskManager", 'address': "TBrd...7xKm"},
+                 {'contract': "EscrowVault", 'address': "TBes...9pQn"},
+                 {'contract': "VerificationOracle", 'address': "TBvf...3rWs"},
+                 {'contract': "ReputationRegistry", 'address': "TBrp...2mNk"},
+                 {'contract': "GovernanceModule", 'address': "TBgv...8jLp"},
+                 {'contract': "Treasury", 'address': "TBtr...5yZt"}]
+    story.append(data_table(contracts, [Column('contract', "Contract"), Column('address', "Address", wrap=False)], styles))
+    
+    return story
+
+def section_task_lifecycle(styles):
+    """06 Task Lifecycle"""
+    story = []
     
-    # 6. TASK LIFECYCLE
     story.append(Paragraph("06 Task Lifecycle", styles['SectionTitle']))
     story.append(Paragraph("Every task on TaskBoard follows a deterministic lifecycle managed by smart contracts. This ensures transparency, predictability, and trust for all participants. The lifecycle consists of eight distinct stages with clear transition conditions.", styles['Body']))
     
     story.append(Spacer(1, 10))
-    story.append(Paragraph("# Task creation example", styles['TerminalComment']))
-    for line in ["$ taskboard task create \\", "    --type warehouse_inventory \\", "    --location 37.7749,-122.4194 \\",
-                 "    --budget 50 SOL \\", "    --deadline 2025-XX-XXTXX:XX:XXZ \\", "    --requirements ./task_spec.json",
-                 "> Task created: TASK-2025-00847", "> Status: CREATED", "> Escrow locked: 50 SOL", "> Bidding opens: NOW"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(terminal(["# Task creation example", "$ taskboard task create \\", "    --type warehouse_inventory \\", "    --location 37.7749,-122.4194 \\",
+                           "    --budget 50 SOL \\", "    --deadline 2025-XX-XXTXX:XX:XXZ \\", "    --requirements ./task_spec.json",
+                           "> Task created: TASK-2025-00847", "> Status: CREATED", "> Escrow locked: 50 SOL", "> Bidding opens: NOW"], styles))
     
     story.append(Spacer(1, 15))
     story.append(Paragraph("Lifecycle Stages", styles['SubSection']))
     
     stages = [
-        ("1. CREATED", "Task poster submits requirements, budget, and deadline. System validates parameters and generates unique task ID."),
-        ("2. FUNDED", "Budget amount is transferred to escrow contract. Funds are locked until task completion or cancellation."),
-        ("3. BIDDING", "Qualified robots submit bids including proposed price, estimated completion time, and capability proofs."),
-        ("4. ASSIGNED", "Task poster selects winning bid or system auto-assigns based on ranking algorithm. Robot receives task details."),
-        ("5. IN_PROGRESS", "Robot executes task while streaming telemetry data. Real-time monitoring available to task poster."),
-        ("6. PENDING_VERIFICATION", "Robot submits completion proof. Verification request dispatched to validator network."),
-        ("7. VERIFIED", "Validator consensus confirms task completion. Verification proof recorded on-chain."),
-        ("8. SETTLED", "Escrow releases payment to robot operator minus protocol fees. Reputation scores updated.")
+        ("CREATED", "Task poster submits requirements, budget, and deadline. System validates parameters and generates unique task ID."),
+        ("FUNDED", "Budget amount is transferred to escrow contract. Funds are locked until task completion or cancellation."),
+        ("BIDDING", "Qualified robots submit bids including proposed price, estimated completion time, and capability proofs."),
+        ("ASSIGNED", "Task poster selects winning bid or system auto-assigns based on ranking algorithm. Robot receives task details."),
+        ("IN_PROGRESS", "Robot executes task while streaming telemetry data. Real-time monitoring available to task poster."),
+        ("PENDING_VERIFICATION", "Robot submits completion proof. Verification request dispatched to validator network."),
+        ("VERIFIED", "Validator consensus confirms task completion. Verification proof recorded on-chain."),
+        ("SETTLED", "Escrow releases payment to robot operator minus protocol fees. Reputation scores updated.")
     ]
-    for title, desc in stages:
-        story.append(Paragraph(title, styles['WhiteHead']))
-        story.append(Paragraph(desc, styles['Body']))
+    rows = [{'step': step, 'stage': stage, 'description': desc} for step, (stage, desc) in enumerate(stages, 1)]
+    story.append(data_table(rows, [Column('step', "#", align='right', wrap=False), Column('stage', "Stage", wrap=False),
+                                   Column('description', "Description")], styles))
     
-    story.append(PageBreak())
+    return story
+
+def section_robot_sdk(styles):
+    """07 Robot SDK"""
+    story = []
     
-    # 7. ROBOT SDK
     story.append(Paragraph("07 Robot SDK", styles['SectionTitle']))
     story.append(Paragraph("The TaskBoard Robot SDK enables any autonomous system to participate in the marketplace. The SDK is open-source, modular, and designed for easy integration with existing robotics software stacks. It handles all protocol interactions including authentication, task discovery, bidding, execution monitoring, and proof submission.", styles['Body']))
     
     story.append(Paragraph("Installation", styles['SubSection']))
-    for line in ["# Install TaskBoard SDK", "$ pip install taskboard-sdk", "# Or for ROS2 integration", "$ apt install ros-humble-taskboard"]:
-        story.append(Paragraph(line, styles['Terminal'] if line.startswith('$') else styles['TerminalComment']))
+    story.append(terminal(["# Install TaskBoard SDK", "$ pip install taskboard-sdk", "# Or for ROS2 integration", "$ apt install ros-humble-taskboard"], styles))
     
     story.append(Spacer(1, 10))
     story.append(Paragraph("Robot Registration", styles['SubSection']))
-    for line in ["# Register a new robot", "$ taskboard robot register \\", "    --type industrial_arm \\",
-                 "    --manufacturer Universal_Robots \\", "    --model UR10e \\", "    --capabilities pick_place,welding,assembly \\",
-                 "    --location warehouse_zone_a \\", "    --availability 24/7 \\", "    --stake 100 SOL",
-                 "> Robot registered: ROBOT-IND-0847", "> Public Key: 7xKm...9pQn", "> Status: ACTIVE",
-                 "> Reputation: 0 (new)", "> Capabilities indexed: 3"]:
-        story.append(Paragraph(line, styles['Terminal'] if not line.startswith('#') else styles['TerminalComment']))
+    story.append(terminal(["# Register a new robot", "$ taskboard robot register \\", "    --type industrial_arm \\",
+                           "    --manufacturer Universal_Robots \\", "    --model UR10e \\", "    --capabilities pick_place,welding,assembly \\",
+                           "    --location warehouse_zone_a \\", "    --availability 24/7 \\", "    --stake 100 SOL",
+                           "> Robot registered: ROBOT-IND-0847", "> Public Key: 7xKm...9pQn", "> Status: ACTIVE",
+                           "> Reputation: 0 (new)", "> Capabilities indexed: 3"], styles))
     
     story.append(Spacer(1, 15))
     story.append(Paragraph("Supported Robot Types", styles['SubSection']))
     
-    robots = [("Industrial Arms", "Manufacturing, assembly, welding, painting, quality inspection"),
-              ("Drones/UAVs", "Aerial survey, infrastructure inspection, agricultural monitoring, delivery"),
-              ("Humanoids", "Warehouse operations, customer service, facility maintenance"),
-              ("Delivery Bots", "Last-mile logistics, campus delivery, food delivery, retail restocking"),
-              ("AGVs", "Material transport, inventory management, pallet handling"),
-              ("AMRs", "Flexible warehouse navigation, order picking, facility patrol"),
-              ("Cobots", "Human-collaborative assembly, precision tasks, laboratory automation")]
-    for name, desc in robots:
-        story.append(Paragraph(name, styles['WhiteHead']))
-        story.append(Paragraph(desc, styles['Body']))
+    story.append(Paragraph("The SDK runs on any autonomous platform, from industrial arms, AGVs, AMRs and cobots to drones, humanoids and delivery bots. The marketplace lists robots in the categories below; the Robot Catalog appendix has a spec sheet for every model.", styles['Body']))
+    categories = [{'category': name, 'use_cases': ", ".join(category.get('useCases', []))}
+                  for name, category in jsx_categories().items()]
+    story.append(Gallery([(ROBOT_IMAGES[category['icon']], name) for name, category in jsx_categories().items()
+                          if category.get('icon') in ROBOT_IMAGES], styles['SmallNote'], letter[0] - 144, 80))
+    story.append(data_table(categories, [Column('category', "Category", wrap=False), Column('use_cases', "Typical tasks")], styles))
     
     story.append(PageBreak())
     
@@ -328,15 +474,16 @@ def create_pdf():
         story.append(Paragraph(desc, styles['Body']))
     
     story.append(Spacer(1, 10))
-    story.append(Paragraph("# SDK configuration", styles['TerminalComment']))
-    for line in ["$ taskboard sdk config --show", "> Network: mainnet-beta", "> RPC Endpoint: https://api.mainnet-beta.solana.com",
-                 "> Websocket: wss://api.mainnet-beta.solana.com", "> Auto-bid: ENABLED",
-                 "> Max concurrent tasks: 5", "> Telemetry interval: 1000ms"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(terminal(["# SDK configuration", "$ taskboard sdk config --show", "> Network: mainnet-beta", "> RPC Endpoint: https://api.mainnet-beta.solana.com",
+                           "> Websocket: wss://api.mainnet-beta.solana.com", "> Auto-bid: ENABLED",
+                           "> Max concurrent tasks: 5", "> Telemetry interval: 1000ms"], styles))
     
-    story.append(PageBreak())
+    return story
+
+def section_verification_system(styles):
+    """08 Verification System"""
+    story = []
     
-    # 8. VERIFICATION SYSTEM
     story.append(Paragraph("08 Verification System", styles['SectionTitle']))
     story.append(Paragraph("Task completion is verified through a decentralized network of validators using multiple proof types. This system ensures objective, tamper-proof verification without relying on trusted intermediaries. Validators stake tokens to participate and face slashing for malicious or negligent behavior.", styles['Body']))
     
@@ -352,46 +499,67 @@ def create_pdf():
         story.append(Paragraph(desc, styles['Body']))
     
     story.append(Spacer(1, 10))
-    story.append(Paragraph("# Verification submission", styles['TerminalComment']))
-    for line in ["$ taskboard verify submit \\", "    --task TASK-2025-00847 \\", "    --proof-type composite \\",
-                 "    --telemetry ./sensor_log.json \\", "    --images ./before.jpg,./after.jpg \\",
-                 "    --oracle-ref INV-SYS-CONFIRM-847", "> Proof submitted: PROOF-9f8e7d6c", "> Hash: 0x7a8b...3d4e",
-                 "> Validators assigned: 5", "> Consensus required: 4/5 (80%)", "> Est. verification time: 2 minutes"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(terminal(["# Verification submission", "$ taskboard verify submit \\", "    --task TASK-2025-00847 \\", "    --proof-type composite \\",
+                           "    --telemetry ./sensor_log.json \\", "    --images ./before.jpg,./after.jpg \\",
+                           "    --oracle-ref INV-SYS-CONFIRM-847", "> Proof submitted: PROOF-9f8e7d6c", "> Hash: 0x7a8b...3d4e",
+                           "> Validators assigned: 5", "> Consensus required: 4/5 (80%)", "> Est. verification time: 2 minutes"], styles))
     
     story.append(Spacer(1, 15))
     story.append(Paragraph("Validator Requirements", styles['SubSection']))
-    for v in ["Minimum stake: 500 SOL", "Uptime requirement: 99.5%", "Response time SLA: <30 seconds",
-              "Hardware: GPU recommended for visual proof analysis", "Slashing: Up to 20% for incorrect verdicts"]:
-        story.append(Paragraph("  * " + v, styles['BulletItem']))
+    story.append(ListBlock(["Minimum stake: 500 SOL", "Uptime requirement: 99.5%", "Response time SLA: <30 seconds",
+                            "Hardware: GPU recommended for visual proof analysis", "Slashing: Up to 20% for incorrect verdicts"], styles['BulletItem'], bullet='*'))
     
-    story.append(PageBreak())
+    return story
+
+def section_protocol_economics(styles):
+    """09 Protocol Economics"""
+    story = []
     
-    # 9. PROTOCOL ECONOMICS
     story.append(Paragraph("09 Protocol Economics", styles['SectionTitle']))
     story.append(Paragraph("TaskBoard uses a sustainable fee model that incentivizes all network participants while keeping costs competitive with traditional alternatives. The protocol captures value from successful task completions and redistributes to stakeholders.", styles['Body']))
     
     story.append(Paragraph("Fee Structure", styles['SubSection']))
-    story.append(Paragraph("# Fee calculation", styles['TerminalComment']))
-    for line in ["$ taskboard fees --calculate 100", "> Task Value: 100 SOL", "> ", "> Protocol Fee (2.5%): 2.5 SOL",
-                 ">   - Treasury: 1.5 SOL", ">   - Token buyback: 0.5 SOL", ">   - Insurance fund: 0.5 SOL", "> ",
-                 "> Validator Rewards (0.5%): 0.5 SOL", ">   - Split among 5 validators", "> ",
-                 "> Network Gas: ~0.00025 SOL", "> ", "> Robot Receives: 97 SOL", "> Effective Take Rate: 3%"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(Paragraph("Every completed task pays a protocol fee and validator rewards out of the task value; validator rewards are split among the validators that verified the task. The rest goes to the robot operator, for a take rate of %g%% plus network gas." % FEES.fee_rate, styles['Body']))
+    story.append(data_table(schedule_rows(FEES, EXAMPLE_VALUE),
+                            [Column('item', "Component"), Column('rate', "Rate", format='%g%%', align='right', wrap=False),
+                             Column('amount', "On a %d SOL task" % EXAMPLE_VALUE, format='%g SOL', align='right', wrap=False)],
+                            styles))
+
+    story.append(Paragraph("Effective Take Rate", styles['SubSection']))
+    story.append(Paragraph("Network gas is about %g SOL per transaction and a task takes %d transactions. Being flat, gas weighs on small tasks; the share of a task's value that does not reach the operator only settles at %g%% for larger tasks." % (GAS_PER_TRANSACTION, TRANSACTIONS_PER_TASK, FEES.fee_rate), styles['Body']))
+    values, take_rates = FEES.take_rate_curve(CURVE_VALUES[0], CURVE_VALUES[-1])
+    story.append(line_chart([zip(values, take_rates)], [(value, '%g' % value) for value in CURVE_VALUES], x_log=True,
+                            y_format='%g%%', x_title="Task value (SOL)", y_title="Take rate"))
+    story.append(data_table(take_rate_rows(FEES, SAMPLE_VALUES),
+                            [Column('value', "Task value", format='%g SOL', align='right', wrap=False),
+                             Column('fees', "Fees", format='%.4g SOL', align='right', wrap=False),
+                             Column('gas', "Gas", format='%g SOL', align='right', wrap=False),
+                             Column('robot', "Robot receives", format='%.6g SOL', align='right', wrap=False),
+                             Column('take_rate', "Take rate", format='%.2f%%', align='right', wrap=False)],
+                            styles))
+    story.append(Paragraph("Fee Sensitivity", styles['WhiteHead']))
+    story.append(Paragraph("Take rate by protocol fee and task value, validator rewards and gas unchanged.", styles['Body']))
+    story.append(data_table(sensitivity_rows(FEES, SAMPLE_VALUES, SENSITIVITY_FEES),
+                            [Column('protocol_fee', "Protocol fee", format='%g%%', wrap=False)] +
+                            [Column(value, "%g SOL" % value, format='%.2f%%', align='right', wrap=False) for value in SAMPLE_VALUES],
+                            styles))
     
     story.append(Spacer(1, 15))
     story.append(Paragraph("Staking Requirements", styles['SubSection']))
-    staking = [("Robot Operators", "Minimum 100 SOL stake as collateral. Higher stakes unlock premium features and priority matching."),
-               ("Validators", "Minimum 500 SOL to join verification network. Stake weighted toward higher-performing validators."),
-               ("Task Posters", "No stake required. Optional stake for priority task listing and faster matching."),
-               ("Slashing", "Up to 50% of stake for fraudulent proofs, failed tasks, or validator misbehavior.")]
-    for name, desc in staking:
-        story.append(Paragraph(name, styles['WhiteHead']))
-        story.append(Paragraph(desc, styles['Body']))
-    
-    story.append(PageBreak())
+    staking = [{'role': "Robot Operators", 'stake': "100 SOL", 'terms': "Collateral. Higher stakes unlock premium features and priority matching."},
+               {'role': "Validators", 'stake': "500 SOL", 'terms': "Required to join the verification network. Stake weighted toward higher-performing validators."},
+               {'role': "Task Posters", 'stake': "None", 'terms': "Optional stake for priority task listing and faster matching."}]
+    story.append(data_table(staking, [Column('role', "Participant", wrap=False), Column('stake', "Minimum stake", wrap=False),
+                                      Column('terms', "Terms")], styles))
+    story.append(Paragraph("Slashing", styles['WhiteHead']))
+    story.append(Paragraph("Up to 50% of stake for fraudulent proofs, failed tasks, or validator misbehavior.", styles['Body']))
+    
+    return story
+
+def section_use_cases(styles):
+    """10 Use Cases"""
+    story = []
     
-    # 10. USE CASES
     story.append(Paragraph("10 Use Cases", styles['SectionTitle']))
     story.append(Paragraph("TaskBoard enables a wide range of robotic service applications across industries. The following examples illustrate how different participants can benefit from the protocol.", styles['Body']))
     
@@ -410,61 +578,61 @@ def create_pdf():
     story.append(Paragraph("Agricultural Services", styles['SubSection']))
     story.append(Paragraph("A farm cooperative needs crop monitoring and spraying services across member properties. They post seasonal service contracts on TaskBoard with field boundaries and treatment specifications. Agricultural drone operators bid on regional packages. Telemetry proof confirms coverage area and application rates.", styles['Body']))
     
-    story.append(PageBreak())
+    return story
+
+def section_technical_specifications(styles):
+    """11 Technical Specifications"""
+    story = []
     
-    # 11. TECHNICAL SPECIFICATIONS
     story.append(Paragraph("11 Technical Specifications", styles['SectionTitle']))
     
     story.append(Paragraph("Blockchain", styles['SubSection']))
-    story.append(Paragraph("# Network specifications", styles['TerminalComment']))
-    for line in ["$ taskboard specs --blockchain", "> Chain: Solana", "> Consensus: Proof of History + Proof of Stake",
-                 "> Block Time: 400ms", "> TPS: 65,000+", "> Finality: ~400ms", "> Transaction Cost: ~$0.00025",
-                 "> Smart Contract: Anchor Framework", "> Language: Rust"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(terminal(["# Network specifications", "$ taskboard specs --blockchain", "> Chain: Solana", "> Consensus: Proof of History + Proof of Stake",
+                           "> Block Time: 400ms", "> TPS: 65,000+", "> Finality: ~400ms", "> Transaction Cost: ~$0.00025",
+                           "> Smart Contract: Anchor Framework", "> Language: Rust"], styles))
     
     story.append(Spacer(1, 10))
     story.append(Paragraph("API Specifications", styles['SubSection']))
-    story.append(Paragraph("# API details", styles['TerminalComment']))
-    for line in ["$ taskboard specs --api", "> REST API: /api/v1", "> WebSocket: /ws",
-                 "> GraphQL: /graphql", "> Rate Limit: 100 req/min (free), 1000 req/min (pro)",
-                 "> Authentication: JWT + Wallet Signature", "> SDK Languages: Python, JavaScript, Rust, Go"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(terminal(["# API details", "$ taskboard specs --api", "> REST API: /api/v1", "> WebSocket: /ws",
+                           "> GraphQL: /graphql", "> Rate Limit: 100 req/min (free), 1000 req/min (pro)",
+                           "> Authentication: JWT + Wallet Signature", "> SDK Languages: Python, JavaScript, Rust, Go"], styles))
     
     story.append(Spacer(1, 10))
     story.append(Paragraph("Data Storage", styles['SubSection']))
-    story.append(Paragraph("# Storage architecture", styles['TerminalComment']))
-    for line in ["$ taskboard specs --storage", "> On-chain: Task state, escrow, verification proofs",
-                 "> IPFS: Large proof files, images, telemetry logs", "> Arweave: Permanent archival of completed tasks",
-                 "> Indexer: TheGraph subgraph for queries"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(terminal(["# Storage architecture", "$ taskboard specs --storage", "> On-chain: Task state, escrow, verification proofs",
+                           "> IPFS: Large proof files, images, telemetry logs", "> Arweave: Permanent archival of completed tasks",
+                           "> Indexer: TheGraph subgraph for queries"], styles))
     
-    story.append(PageBreak())
+    return story
+
+def section_governance(styles):
+    """12 Governance"""
+    story = []
     
-    # 12. GOVERNANCE
     story.append(Paragraph("12 Governance", styles['SectionTitle']))
     story.append(Paragraph("TaskBoard will transition to community governance through a DAO structure. Token holders will vote on protocol upgrades, fee adjustments, and treasury allocation. The governance model is designed to balance efficiency with decentralization.", styles['Body']))
     
     story.append(Paragraph("Governance Scope", styles['SubSection']))
-    for g in ["Protocol fee adjustments (within predefined bounds)", "Staking requirements and slashing parameters",
-              "New robot type and capability approvals", "Treasury fund allocation and grants",
-              "Smart contract upgrades and migrations", "Validator requirements and rewards", "Emergency protocol actions"]:
-        story.append(Paragraph("  * " + g, styles['BulletItem']))
+    story.append(ListBlock(["Protocol fee adjustments (within predefined bounds)", "Staking requirements and slashing parameters",
+                            "New robot type and capability approvals", "Treasury fund allocation and grants",
+                            "Smart contract upgrades and migrations", "Validator requirements and rewards", "Emergency protocol actions"], styles['BulletItem'], bullet='*'))
     
     story.append(Paragraph("Proposal Process", styles['SubSection']))
-    story.append(Paragraph("# Create governance proposal", styles['TerminalComment']))
-    for line in ["$ taskboard governance propose \\", "    --title 'Reduce protocol fee to 2%' \\",
-                 "    --description proposal.md \\", "    --type parameter_change \\", "    --voting-period 7d \\",
-                 "    --quorum 10%", "> Proposal created: PROP-0042", "> Proposer stake locked: 10,000 TASK",
-                 "> Discussion period: 3 days", "> Voting opens: TBD", "> Voting closes: TBD"]:
-        story.append(Paragraph(line, styles['Terminal']))
+    story.append(terminal(["# Create governance proposal", "$ taskboard governance propose \\", "    --title 'Reduce protocol fee to 2%' \\",
+                           "    --description proposal.md \\", "    --type parameter_change \\", "    --voting-period 7d \\",
+                           "    --quorum 10%", "> Proposal created: PROP-0042", "> Proposer stake locked: 10,000 TASK",
+                           "> Discussion period: 3 days", "> Voting opens: TBD", "> Voting closes: TBD"], styles))
     
     story.append(Spacer(1, 15))
     story.append(Paragraph("Voting Power", styles['SubSection']))
     story.append(Paragraph("Voting power is determined by staked TASK tokens. Delegation is supported, allowing token holders to assign their voting power to trusted representatives. Quadratic voting is used for certain proposal types to prevent plutocratic dominance.", styles['Body']))
     
-    story.append(PageBreak())
+    return story
+
+def section_security(styles):
+    """13 Security"""
+    story = []
     
-    # 13. SECURITY
     story.append(Paragraph("13 Security", styles['SectionTitle']))
     story.append(Paragraph("Security is paramount for TaskBoard. The protocol implements multiple layers of protection for funds, data, and network integrity. Our security approach combines preventive measures, monitoring, and incident response capabilities.", styles['Body']))
     
@@ -482,9 +650,12 @@ def create_pdf():
         story.append(Paragraph(name, styles['WhiteHead']))
         story.append(Paragraph(desc, styles['Body']))
     
-    story.append(PageBreak())
+    return story
+
+def section_glossary(styles):
+    """14 Glossary"""
+    story = []
     
-    # 14. GLOSSARY
     story.append(Paragraph("14 Glossary", styles['SectionTitle']))
     
     glossary = [("RaaS", "Robot-as-a-Service - Business model where robotic capabilities are accessed on-demand rather than purchased"),
@@ -506,9 +677,12 @@ def create_pdf():
         story.append(Paragraph(term, styles['WhiteHead']))
         story.append(Paragraph(definition, styles['Body']))
     
-    story.append(PageBreak())
+    return story
+
+def section_conclusion(styles):
+    """15 Conclusion"""
+    story = []
     
-    # 15. CONCLUSION
     story.append(Paragraph("15 Conclusion", styles['SectionTitle']))
     story.append(Paragraph("TaskBoard represents a fundamental advancement in how businesses access robotic services. By combining the efficiency of blockchain technology with the growing capabilities of autonomous systems, we enable a new economy where robots and businesses interact directly, efficiently, and trustlessly.", styles['Body']))
     story.append(Paragraph("The Robot-as-a-Service market is projected to reach $41 billion by 2030, yet current infrastructure remains fragmented and inefficient. TaskBoard provides the missing layer that connects supply and demand, ensures fair compensation, and verifies quality - all without trusted intermediaries.", styles['Body']))
@@ -521,8 +695,106 @@ def create_pdf():
     story.append(Spacer(1, 20))
     story.append(Paragraph("2025", styles['Note']))
     
-    doc.build(story, onFirstPage=draw_title_page, onLaterPages=draw_page_background)
-    print("Protocol PDF created: TaskBoard_Documentation.pdf")
+    return story
+
+def section_robot_tco(styles):
+    """Appendix: Robot Total Cost of Ownership"""
+    model = TCOModel()
+    distributions = simulated(jsx_ranges(ROBOTS_JSX), SCENARIOS, model)
+    percentile_columns = [Column('category', "Category", wrap=False)] + [
+        Column(q, "P%d (USD)" % q, format='{:,.0f}', align='right', wrap=False) for q in PERCENTILES]
+    story = []
+
+    story.append(Paragraph("Appendix: Robot Total Cost of Ownership", styles['SectionTitle']))
+    story.append(Paragraph("What a robot costs to own, and what it earns on TaskBoard, depends on where in its category's price range it lands, how busy it is and the fleet it belongs to. We simulated %s scenarios per category, each drawing a price and a fleet integration cost from the category's range, maintenance, revenue efficiency and hourly task revenue from the robot calculator, %d-%d working hours a day and a fleet of %d-%d robots. Revenue pays the protocol's %g%% in fees and every fleet is held for %d years." % ("{:,}".format(SCENARIOS), UTILIZATION[0], UTILIZATION[1], FLEET_SIZE[0], FLEET_SIZE[1], model.fee_rate, YEARS), styles['Body']))
+    story.append(Paragraph("P10, P50 and P90 are the values 10%, 50% and 90% of the scenarios stay at or below. Figures are per robot, the fleet's integration cost shared between its robots.", styles['Body']))
+
+    story.append(Paragraph("Cost of Ownership", styles['SubSection']))
+    story.append(Paragraph("Purchase, integration, maintenance and energy over %d years." % YEARS, styles['Body']))
+    story.append(data_table(percentile_rows(distributions, 'tco'), percentile_columns, styles))
+    story.append(Paragraph("Net Value", styles['SubSection']))
+    story.append(Paragraph("Revenue after fees less the cost of ownership over %d years." % YEARS, styles['Body']))
+    story.append(data_table(percentile_rows(distributions, 'net_value'), percentile_columns, styles))
+
+    story.append(KeepTogether([
+        Paragraph("Payback", styles['SubSection']),
+        Paragraph("Months until revenue after fees, maintenance and energy has paid for the robot and its share of integration, and the share of scenarios that pay back within %d years." % YEARS, styles['Body']),
+        line_chart(payback_curves(distributions, model), [(month, '%d' % month) for month in range(0, model.months + 1, 12)],
+                   y_format='%d%%', x_title="Months", y_title="Paid back",
+                   names=[distribution.category for distribution in distributions])]))
+    story.append(data_table(summary_rows(distributions, model),
+                            [Column('category', "Category", wrap=False),
+                             Column('hourly_cost', "Cost per hour (P50)", format='$%.2f', align='right', wrap=False),
+                             Column('payback', "Payback (P50)", format='%.1f months', align='right', wrap=False),
+                             Column('paid_back', "Paid back in %d years" % YEARS, format='%.0f%%', align='right', wrap=False)],
+                            styles))
+    
+    return story
+
+def robot_catalog(records, styles, categories=None, run_size=RUN_SIZE):
+    """Spec sheets for a stream of robot records, grouped by category
+
+    A generator over docbuild.robots.catalog_groups(), so the catalog is
+    never held in memory as a whole, however many SKUs it has.
+    """
+    categories = categories or {}
+    for category, group in catalog_groups(records, run_size):
+        yield Paragraph(escape(category), styles['SubSection'])
+        description = categories.get(category, {}).get('description')
+        if description:
+            yield Paragraph(escape(description), styles['Body'])
+        for record in group:
+            rows = [{'label': label, 'value': value} for label, value in spec_sheet(record)]
+            yield KeepTogether([Paragraph(escape(record['name']), styles['WhiteHead']),
+                                data_table(rows, [Column('label', "", wrap=False), Column('value', "")], styles)])
+
+def section_robot_catalog(styles):
+    """Appendix: Robot Catalog"""
+    yield Paragraph("Appendix: Robot Catalog", styles['SectionTitle'])
+    yield Paragraph("Every robot model offered through the TaskBoard marketplace, by category. Prices are list prices in USD; maintenance is the expected yearly cost.", styles['Body'])
+    yield from robot_catalog(read_records(ROBOTS_JSX), styles, jsx_categories())
+
+SECTIONS = [
+    ("Title", section_title),
+    ("Contents", section_contents),
+    ("01 Executive Summary", section_executive_summary),
+    ("02 Introduction", section_introduction),
+    ("03 Problem Statement", section_problem_statement),
+    ("04 Solution Overview", section_solution_overview),
+    ("05 Protocol Architecture", section_protocol_architecture),
+    ("06 Task Lifecycle", section_task_lifecycle),
+    ("07 Robot SDK", section_robot_sdk),
+    ("08 Verification System", section_verification_system),
+    ("09 Protocol Economics", section_protocol_economics),
+    ("10 Use Cases", section_use_cases),
+    ("11 Technical Specifications", section_technical_specifications),
+    ("12 Governance", section_governance),
+    ("13 Security", section_security),
+    ("14 Glossary", section_glossary),
+    ("15 Conclusion", section_conclusion),
+    ("Appendix: Robot Total Cost of Ownership", section_robot_tco),
+    ("Appendix: Robot Catalog", section_robot_catalog),
+]
+
+DEFAULT_OUTPUT = "/home/claude/taskboard/TaskBoard_Documentation.pdf"
+
+def create_doc(filename):
+    return SimpleDocTemplate(filename, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+
+SPEC = DocumentSpec(
+    'whitepaper', SECTIONS, create_styles, create_doc,
+    on_first_page=draw_title_page, on_later_pages=draw_page_decoration,
+    draw_page_number=draw_page_number, sources=[ROBOTS_JSX, LOGO] + sorted(ROBOT_IMAGES.values()),
+    personalization=PERSONALIZATION,
+)
+
+def create_pdf(output=DEFAULT_OUTPUT, cache_dir=None, jobs=1, trace=None, deterministic=False, manifest=None):
+    """Build the whitepaper (see docbuild.build.build_pdf() for the options)
+
+    The TCO simulation runs its shards in a pool of jobs as well.
+    """
+    with simulating(jobs):
+        build_pdf(SPEC, output, cache_dir, jobs, trace, deterministic, manifest, "Protocol PDF created")
 
 if __name__ == "__main__":
-    create_pdf()
+    sys.exit(main(SPEC, create_pdf, DEFAULT_OUTPUT, __doc__))
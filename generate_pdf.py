@@ -4,22 +4,63 @@ TaskBoard Documentation PDF Generator
 Generates a comprehensive PDF matching the website content exactly.
 """
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, PageBreak, 
-    Table, TableStyle, ListFlowable, ListItem
-)
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+import sys
+from functools import partial
+from xml.sax.saxutils import escape
+
+from docbuild import DocumentSpec, build_pdf
+from docbuild.cli import main
+from docbuild.lazy import lazy_import
+from docbuild.styles import stylesheet
+from docbuild.content import DOCS_JSX, load_library_docs
+from docbuild.fees import (CURVE_VALUES, EXAMPLE_VALUE, FEES, GAS_PER_TRANSACTION, SAMPLE_VALUES, SENSITIVITY_FEES,
+                           TASK_TRANSACTIONS, TRANSACTIONS_PER_TASK, schedule_rows, sensitivity_rows, take_rate_rows)
+
+# reportlab is only imported once something is rendered
+REPORTLAB = lazy_import(globals(), [
+    ('reportlab.lib.pagesizes', 'letter'),
+    ('reportlab.lib.styles', 'getSampleStyleSheet ParagraphStyle'),
+    ('reportlab.lib.colors', 'HexColor'),
+    ('reportlab.platypus', 'SimpleDocTemplate Paragraph Spacer'),
+    ('reportlab.lib.enums', 'TA_CENTER'),
+    ('docbuild.flowables', 'CodeBlock Contents ListBlock'),
+    ('docbuild.tables', 'Column DataTable TableTheme'),
+    ('docbuild.charts', 'ChartTheme LineChart'),
+])
 
 # Colors
-ACCENT_PRIMARY = HexColor('#7c3aed')
-ACCENT_SECONDARY = HexColor('#06b6d4')
-TEXT_PRIMARY = HexColor('#1a1a2e')
-TEXT_SECONDARY = HexColor('#6b7280')
+ACCENT_PRIMARY = '#7c3aed'
+ACCENT_SECONDARY = '#06b6d4'
+TEXT_PRIMARY = '#1a1a2e'
+TEXT_SECONDARY = '#6b7280'
+CODE_CYAN = '#0e7490'
+
+# Syntax colours for CodeBlock token kinds
+CODE_COLORS = {
+    'comment': TEXT_SECONDARY,
+    'prompt': TEXT_SECONDARY,
+    'keyword': ACCENT_PRIMARY,
+    'section': ACCENT_PRIMARY,
+    'key': ACCENT_PRIMARY,
+    'string': CODE_CYAN,
+    'number': CODE_CYAN,
+    'variable': CODE_CYAN,
+    'flag': CODE_CYAN,
+}
+
+# points per inch, as reportlab.lib.units.inch; a plain number because
+# arithmetic on a lazy name would not import its group
+inch = 72.0
+
+_library_docs = []
 
+def library_docs():
+    """SDK reference content, parsed from src/pages/Docs.jsx on first use"""
+    if not _library_docs:
+        _library_docs.append(load_library_docs())
+    return _library_docs[0]
+
+@stylesheet('light')
 def create_styles():
     styles = getSampleStyleSheet()
     
@@ -88,6 +129,36 @@ def create_styles():
         leading=14
     ))
     
+    # Contents entry for a subsection
+    styles.add(ParagraphStyle(
+        name='DocContentsSub',
+        parent=styles['DocBody'],
+        fontSize=10,
+        leftIndent=20,
+        spaceAfter=4,
+        leading=14
+    ))
+    
+    # Table header and cells
+    styles.add(ParagraphStyle(
+        name='DocTableHead',
+        parent=styles['Normal'],
+        fontSize=9,
+        fontName='Helvetica-Bold',
+        textColor=ACCENT_PRIMARY,
+        leading=12,
+        spaceBefore=6
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='DocTableCell',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=TEXT_PRIMARY,
+        leading=12,
+        spaceAfter=10
+    ))
+    
     # Code style
     styles.add(ParagraphStyle(
         name='DocCode',
@@ -105,20 +176,21 @@ def create_styles():
     
     return styles
 
-def build_document():
-    doc = SimpleDocTemplate(
-        "TaskBoard_Documentation.pdf",
-        pagesize=letter,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch
-    )
-    
-    styles = create_styles()
+def data_table(rows, columns, styles):
+    """Table of rows (dicts) in the light theme"""
+    theme = TableTheme(styles['DocTableHead'], styles['DocTableCell'], header_fill='#f3f4f6',
+                       row_fills=(None, '#f9fafb'), rule_color='#e5e7eb')
+    return DataTable(rows, columns, theme)
+
+def line_chart(series, x_ticks, **options):
+    """Line chart in the light theme, as wide as the text"""
+    theme = ChartTheme((ACCENT_PRIMARY, ACCENT_SECONDARY), TEXT_SECONDARY, '#e5e7eb')
+    return LineChart(series, theme, letter[0] - 1.5 * inch, 180, x_ticks, **options)
+
+def section_title(styles):
+    """Title page"""
     story = []
     
-    # ==================== TITLE PAGE ====================
     story.append(Spacer(1, 2*inch))
     story.append(Paragraph("TaskBoard", styles['DocTitle']))
     story.append(Paragraph("Robot-as-a-Service Protocol", styles['DocSubtitle']))
@@ -129,30 +201,26 @@ def build_document():
     story.append(Paragraph("Built on Solana", styles['DocBody']))
     story.append(Spacer(1, 0.5*inch))
     story.append(Paragraph("Version 1.0 | December 2024", styles['DocBody']))
-    story.append(PageBreak())
     
-    # ==================== TABLE OF CONTENTS ====================
+    return story
+
+def section_contents(styles):
+    """Table of contents"""
+    story = []
+    
     story.append(Paragraph("Table of Contents", styles['SectionHeader']))
     story.append(Spacer(1, 20))
     
-    toc_items = [
-        "1. Overview",
-        "2. Architecture", 
-        "3. Task Lifecycle",
-        "4. Robot SDK",
-        "5. Verification System",
-        "6. Protocol Economics",
-        "7. Technology Stack",
-        "8. Roadmap",
-        "9. Core Values"
-    ]
-    
-    for item in toc_items:
-        story.append(Paragraph(item, styles['DocBody']))
+    sdk_titles = set(title for title, build in sdk_reference_sections())
+    story.append(Contents([(title, styles['DocContentsSub']) if title in sdk_titles else title
+                           for title, build in SPEC.sections[2:]], styles['DocBody']))
     
-    story.append(PageBreak())
+    return story
+
+def section_overview(styles):
+    """1. Overview"""
+    story = []
     
-    # ==================== 1. OVERVIEW ====================
     story.append(Paragraph("1. Overview", styles['SectionHeader']))
     
     story.append(Paragraph(
@@ -175,12 +243,14 @@ def build_document():
         "efficient resource allocation across a global network."
     ]
     
-    for challenge in challenges:
-        story.append(Paragraph("• " + challenge, styles['DocList']))
+    story.append(ListBlock(challenges, styles['DocList']))
     
-    story.append(PageBreak())
+    return story
+
+def section_architecture(styles):
+    """2. Architecture"""
+    story = []
     
-    # ==================== 2. ARCHITECTURE ====================
     story.append(Paragraph("2. Architecture", styles['SectionHeader']))
     
     story.append(Paragraph("The TaskBoard protocol consists of four primary layers:", styles['DocBody']))
@@ -203,8 +273,7 @@ def build_document():
         "Payment release logic",
         "Dispute resolution"
     ]
-    for item in protocol_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(protocol_items, styles['DocList']))
     
     # Robot SDK Layer
     story.append(Paragraph("Robot SDK Layer", styles['SubsectionHeader']))
@@ -215,8 +284,7 @@ def build_document():
         "Proof generation utilities",
         "Wallet management"
     ]
-    for item in sdk_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(sdk_items, styles['DocList']))
     
     # Verification Layer
     story.append(Paragraph("Verification Layer", styles['SubsectionHeader']))
@@ -227,12 +295,14 @@ def build_document():
         "Reach consensus on outcomes",
         "Earn fees for honest participation"
     ]
-    for item in verification_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(verification_items, styles['DocList']))
     
-    story.append(PageBreak())
+    return story
+
+def section_task_lifecycle(styles):
+    """3. Task Lifecycle"""
+    story = []
     
-    # ==================== 3. TASK LIFECYCLE ====================
     story.append(Paragraph("3. Task Lifecycle", styles['SectionHeader']))
     
     story.append(Paragraph("Every task on TaskBoard follows a standardized lifecycle:", styles['DocBody']))
@@ -247,8 +317,7 @@ def build_document():
         "Payment amount in SOL or USDC",
         "Required robot capabilities"
     ]
-    for item in creation_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(creation_items, styles['DocList']))
     
     # Step 2
     story.append(Paragraph("2. Escrow Deposit", styles['SubsectionHeader']))
@@ -267,8 +336,7 @@ def build_document():
         "Equipment specifications",
         "Any discounts offered"
     ]
-    for item in bidding_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(bidding_items, styles['DocList']))
     
     # Step 4
     story.append(Paragraph("4. Matching & Assignment", styles['SubsectionHeader']))
@@ -302,9 +370,12 @@ def build_document():
         styles['DocBody']
     ))
     
-    story.append(PageBreak())
+    return story
+
+def section_robot_sdk(styles):
+    """4. Robot SDK"""
+    story = []
     
-    # ==================== 4. ROBOT SDK ====================
     story.append(Paragraph("4. Robot SDK", styles['SectionHeader']))
     
     story.append(Paragraph(
@@ -312,53 +383,36 @@ def build_document():
         styles['DocBody']
     ))
     
-    story.append(Paragraph("Installation", styles['SubsectionHeader']))
-    story.append(Paragraph("npm install @taskboard/robot-sdk", styles['DocCode']))
-    story.append(Paragraph("# or", styles['DocCode']))
-    story.append(Paragraph("cargo add taskboard-sdk", styles['DocCode']))
+    story.append(Paragraph("The SDK reference below is generated from the website documentation:", styles['DocBody']))
+    story.append(ListBlock(["4.%d %s" % (number, escape(page['title']))
+                            for number, page in enumerate(library_docs()['pages'], 1)], styles['DocList']))
+    
+    return story
+
+def section_sdk_page(number, page, styles):
+    """One page of the SDK reference, rendered from the Docs.jsx content IR"""
+    story = []
+    
+    story.append(Paragraph("4.%d %s" % (number, escape(page['title'])), styles['SectionHeader']))
+    
+    for section in page['sections']:
+        story.append(Paragraph(escape(section['title']), styles['SubsectionHeader']))
+        if section['description']:
+            story.append(Paragraph(escape(section['description']), styles['DocBody']))
+        if section['code']:
+            story.append(CodeBlock(section['code'], section['language'], styles['DocCode'], CODE_COLORS))
     
-    story.append(Paragraph("Initialization", styles['SubsectionHeader']))
-    code_init = """import { TaskBoardClient } from '@taskboard/robot-sdk';
+    return story
 
-const client = new TaskBoardClient({
-  cluster: 'mainnet-beta',
-  wallet: operatorWallet,
-  robotId: 'robot_abc123'
-});"""
-    story.append(Paragraph(code_init.replace('\n', '<br/>'), styles['DocCode']))
-    
-    story.append(Paragraph("Discovering Tasks", styles['SubsectionHeader']))
-    code_discover = """const tasks = await client.getTasks({
-  type: ['delivery', 'patrol'],
-  maxDistance: 50, // km
-  minPayment: 10   // USDC
-});"""
-    story.append(Paragraph(code_discover.replace('\n', '<br/>'), styles['DocCode']))
-    
-    story.append(Paragraph("Submitting Bids", styles['SubsectionHeader']))
-    code_bid = """await client.submitBid({
-  taskId: 'task_xyz',
-  estimatedTime: 3600, // seconds
-  message: 'Available immediately'
-});"""
-    story.append(Paragraph(code_bid.replace('\n', '<br/>'), styles['DocCode']))
-    
-    story.append(Paragraph("Streaming Telemetry", styles['SubsectionHeader']))
-    code_telemetry = """client.startTelemetry({
-  taskId: 'task_xyz',
-  interval: 1000, // ms
-  sensors: ['gps', 'camera', 'lidar']
-});"""
-    story.append(Paragraph(code_telemetry.replace('\n', '<br/>'), styles['DocCode']))
-    
-    story.append(Paragraph("Completing Tasks", styles['SubsectionHeader']))
-    code_complete = """const proof = await client.generateProof('task_xyz');
-await client.submitCompletion(proof);"""
-    story.append(Paragraph(code_complete.replace('\n', '<br/>'), styles['DocCode']))
-    
-    story.append(PageBreak())
-    
-    # ==================== 5. VERIFICATION SYSTEM ====================
+def sdk_reference_sections():
+    """(title, build) pairs for every page of the SDK reference"""
+    return [("4.%d %s" % (number, page['title']), partial(section_sdk_page, number, page))
+            for number, page in enumerate(library_docs()['pages'], 1)]
+
+def section_verification_system(styles):
+    """5. Verification System"""
+    story = []
+    
     story.append(Paragraph("5. Verification System", styles['SectionHeader']))
     
     story.append(Paragraph(
@@ -374,8 +428,7 @@ await client.submitCompletion(proof);"""
         "<b>Sensor Signatures:</b> LiDAR/depth data confirming physical interactions",
         "<b>Third-Party Oracles:</b> Integration with IoT devices at task locations"
     ]
-    for item in proof_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(proof_items, styles['DocList']))
     
     story.append(Paragraph("Validator Requirements", styles['SubsectionHeader']))
     story.append(Paragraph("To become a validator:", styles['DocBody']))
@@ -385,8 +438,7 @@ await client.submitCompletion(proof);"""
         "Process verifications within SLA",
         "Honest participation (slashing for fraud)"
     ]
-    for item in validator_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(validator_items, styles['DocList']))
     
     story.append(Paragraph("Consensus Mechanism", styles['SubsectionHeader']))
     consensus_items = [
@@ -397,8 +449,7 @@ await client.submitCompletion(proof);"""
         "66%+ agreement triggers outcome",
         "Rewards distributed to honest validators"
     ]
-    for i, item in enumerate(consensus_items, 1):
-        story.append(Paragraph(f"{i}. {item}", styles['DocList']))
+    story.append(ListBlock(consensus_items, styles['DocList'], numbered=True))
     
     story.append(Paragraph("Dispute Resolution", styles['SubsectionHeader']))
     story.append(Paragraph("If consensus fails or party disputes:", styles['DocBody']))
@@ -408,12 +459,14 @@ await client.submitCompletion(proof);"""
         "Final binding decision",
         "Potential slashing of bad actors"
     ]
-    for i, item in enumerate(dispute_items, 1):
-        story.append(Paragraph(f"{i}. {item}", styles['DocList']))
+    story.append(ListBlock(dispute_items, styles['DocList'], numbered=True))
     
-    story.append(PageBreak())
+    return story
+
+def section_protocol_economics(styles):
+    """6. Protocol Economics"""
+    story = []
     
-    # ==================== 6. PROTOCOL ECONOMICS ====================
     story.append(Paragraph("6. Protocol Economics", styles['SectionHeader']))
     
     story.append(Paragraph(
@@ -422,23 +475,37 @@ await client.submitCompletion(proof);"""
     ))
     
     story.append(Paragraph("Fee Structure", styles['SubsectionHeader']))
-    story.append(Paragraph("<b>Protocol Fee: 2.5% of task value</b>", styles['DocBody']))
-    fee_items = [
-        "Treasury: 1.5% (development, grants)",
-        "Validators: 0.75% (distributed by stake)",
-        "Insurance Pool: 0.25% (dispute resolution)"
-    ]
-    for item in fee_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
-    
-    story.append(Paragraph("<b>Gas Costs: ~0.00025 SOL per transaction</b>", styles['DocBody']))
-    gas_items = [
-        "Task creation: 1 transaction",
-        "Bid submission: 1 transaction",
-        "Completion: 2-3 transactions"
-    ]
-    for item in gas_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(Paragraph("<b>Fees: %g%% of task value</b>, worked through for a %d SOL task:" % (FEES.fee_rate, EXAMPLE_VALUE), styles['DocBody']))
+    story.append(data_table(schedule_rows(FEES, EXAMPLE_VALUE),
+                            [Column('item', "Component", wrap=False), Column('rate', "Rate", format='%g%%', align='right', wrap=False),
+                             Column('amount', "Amount", format='%g SOL', align='right', wrap=False), Column('purpose', "Purpose")],
+                            styles))
+    
+    story.append(Paragraph("<b>Gas Costs: ~%g SOL per transaction</b>" % GAS_PER_TRANSACTION, styles['DocBody']))
+    gas_items = ["%s: %d transaction%s" % (step, count, '' if count == 1 else 's') for step, count in TASK_TRANSACTIONS]
+    story.append(ListBlock(gas_items, styles['DocList']))
+    
+    story.append(Paragraph("Effective Take Rate", styles['SubsectionHeader']))
+    story.append(Paragraph(
+        "Gas is flat, %d transactions per task, so it weighs on small tasks. The share of the task value "
+        "that does not reach the robot operator:" % TRANSACTIONS_PER_TASK,
+        styles['DocBody']
+    ))
+    values, take_rates = FEES.take_rate_curve(CURVE_VALUES[0], CURVE_VALUES[-1])
+    story.append(line_chart([zip(values, take_rates)], [(value, '%g' % value) for value in CURVE_VALUES], x_log=True,
+                            y_format='%g%%', x_title="Task value (SOL)", y_title="Take rate"))
+    story.append(data_table(take_rate_rows(FEES, SAMPLE_VALUES),
+                            [Column('value', "Task value", format='%g SOL', align='right', wrap=False),
+                             Column('fees', "Fees", format='%.4g SOL', align='right', wrap=False),
+                             Column('gas', "Gas", format='%g SOL', align='right', wrap=False),
+                             Column('robot', "Robot receives", format='%.6g SOL', align='right', wrap=False),
+                             Column('take_rate', "Take rate", format='%.2f%%', align='right', wrap=False)],
+                            styles))
+    story.append(Paragraph("Take rate by protocol fee and task value, validator rewards and gas unchanged:", styles['DocBody']))
+    story.append(data_table(sensitivity_rows(FEES, SAMPLE_VALUES, SENSITIVITY_FEES),
+                            [Column('protocol_fee', "Protocol fee", format='%g%%', wrap=False)] +
+                            [Column(value, "%g SOL" % value, format='%.2f%%', align='right', wrap=False) for value in SAMPLE_VALUES],
+                            styles))
     
     story.append(Paragraph("Payment Options", styles['SubsectionHeader']))
     story.append(Paragraph("Supported currencies:", styles['DocBody']))
@@ -447,8 +514,7 @@ await client.submitCompletion(proof);"""
         "USDC (SPL token)",
         "Future: Additional stablecoins"
     ]
-    for item in payment_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(payment_items, styles['DocList']))
     
     story.append(Paragraph("Staking Mechanics", styles['SubsectionHeader']))
     story.append(Paragraph("Robot operators stake tokens to:", styles['DocBody']))
@@ -458,8 +524,7 @@ await client.submitCompletion(proof);"""
         "Enable higher-value task access",
         "Earn staking rewards"
     ]
-    for item in staking_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(staking_items, styles['DocList']))
     
     story.append(Paragraph("Slash conditions:", styles['DocBody']))
     slash_items = [
@@ -467,8 +532,7 @@ await client.submitCompletion(proof);"""
         "Fraudulent completion: 50% stake",
         "Repeated failures: Progressive penalties"
     ]
-    for item in slash_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(slash_items, styles['DocList']))
     
     story.append(Paragraph("Future Tokenomics", styles['SubsectionHeader']))
     story.append(Paragraph("Governance token planned for:", styles['DocBody']))
@@ -478,12 +542,14 @@ await client.submitCompletion(proof);"""
         "Treasury allocation decisions",
         "Validator set management"
     ]
-    for item in token_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(token_items, styles['DocList']))
     
-    story.append(PageBreak())
+    return story
+
+def section_technology_stack(styles):
+    """7. Technology Stack"""
+    story = []
     
-    # ==================== 7. TECHNOLOGY STACK ====================
     story.append(Paragraph("7. Technology Stack", styles['SectionHeader']))
     
     story.append(Paragraph("Built on proven, scalable infrastructure.", styles['DocBody']))
@@ -496,8 +562,7 @@ await client.submitCompletion(proof);"""
         "SPL Token: Standard",
         "Metaplex: NFT Support"
     ]
-    for item in blockchain_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(blockchain_items, styles['DocList']))
     
     # Frontend
     story.append(Paragraph("Frontend", styles['SubsectionHeader']))
@@ -507,8 +572,7 @@ await client.submitCompletion(proof);"""
         "Framer Motion: 10.x",
         "Vite: 5.x"
     ]
-    for item in frontend_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(frontend_items, styles['DocList']))
     
     # Robot SDK
     story.append(Paragraph("Robot SDK", styles['SubsectionHeader']))
@@ -518,8 +582,7 @@ await client.submitCompletion(proof);"""
         "WebSocket: Real-time",
         "MQTT: Telemetry"
     ]
-    for item in robot_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(robot_items, styles['DocList']))
     
     # Infrastructure
     story.append(Paragraph("Infrastructure", styles['SubsectionHeader']))
@@ -529,12 +592,14 @@ await client.submitCompletion(proof);"""
         "Redis: Cache",
         "PostgreSQL: Index"
     ]
-    for item in infra_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(infra_items, styles['DocList']))
     
-    story.append(PageBreak())
+    return story
+
+def section_roadmap(styles):
+    """8. Roadmap"""
+    story = []
     
-    # ==================== 8. ROADMAP ====================
     story.append(Paragraph("8. Roadmap", styles['SectionHeader']))
     
     story.append(Paragraph("Our path to a decentralized robotic future.", styles['DocBody']))
@@ -547,8 +612,7 @@ await client.submitCompletion(proof);"""
         "Task posting interface",
         "Initial security audits"
     ]
-    for item in phase1_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(phase1_items, styles['DocList']))
     
     # Phase 2
     story.append(Paragraph("Phase 2: Expansion (Upcoming)", styles['SubsectionHeader']))
@@ -558,8 +622,7 @@ await client.submitCompletion(proof);"""
         "Mobile operator app",
         "Partnership integrations"
     ]
-    for item in phase2_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(phase2_items, styles['DocList']))
     
     # Phase 3
     story.append(Paragraph("Phase 3: Scale (Future)", styles['SubsectionHeader']))
@@ -569,12 +632,14 @@ await client.submitCompletion(proof);"""
         "Enterprise solutions",
         "Global robot network"
     ]
-    for item in phase3_items:
-        story.append(Paragraph("• " + item, styles['DocList']))
+    story.append(ListBlock(phase3_items, styles['DocList']))
     
-    story.append(PageBreak())
+    return story
+
+def section_core_values(styles):
+    """9. Core Values"""
+    story = []
     
-    # ==================== 9. CORE VALUES ====================
     story.append(Paragraph("9. Core Values", styles['SectionHeader']))
     
     # Decentralization
@@ -623,9 +688,42 @@ await client.submitCompletion(proof);"""
         styles['DocBody']
     ))
     
-    # Build the document
-    doc.build(story)
-    print("PDF generated: TaskBoard_Documentation.pdf")
+    return story
+
+def sections():
+    """(title, build) pairs of the document; the SDK reference has a section per page of Docs.jsx"""
+    return [
+        ("Title", section_title),
+        ("Table of Contents", section_contents),
+        ("1. Overview", section_overview),
+        ("2. Architecture", section_architecture),
+        ("3. Task Lifecycle", section_task_lifecycle),
+        ("4. Robot SDK", section_robot_sdk),
+    ] + sdk_reference_sections() + [
+        ("5. Verification System", section_verification_system),
+        ("6. Protocol Economics", section_protocol_economics),
+        ("7. Technology Stack", section_technology_stack),
+        ("8. Roadmap", section_roadmap),
+        ("9. Core Values", section_core_values),
+    ]
+
+DEFAULT_OUTPUT = "TaskBoard_Documentation.pdf"
+
+def create_doc(filename):
+    return SimpleDocTemplate(
+        filename,
+        pagesize=letter,
+        rightMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch
+    )
+
+SPEC = DocumentSpec('technical-docs', sections, create_styles, create_doc, sources=[DOCS_JSX])
+
+def build_document(output=DEFAULT_OUTPUT, cache_dir=None, jobs=1, trace=None, deterministic=False, manifest=None):
+    """Build the technical docs (see docbuild.build.build_pdf() for the options)"""
+    build_pdf(SPEC, output, cache_dir, jobs, trace, deterministic, manifest, "PDF generated")
 
 if __name__ == "__main__":
-    build_document()
+    sys.exit(main(SPEC, build_document, DEFAULT_OUTPUT, "Generate the TaskBoard technical documentation PDF"))
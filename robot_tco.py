@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Simulate robot total cost of ownership for a customer quote
+
+Runs the Monte Carlo model of docbuild/tco.py over the robot categories of
+src/pages/Robots.jsx and prints the percentiles of every outcome per
+robot: cost of ownership, cost per working hour, net value and payback.
+Scenarios are simulated in shards across a process pool.
+
+    python robot_tco.py --scenarios 5000000 --fleet 12 --hours 6 10
+    python robot_tco.py --category "Delivery Bots" --years 3 --json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from docbuild.robots import ROBOTS_JSX
+from docbuild.tco import (FLEET_SIZE, OUTCOMES, PERCENTILES, SEED, UTILIZATION, YEARS, TCOModel, jsx_ranges,
+                          simulate)
+
+FORMATS = {'tco': '%12.0f', 'hourly_cost': '%12.2f', 'net_value': '%12.0f', 'payback': '%12.1f'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--source', default=ROBOTS_JSX, help="Robots.jsx to read the price ranges from")
+    parser.add_argument('--category', action='append',
+                        help="only simulate this category (repeatable; default all)")
+    parser.add_argument('--scenarios', type=int, default=1000000,
+                        help="scenarios per category (default 1000000)")
+    parser.add_argument('--years', type=int, default=YEARS, help="years the fleet is held (default %d)" % YEARS)
+    parser.add_argument('--hours', type=float, nargs=2, default=UTILIZATION, metavar=('LOW', 'HIGH'),
+                        help="working hours per day (default %g %g)" % UTILIZATION)
+    parser.add_argument('--fleet', type=int, help="robots in the fleet (default %d to %d)" % FLEET_SIZE)
+    parser.add_argument('--seed', type=int, default=SEED, help="seed of the simulation (default %d)" % SEED)
+    parser.add_argument('--jobs', type=int, default=0, help="shards simulated in parallel (0 = one per CPU)")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    ranges = jsx_ranges(args.source)
+    if args.category:
+        unknown = set(args.category) - set(costs.category for costs in ranges)
+        if unknown:
+            parser.error("unknown category: %s (have %s)" % (", ".join(sorted(unknown)),
+                                                             ", ".join(costs.category for costs in ranges)))
+        ranges = [costs for costs in ranges if costs.category in args.category]
+    fleet = FLEET_SIZE if args.fleet is None else (args.fleet, args.fleet)
+    model = TCOModel(args.years, args.hours, fleet)
+
+    started = time.perf_counter()
+    distributions = simulate(ranges, args.scenarios, model, args.seed, args.jobs)
+    seconds = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps([{'category': distribution.category, 'scenarios': distribution.scenarios,
+                           'percentiles': dict((name, dict((q, round(float(distribution.percentile(name, q)), 2))
+                                                           for q in PERCENTILES))
+                                               for name in OUTCOMES)}
+                          for distribution in distributions], indent=1))
+    else:
+        for distribution in distributions:
+            print("%s (%d scenarios)" % (distribution.category, distribution.scenarios))
+            print("  %-12s" % "" + "".join("%12s" % ("P%d" % q) for q in PERCENTILES))
+            for name in OUTCOMES:
+                print("  %-12s" % name + "".join(FORMATS[name] % distribution.percentile(name, q)
+                                                 for q in PERCENTILES))
+    sys.stderr.write("%d scenarios in %.2f s\n" % (args.scenarios * len(ranges), seconds))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
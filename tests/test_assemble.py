@@ -0,0 +1,35 @@
+import pypdf
+
+from docbuild.assemble import PRODUCER, assemble_pdf
+
+
+def write_part(path, text):
+    from reportlab.pdfgen.canvas import Canvas
+
+    canvas = Canvas(path, invariant=1)
+    canvas.setFont('Courier', 12)
+    canvas.drawString(72, 720, text)
+    canvas.showPage()
+    canvas.save()
+    return path
+
+
+def draw_number(canvas, page_num):
+    canvas.setFont('Helvetica', 9)
+    canvas.drawString(300, 30, str(page_num))
+
+
+def test_parts_are_concatenated_and_share_their_fonts(tmp_path):
+    parts = [write_part(str(tmp_path / ('part%d.pdf' % index)), 'part %d' % index) for index in range(3)]
+    output = str(tmp_path / 'out.pdf')
+    assert assemble_pdf(parts, output, draw_number) == [1, 1, 1]
+
+    reader = pypdf.PdfReader(output)
+    assert reader.metadata['/Producer'] == PRODUCER
+    fonts = set()
+    for number, page in enumerate(reader.pages, 1):
+        text = page.extract_text()
+        assert 'part %d' % (number - 1) in text and str(number) in text
+        for name, font in page['/Resources']['/Font'].items():
+            fonts.add((font.get_object()['/BaseFont'], font.idnum))
+    assert sorted(base for base, idnum in fonts) == ['/Courier', '/Helvetica']
@@ -0,0 +1,61 @@
+from functools import partial
+
+import pypdf
+
+from docbuild.build import build_sections
+from docbuild.cache import SectionCache
+from docbuild.fingerprint import fingerprint_flowables
+from docbuild.spec import DocumentSpec
+
+
+def create_styles():
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    return getSampleStyleSheet()
+
+
+def create_doc(path):
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(path)
+
+
+def section(text, styles):
+    from reportlab.platypus import Paragraph
+
+    return [Paragraph(text, styles['Normal'])]
+
+
+def spec(texts):
+    return DocumentSpec('cached', [(text, partial(section, text)) for text in texts], create_styles, create_doc)
+
+
+def test_unchanged_sections_are_reused_and_changed_ones_rendered(tmp_path):
+    cache_dir, output = str(tmp_path / 'cache'), str(tmp_path / 'out.pdf')
+    first = build_sections(spec(['one', 'two', 'three']), output, cache_dir)
+    assert [hit for title, pages, hit in first] == [False, False, False]
+
+    again = build_sections(spec(['one', 'two', 'three']), output, cache_dir)
+    assert [hit for title, pages, hit in again] == [True, True, True]
+
+    changed = build_sections(spec(['one', 'two, changed', 'three']), output, cache_dir)
+    assert [hit for title, pages, hit in changed] == [True, False, True]
+    assert 'two, changed' in pypdf.PdfReader(output).pages[1].extract_text()
+
+
+def test_prune_drops_sections_no_build_refers_to(tmp_path):
+    cache_dir, output = str(tmp_path / 'cache'), str(tmp_path / 'out.pdf')
+    build_sections(spec(['one', 'two']), output, cache_dir)
+    build_sections(spec(['one', 'three']), output, cache_dir)
+    cache = SectionCache(cache_dir)
+    assert sorted(entry['title'] for entry in cache.load_manifest('cached')) == ['one', 'three']
+    assert len([entry for entry in (tmp_path / 'cache').iterdir() if entry.suffix == '.pdf']) == 2
+
+
+def test_fingerprint_follows_text_and_style():
+    styles = create_styles()
+    base = fingerprint_flowables(section('one', styles))
+    assert fingerprint_flowables(section('one', styles)) == base
+    assert fingerprint_flowables(section('two', styles)) != base
+    styles['Normal'].fontSize += 1
+    assert fingerprint_flowables(section('one', styles)) != base
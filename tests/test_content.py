@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from docbuild.content import DOCS_JSX, library_docs_ir, load_library_docs
+from docbuild.jsx import JSXParseError, extract_const
+
+SOURCE = """
+import React from 'react';
+
+const libraryDocs = {
+  installation: {
+    title: 'Installation',
+    icon: 'overview',
+    sections: [
+      {
+        title: "NPM Installation",
+        description: 'Install the SDK', // trailing comment
+        code: `npm install @taskboard/robot-sdk
+echo \\`done\\` ${version}`,
+        language: 'bash',
+      },
+    ],
+  },
+  events: {sections: [{title: 'Events'}]},
+};
+"""
+
+
+def test_ir_reads_pages_and_sections_in_order():
+    ir = library_docs_ir(SOURCE)
+    assert [page['key'] for page in ir['pages']] == ['installation', 'events']
+    install, events = ir['pages']
+    assert (install['title'], install['icon']) == ('Installation', 'overview')
+    assert install['sections'] == [{'title': 'NPM Installation', 'description': 'Install the SDK',
+                                    'code': 'npm install @taskboard/robot-sdk\necho `done` ${version}',
+                                    'language': 'bash'}]
+    assert events['title'] == 'events'
+    assert events['sections'] == [{'title': 'Events', 'description': '', 'code': '', 'language': 'text'}]
+
+
+def test_parse_errors_give_the_line():
+    with pytest.raises(JSXParseError) as error:
+        extract_const("const x = {\n  a: 1,\n  b: ?\n};", 'x')
+    assert error.value.line == 3
+
+
+def test_ir_is_cached_until_the_source_changes(tmp_path):
+    path, cache_dir = str(tmp_path / 'Docs.jsx'), str(tmp_path / 'cache')
+    with open(path, 'w') as f:
+        f.write(SOURCE)
+    first = load_library_docs(path, cache_dir)
+    cached = os.path.join(cache_dir, 'library-docs.ir.json')
+    assert os.path.exists(cached)
+    stamp = os.stat(cached).st_mtime_ns
+    assert load_library_docs(path, cache_dir) == first
+    assert os.stat(cached).st_mtime_ns == stamp
+
+    with open(path, 'w') as f:
+        f.write(SOURCE.replace("'Installation'", "'Getting started'"))
+    assert load_library_docs(path, cache_dir)['pages'][0]['title'] == 'Getting started'
+
+
+def test_site_docs_parse():
+    pages = load_library_docs(DOCS_JSX, None)['pages']
+    assert pages and all(page['sections'] for page in pages)
@@ -0,0 +1,78 @@
+import re
+
+import pypdf
+
+from docbuild import drawings
+
+
+def draw_label(calls, canv):
+    calls.append(canv)
+    canv.setFont('Helvetica-Bold', 14)
+    canv.drawString(10, 10, 'Chart label')
+
+
+def write(path, key, calls, fonts=(), alpha=None):
+    from functools import partial
+    from reportlab.pdfgen.canvas import Canvas
+
+    canvas = Canvas(path, invariant=1)
+    for font in fonts:
+        canvas.setFont(font, 10)
+        canvas.drawString(72, 720, font)
+    render = partial(draw_label, calls)
+    if alpha is not None:
+        def render(canv):
+            canv.setFillAlpha(alpha)
+            draw_label(calls, canv)
+    drawings.place(canvas, key, 200, 100, render)
+    canvas.showPage()
+    canvas.save()
+    return path
+
+
+def form_fonts(path):
+    """The (name, base font) of each font the drawing's form selects, in order"""
+    page = pypdf.PdfReader(path).pages[0]
+    form, = [xobject.get_object() for name, xobject in page['/Resources']['/XObject'].items()
+             if 'Drawing' in name]
+    names = re.findall(rb'(/\S+) [\d.]+ Tf', form.get_data())
+    return [(name.decode(), form['/Resources']['/Font'][name.decode()]['/BaseFont']) for name in names]
+
+
+def test_stored_rendering_is_reused_with_the_fonts_renamed(tmp_path, monkeypatch):
+    monkeypatch.setattr(drawings, '_rendered', {})
+    key = drawings.drawing_key('label chart')
+    calls = []
+    with drawings.storing(str(tmp_path / 'store')):
+        first = write(str(tmp_path / 'first.pdf'), key, calls)
+    assert len(calls) == 1
+    name, font = form_fonts(first)[-1]
+    assert font == '/Helvetica-Bold'
+
+    # a new process: nothing in memory, and Helvetica-Bold gets another name in this document
+    monkeypatch.setattr(drawings, '_rendered', {})
+    with drawings.storing(str(tmp_path / 'store')):
+        second = write(str(tmp_path / 'second.pdf'), key, calls, fonts=['Courier', 'Times-Roman'])
+    assert len(calls) == 1
+    renamed, font = form_fonts(second)[-1]
+    assert font == '/Helvetica-Bold' and renamed != name
+    assert 'Chart label' in pypdf.PdfReader(second).pages[0].extract_text()
+
+
+def test_renderings_using_other_resources_are_drawn_every_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(drawings, '_rendered', {})
+    key = drawings.drawing_key('translucent chart')
+    calls = []
+    for name in ('first', 'second'):
+        write(str(tmp_path / (name + '.pdf')), key, calls, alpha=0.5)
+    assert len(calls) == 2
+
+
+def test_key_follows_the_description_and_reportlab_version(monkeypatch):
+    import reportlab
+
+    key = drawings.drawing_key('chart')
+    assert drawings.drawing_key('chart') == key
+    assert drawings.drawing_key('other chart') != key
+    monkeypatch.setattr(reportlab, 'Version', reportlab.Version + '.post1')
+    assert drawings.drawing_key('chart') != key
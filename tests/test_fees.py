@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from docbuild.fees import EXAMPLE_VALUE, FEES, FeeModel, schedule_rows, sensitivity_rows, take_rate_rows
+
+
+def test_schedule_rows_work_through_100_sol():
+    assert EXAMPLE_VALUE == 100
+    rows = dict((row['item'], row) for row in schedule_rows(FEES, EXAMPLE_VALUE))
+    assert list(rows) == ["Protocol fee", "- Treasury", "- Token buyback", "- Insurance fund", "Validator rewards",
+                          "Network gas", "Robot receives"]
+    expected = {"Protocol fee": 2.5, "- Treasury": 1.5, "- Token buyback": 0.5, "- Insurance fund": 0.5,
+                "Validator rewards": 0.5, "Network gas": 0.001, "Robot receives": 96.999}
+    for item, amount in expected.items():
+        assert rows[item]['amount'] == pytest.approx(amount)
+    assert rows["Robot receives"]['rate'] == pytest.approx(96.999)
+    assert sum(row['amount'] for item, row in rows.items() if not item.startswith('- ')) == pytest.approx(100)
+
+
+def test_take_rate_falls_with_task_value():
+    rows = take_rate_rows(FEES, [0.1, 1, 100])
+    assert [row['take_rate'] for row in rows] == pytest.approx([4.0, 3.1, 3.001])
+    assert rows[-1]['robot'] == pytest.approx(96.999)
+
+
+def test_evaluate_broadcasts_parameters():
+    fees = FeeModel().evaluate(np.array([[10.0], [100.0]]), protocol_fee=np.array([1.5, 2.5, 3.5]))
+    assert fees.protocol.shape == (2, 3)
+    assert fees.protocol[1] == pytest.approx([1.5, 2.5, 3.5])
+    assert fees.robot == pytest.approx(fees.value - fees.protocol - fees.validators - fees.gas)
+
+
+def test_sensitivity_rows_match_single_evaluations():
+    rows = sensitivity_rows(FEES, [1, 100], [2.0, 3.0])
+    for row in rows:
+        for value in (1, 100):
+            assert row[value] == pytest.approx(float(FEES.evaluate(value, row['protocol_fee']).take_rate) * 100)
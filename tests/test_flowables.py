@@ -0,0 +1,130 @@
+import pypdf
+
+
+def styles():
+    from reportlab.lib.styles import ParagraphStyle
+
+    body = ParagraphStyle('Terminal', fontName='Courier', fontSize=9, leading=12, spaceBefore=2, spaceAfter=2)
+    return body, ParagraphStyle('TerminalComment', parent=body, fontName='Courier-Oblique')
+
+
+def build(path, flowables, height=300):
+    from reportlab.platypus import SimpleDocTemplate
+
+    doc = SimpleDocTemplate(path, pagesize=(400, height), invariant=1,
+                            leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36)
+    doc.build(flowables)
+    return [page.extract_text() for page in pypdf.PdfReader(path).pages]
+
+
+def terminal(count):
+    from docbuild.flowables import TerminalBlock
+
+    body, comment = styles()
+    lines = ['$ step %d' % index if index % 2 else '# note %d' % index for index in range(count)]
+    return TerminalBlock(lines, body, comment_style=comment), lines
+
+
+def test_terminal_block_splits_between_rows():
+    block, lines = terminal(10)
+    width, height = block.wrap(300, 1000)
+    assert height == 10 * 12 + 9 * 2
+    first, rest = block.split(300, 60)
+    assert first.wrap(300, 60)[1] <= 60
+    assert len(first.rows) + len(rest.rows) == 10
+    assert rest.getSpaceBefore() == 2
+    assert rest.wrap(300, 1000)[1] == height - first.height - 2
+    assert block.split(300, 5) == []
+
+
+def test_terminal_block_wraps_long_lines_by_character():
+    from docbuild.flowables import TerminalBlock
+
+    body, comment = styles()
+    block = TerminalBlock(['x' * 100], body)
+    block.wrap(100, 1000)
+    rows = block._layout[1]
+    assert ''.join(content for content, style, continued in rows) == 'x' * 100
+    assert [continued for content, style, continued in rows] == [False] + [True] * (len(rows) - 1)
+
+
+def test_terminal_block_split_across_a_page_boundary_keeps_every_line(tmp_path):
+    block, lines = terminal(40)
+    pages = build(str(tmp_path / 'terminal.pdf'), [block])
+    assert len(pages) > 1
+    assert '\n'.join(pages).split('\n') == lines
+
+
+def code(count):
+    return '\n'.join("const value%d = 'item' + %d // row %d" % (index, index, index) for index in range(count)) + '\n'
+
+
+def test_code_tokens_rebuild_each_line():
+    from docbuild.highlight import tokenize
+
+    lines = tokenize(code(3), 'javascript')
+    assert [''.join(text for kind, text in line) for line in lines] == code(3).split('\n')
+    assert [kind for kind, text in lines[0] if kind != 'plain'] == ['keyword', 'string', 'number', 'comment']
+
+
+def test_code_block_split_across_a_page_boundary_keeps_every_line(tmp_path):
+    from reportlab.lib import colors
+    from docbuild.flowables import CodeBlock
+
+    body, comment = styles()
+    block = CodeBlock(code(40), 'js', body, palette={'keyword': colors.blue, 'string': colors.green})
+    assert len(block.rows) == 40
+    first, rest = block.split(300, 100)
+    assert [continued for tokens, style, continued in rest.rows][:2] == [False, True]
+    pages = build(str(tmp_path / 'code.pdf'), [block])
+    assert len(pages) > 1
+    assert '\n'.join(pages).split('\n') == code(40).split('\n')[:-1]
+
+
+def test_code_block_cuts_wide_lines_between_tokens():
+    from docbuild.flowables import CodeBlock
+
+    body, comment = styles()
+    block = CodeBlock("let s = 'abcdefghij'", 'javascript', body)
+    assert block.cut(block.rows[0][0], 6, 12) == [('plain', '= '), ('string', "'abc")]
+
+
+def test_inline_fragments_follow_bold_and_italic():
+    import pytest
+    from docbuild.flowables import inline_fragments
+
+    assert inline_fragments('a <b>b <i>c</i></b> &amp; d', 'Helvetica') == [
+        ('Helvetica', 'a '), ('Helvetica-Bold', 'b '), ('Helvetica-BoldOblique', 'c'), ('Helvetica', ' & d')]
+    with pytest.raises(ValueError):
+        inline_fragments('<a href="x">link</a>', 'Helvetica')
+
+
+def test_break_lines_fits_the_width():
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from docbuild.flowables import break_lines
+
+    lines = break_lines([('Helvetica', 'one  two three four five six')], 10, 60)
+    texts = [''.join(text for fontName, text in line) for line in lines]
+    assert ' '.join(texts) == 'one two three four five six'
+    assert all(stringWidth(text, 'Helvetica', 10) <= 60 for text in texts)
+
+
+def test_numbered_list_hangs_wrapped_lines_and_splits_between_them(tmp_path):
+    from docbuild.flowables import ListBlock
+    from reportlab.lib.styles import ParagraphStyle
+
+    style = ParagraphStyle('List', fontName='Helvetica', fontSize=10, leading=12, spaceAfter=4)
+    items = ['item %d has <b>enough words</b> to wrap onto a second line' % index for index in range(30)]
+    block = ListBlock(items, style, numbered=True, start=3)
+    block.wrap(200, 1000)
+    rows = block._layout[1]
+    assert [content[0] for content, style, continued in rows[:2]] == ['3.', '']
+    assert [continued for content, style, continued in rows[:2]] == [False, True]
+    first, rest = block.split(200, 100)
+    assert len(first.rows) + len(rest.rows) == len(rows)
+
+    pages = build(str(tmp_path / 'list.pdf'), [block])
+    assert len(pages) > 1
+    text = ' '.join(pages)
+    assert '3.' in text and '32.' in text
+    assert ' '.join(text.split()).count('enough words') == 30
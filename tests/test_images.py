@@ -0,0 +1,35 @@
+import glob
+import os
+
+import pytest
+from PIL import Image
+
+from docbuild.content import PUBLIC_DIR
+from docbuild.images import image_size, prepare, print_size
+
+SOURCES = sorted(glob.glob(os.path.join(PUBLIC_DIR, '*.png')))
+
+
+@pytest.mark.parametrize('path', SOURCES, ids=os.path.basename)
+@pytest.mark.parametrize('width', [80, 160, 1000])
+def test_prepared_image_is_not_larger_than_its_source(tmp_path, path, width):
+    pixels = image_size(path)
+    height = width * pixels[1] / pixels[0]
+    prepared = prepare(path, width, height, directory=str(tmp_path))
+    assert os.path.getsize(prepared) <= os.path.getsize(path)
+    with Image.open(prepared) as image:
+        assert image.size == print_size(path, width, height)
+
+
+def test_prepared_png_keeps_its_transparency(tmp_path):
+    path = os.path.join(PUBLIC_DIR, 'robot-drone.png')
+    with Image.open(prepare(path, 120, 63, directory=str(tmp_path))) as image:
+        alpha = image.convert('RGBA').getchannel('A')
+    assert alpha.getextrema() == (0, 255)
+
+
+def test_prepared_images_are_reused(tmp_path):
+    path = os.path.join(PUBLIC_DIR, 'logo.png')
+    first = prepare(path, 80, 80, directory=str(tmp_path))
+    assert prepare(path, 80, 80, directory=str(tmp_path)) == first
+    assert len(os.listdir(str(tmp_path))) == 1
@@ -0,0 +1,77 @@
+import json
+import os
+from functools import partial
+
+from docbuild.build import build_pdf
+from docbuild.output import KEEP_COPIES, file_digest, hashed_name, publish, staging_path, update_manifest
+from docbuild.spec import DocumentSpec
+
+
+def write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_publish_leaves_an_unchanged_output_alone(tmp_path):
+    output = write(str(tmp_path / 'doc.pdf'), b'one')
+    os.utime(output, (1, 1))
+    digest, changed = publish(write(staging_path(output), b'one'), output)
+    assert (digest, changed) == (file_digest(output), False)
+    assert os.path.getmtime(output) == 1
+    assert not os.path.exists(staging_path(output))
+
+    digest, changed = publish(write(staging_path(output), b'two'), output)
+    assert changed
+    with open(output, 'rb') as f:
+        assert f.read() == b'two'
+
+
+def test_manifest_keeps_the_latest_hashed_copies(tmp_path):
+    output = str(tmp_path / 'doc.pdf')
+    manifest = str(tmp_path / 'manifest.json')
+    names = []
+    for build in range(KEEP_COPIES + 2):
+        write(output, b'build %d' % build)
+        digest = file_digest(output)
+        hashed, = update_manifest(manifest, [(output, digest)])
+        assert os.path.basename(hashed) == hashed_name(output, digest)
+        names.append(os.path.basename(hashed))
+
+    with open(manifest) as f:
+        entry = json.load(f)['doc.pdf']
+    assert entry['file'] == names[-1]
+    assert entry['previous'] == names[-2:-KEEP_COPIES - 1:-1]
+    assert sorted(os.listdir(str(tmp_path))) == sorted(names[-KEEP_COPIES:] + ['doc.pdf', 'manifest.json'])
+
+
+def section(text, styles):
+    from reportlab.platypus import Paragraph
+
+    return [Paragraph(text, styles['Normal'])]
+
+
+def spec():
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate
+
+    return DocumentSpec('output', [(text, partial(section, text)) for text in ['one', 'two', 'three']],
+                        getSampleStyleSheet, SimpleDocTemplate)
+
+
+def test_deterministic_builds_are_identical_and_not_republished(tmp_path, monkeypatch):
+    from reportlab import rl_config
+
+    monkeypatch.setattr(rl_config, 'invariant', rl_config.invariant)
+    for name, options in [('single', {}), ('sections', {'cache_dir': str(tmp_path / 'cache')})]:
+        output = str(tmp_path / (name + '.pdf'))
+        build_pdf(spec(), output, deterministic=True, **options)
+        with open(output, 'rb') as f:
+            first = f.read()
+        os.utime(output, (1, 1))
+        build_pdf(spec(), str(tmp_path / 'copy.pdf'), deterministic=True, **options)
+        build_pdf(spec(), output, deterministic=True, **options)
+        with open(str(tmp_path / 'copy.pdf'), 'rb') as f:
+            assert f.read() == first
+        assert os.path.getmtime(output) == 1
+        assert not os.path.exists(staging_path(output))
@@ -0,0 +1,118 @@
+import pypdf
+
+from docbuild.assemble import assemble_pdf
+from docbuild.build import build_single_pass
+from docbuild.pages import PageDiff, diff_pages, load_pages, page_ranges, read_pages, update_page_manifest
+from docbuild.spec import DocumentSpec
+
+PAGES = ['a', 'b', 'c', 'd', 'e']
+
+
+def test_identical_builds_do_not_differ():
+    diff = diff_pages(PAGES, list(PAGES))
+    assert not diff
+    assert diff.unchanged == 5
+
+
+def test_inserted_pages_are_added():
+    diff = diff_pages(PAGES, ['a', 'b', 'x', 'y', 'c', 'd', 'e'])
+    assert (diff.changed, diff.added, diff.removed, diff.unchanged) == ([], [3, 4], [], 5)
+
+
+def test_deleted_pages_are_removed():
+    diff = diff_pages(PAGES, ['a', 'd', 'e'])
+    assert (diff.changed, diff.added, diff.removed, diff.unchanged) == ([], [], [2, 3], 3)
+
+
+def test_replaced_pages_are_changed():
+    diff = diff_pages(PAGES, ['a', 'x', 'y', 'd', 'e'])
+    assert (diff.changed, diff.added, diff.removed, diff.unchanged) == ([(2, 2), (3, 3)], [], [], 3)
+
+
+def test_replacing_with_more_pages_changes_then_adds():
+    diff = diff_pages(PAGES, ['a', 'x', 'y', 'z', 'd', 'e'])
+    assert diff.changed == [(2, 2), (3, 3)]
+    assert diff.added == [4]
+    assert diff.removed == []
+
+
+def test_first_build_adds_every_page():
+    diff = diff_pages([], PAGES)
+    assert diff.added == [1, 2, 3, 4, 5]
+    assert diff.as_dict() == {'changed': [], 'added': [1, 2, 3, 4, 5], 'removed': []}
+    assert diff.summary() == "0 changed, 5 added, 0 removed, 0 unchanged"
+
+
+def test_page_ranges():
+    assert page_ranges([12, 3, 5, 6, 7]) == '3, 5-7, 12'
+    assert page_ranges([]) == ''
+    assert not PageDiff()
+
+
+def write_pdf(path, texts):
+    from reportlab.pdfgen.canvas import Canvas
+
+    canvas = Canvas(path, invariant=1)
+    for text in texts:
+        canvas.drawString(72, 720, text)
+        canvas.showPage()
+    canvas.save()
+    return path
+
+
+def test_builds_in_different_modes_are_not_compared(tmp_path):
+    output = write_pdf(str(tmp_path / 'doc.pdf'), ['one', 'two'])
+    manifest = str(tmp_path / 'pages.json')
+    assert update_page_manifest(manifest, [output])[0].added == [1, 2]
+    assert not update_page_manifest(manifest, [output])[0]
+
+    part = write_pdf(str(tmp_path / 'part.pdf'), ['one', 'two'])
+    assemble_pdf([part], output)
+    assert read_pages(output)[0] == 'sections'
+    assert load_pages(manifest)[0] == 'single-pass'
+    diff = update_page_manifest(manifest, [output])[0]
+    assert (diff.changed, diff.added) == ([], [1, 2])
+    assert load_pages(manifest) == read_pages(output)
+
+
+def draw_number(canvas, page_num):
+    canvas.setFont('Helvetica', 9)
+    canvas.drawCentredString(300, 30, str(page_num))
+
+
+def test_page_inserted_in_an_assembled_build_is_the_only_one_added(tmp_path):
+    def build(name, texts):
+        parts = [write_pdf(str(tmp_path / ('%s-%s.pdf' % (name, text))), [text]) for text in texts]
+        path = str(tmp_path / (name + '.pdf'))
+        assemble_pdf(parts, path, draw_number)
+        return path
+
+    old = build('old', ['one', 'two', 'three', 'four'])
+    new = build('new', ['one', 'two', 'inserted', 'three', 'four'])
+    assert '5' in pypdf.PdfReader(new).pages[4].extract_text()
+    diff = diff_pages(read_pages(old)[1], read_pages(new)[1])
+    assert (diff.changed, diff.added, diff.removed, diff.unchanged) == ([], [3], [], 4)
+
+
+def test_page_inserted_in_a_single_pass_build_is_the_only_one_added(tmp_path):
+    def section(text, styles):
+        from reportlab.platypus import Paragraph
+
+        return [Paragraph(text, styles['Normal'])]
+
+    def build(name, texts):
+        from functools import partial
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate
+
+        spec = DocumentSpec(name, [(text, partial(section, text)) for text in texts], getSampleStyleSheet,
+                            lambda path: SimpleDocTemplate(path, invariant=1), draw_page_number=draw_number)
+        path = str(tmp_path / (name + '.pdf'))
+        build_single_pass(spec, path)
+        return path
+
+    old = build('old', ['one', 'two', 'three', 'four'])
+    new = build('new', ['one', 'two', 'inserted', 'three', 'four'])
+    assert read_pages(new)[0] == 'single-pass'
+    diff = diff_pages(read_pages(old)[1], read_pages(new)[1])
+    assert (diff.changed, diff.added, diff.removed, diff.unchanged) == ([], [3], [], 4)
@@ -0,0 +1,69 @@
+import os
+
+import pypdf
+import pytest
+
+from docbuild.personalize import Personalization, Stamper, personalize, read_recipients
+
+
+def write_base(path, texts):
+    from reportlab.pdfgen.canvas import Canvas
+
+    canvas = Canvas(path, invariant=1)
+    for text in texts:
+        canvas.drawString(72, 720, text)
+        canvas.showPage()
+    canvas.save()
+    return path
+
+
+def draw_recipient(canvas, page_num, recipient):
+    canvas.setFont('Helvetica-Bold', 12)
+    canvas.drawString(72, 100, 'Prepared for %s' % recipient['name'])
+
+
+PERSONALIZATION = Personalization(draw_recipient, fields=('name',), pages=(1, 3), filename='{name}.pdf')
+
+
+def test_stamped_copy_is_the_base_plus_an_update(tmp_path):
+    base = write_base(str(tmp_path / 'base.pdf'), ['first page', 'second page', 'third page'])
+    with open(base, 'rb') as f:
+        original = f.read()
+    stamped = Stamper(base, PERSONALIZATION).stamp({'name': 'Ada Lovelace'})
+    assert stamped.startswith(original.rstrip())
+
+    path = str(tmp_path / 'copy.pdf')
+    with open(path, 'wb') as f:
+        f.write(stamped)
+    reader = pypdf.PdfReader(path, strict=True)
+    texts = [page.extract_text() for page in reader.pages]
+    assert len(texts) == 3
+    assert 'first page' in texts[0] and 'Prepared for Ada Lovelace' in texts[0]
+    assert texts[1] == pypdf.PdfReader(base).pages[1].extract_text()
+    assert 'third page' in texts[2] and 'Prepared for Ada Lovelace' in texts[2]
+
+
+def test_stamping_a_missing_page_is_refused(tmp_path):
+    base = write_base(str(tmp_path / 'base.pdf'), ['only page'])
+    with pytest.raises(ValueError, match='has 1 pages, cannot stamp page 3'):
+        Stamper(base, PERSONALIZATION)
+
+
+def test_personalize_writes_one_copy_per_recipient_and_skips_unchanged_ones(tmp_path):
+    base = write_base(str(tmp_path / 'base.pdf'), ['first page', 'second page', 'third page'])
+    recipients = [{'name': 'Ada'}, {'name': 'Grace Hopper'}]
+    out_dir = str(tmp_path / 'copies')
+    assert personalize(base, recipients, PERSONALIZATION, out_dir, jobs=1) == (2, 2)
+    assert sorted(os.listdir(out_dir)) == ['Ada.pdf', 'Grace_Hopper.pdf']
+    assert personalize(base, recipients, PERSONALIZATION, out_dir, jobs=1) == (2, 0)
+
+    with pytest.raises(ValueError, match='recipients 0 and 1'):
+        personalize(base, [{'name': 'Ada'}, {'name': 'Ada'}], PERSONALIZATION, out_dir, jobs=1)
+
+
+def test_recipients_without_a_field_are_reported(tmp_path):
+    path = str(tmp_path / 'recipients.csv')
+    with open(path, 'w') as f:
+        f.write('name,company\nAda,Analytical\n,Nobody\n')
+    with pytest.raises(ValueError, match='recipients.csv:3: recipient has no name'):
+        list(read_recipients(path, ['name']))
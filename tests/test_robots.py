@@ -0,0 +1,66 @@
+import os
+import random
+
+import pytest
+
+from docbuild.robots import (catalog_groups, catalog_order, export_jsonl, jsonl_records, jsx_records,
+                             sort_records, spec_sheet)
+
+
+def records(count, seed=5):
+    rng = random.Random(seed)
+    for index in range(count):
+        yield {'sku': 'SKU-%05d' % index, 'category': rng.choice(['Drones', 'Humanoids', 'Rovers']),
+               'name': 'Robot %d' % index, 'tier': rng.choice(['budget', 'standard', 'premium']),
+               'price_usd': rng.randrange(1000, 100000)}
+
+
+def test_merge_sort_over_several_runs_matches_sorted(tmp_path):
+    merged = sort_records(records(1000), run_size=64, tmpdir=str(tmp_path))
+    first = next(merged)
+    workdir, = os.listdir(str(tmp_path))
+    assert len(os.listdir(str(tmp_path / workdir))) == 16
+    assert [first] + list(merged) == sorted(records(1000), key=catalog_order)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_runs_are_removed_when_the_merge_is_closed(tmp_path):
+    merged = sort_records(records(200), run_size=50, tmpdir=str(tmp_path))
+    next(merged)
+    merged.close()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_a_stream_that_fits_in_one_run_is_not_spilled(tmp_path):
+    merged = sort_records(records(50), run_size=64, tmpdir=str(tmp_path))
+    first = next(merged)
+    workdir, = os.listdir(str(tmp_path))
+    assert os.listdir(str(tmp_path / workdir)) == []
+    assert [first] + list(merged) == sorted(records(50), key=catalog_order)
+
+
+def test_catalog_groups_follow_category_order():
+    groups = [(category, [record['sku'] for record in group])
+              for category, group in catalog_groups(records(300), run_size=40)]
+    assert [category for category, skus in groups] == ['Drones', 'Humanoids', 'Rovers']
+    assert sum(len(skus) for category, skus in groups) == 300
+
+
+def test_jsonl_export_round_trips_and_reports_bad_lines(tmp_path):
+    path = str(tmp_path / 'catalog.jsonl')
+    assert export_jsonl(records(10), path) == 10
+    assert list(jsonl_records(path)) == list(records(10))
+
+    with open(path, 'a') as f:
+        f.write('{"sku": "X", "category": "Drones"}\n')
+    with pytest.raises(ValueError, match=r'catalog.jsonl:11: record has no name'):
+        list(jsonl_records(path))
+
+
+def test_robots_page_records_have_spec_sheets():
+    catalog = list(jsx_records())
+    assert catalog and len(set(record['sku'] for record in catalog)) == len(catalog)
+    rows = spec_sheet(catalog[0])
+    assert rows[0] == ('SKU', catalog[0]['sku'])
+    assert spec_sheet({'sku': 'A', 'price_usd': 1200, 'maintenance_usd': 99.5}) == [
+        ('SKU', 'A'), ('Price', '$1,200'), ('Maintenance', '$99.50 / year')]
@@ -0,0 +1,47 @@
+import pytest
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus.doctemplate import LayoutError
+
+from docbuild.tables import DataTable, TableTheme, fit_widths
+
+
+def test_wrapping_columns_share_the_room_left():
+    widths = fit_widths([100, 50, 200], [20, 10, 30], [False, True, True], 400)
+    assert widths == pytest.approx([100, 60, 240])
+
+
+def test_column_is_pinned_at_its_minimum():
+    widths = fit_widths([50, 300, 100], [10, 20, 90], [False, True, True], 250)
+    assert widths[2] == 90
+    assert widths == pytest.approx([50, 110, 90])
+
+
+def test_fixed_columns_overflowing_shrink_and_wrapping_ones_keep_their_minimum():
+    widths = fit_widths([300, 50, 200], [20, 10, 30], [False, True, True], 200)
+    assert widths[1:] == [10, 30]
+    assert sum(widths) == pytest.approx(200)
+    assert min(widths) > 0
+
+
+def test_fixed_columns_are_shrunk_in_proportion_but_not_below_their_minimum():
+    widths = fit_widths([300, 100, 40], [250, 20, 30], [False, False, True], 320)
+    assert widths == pytest.approx([250, 40, 30])
+
+
+def test_all_fixed_columns_share_the_width():
+    assert fit_widths([300, 100], [20, 10], [False, False], 200) == pytest.approx([150, 50])
+
+
+def test_table_too_narrow_for_its_minimum_widths_raises():
+    with pytest.raises(LayoutError):
+        fit_widths([300, 50], [150, 60], [False, True], 200)
+
+
+def test_table_fits_the_frame_and_is_measured_once():
+    styles = getSampleStyleSheet()
+    theme = TableTheme(styles['Heading4'], styles['Normal'])
+    rows = [{'name': 'row %d' % index, 'notes': 'words ' * index} for index in range(40)]
+    table = DataTable(rows, ['name', 'notes'], theme)
+    width, height = table.wrap(200, 1000)
+    assert width == pytest.approx(200)
+    assert DataTable(rows, ['name', 'notes'], theme).measure() is table.measure()
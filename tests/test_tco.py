@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from docbuild import tco
+from docbuild.tco import (BINS, OUTCOMES, SCENARIOS, SHARD_SIZE, CostRanges, Distribution, TCOModel, histogram,
+                         simulate, simulated, simulating)
+
+DRONES = CostRanges('Drones', (15000, 75000), (2000, 10000), (0.05, 0.15), (40, 120), (0.8, 1.2))
+HUMANOIDS = CostRanges('Humanoids', (90000, 250000), (10000, 40000), (0.08, 0.2), (60, 200), (0.8, 1.3))
+
+
+def test_percentile_matches_numpy_on_a_known_sample():
+    values = np.random.default_rng(7).normal(50.0, 10.0, 200000)
+    bounds = (float(values.min()), float(values.max()))
+    distribution = Distribution('sample', {'tco': bounds}, {'tco': histogram(values, bounds)})
+    width = (bounds[1] - bounds[0]) / BINS
+    for q in (1, 10, 50, 90, 99):
+        assert distribution.percentile('tco', q) == pytest.approx(np.percentile(values, q), abs=width)
+
+
+def test_histogram_keeps_the_ends():
+    counts = histogram(np.array([0.0, 0.5, 1.0]), (0.0, 1.0), bins=4)
+    assert counts.tolist() == [1, 0, 1, 1]
+
+
+def test_simulate_gives_the_same_result_whatever_the_pool_size():
+    model = TCOModel()
+    alone = simulate([DRONES, HUMANOIDS], 20000, model, seed=11, jobs=1, shard_size=4000)
+    pooled = simulate([DRONES, HUMANOIDS], 20000, model, seed=11, jobs=2, shard_size=4000)
+    for first, second in zip(alone, pooled):
+        assert first.category == second.category
+        assert first.scenarios == second.scenarios == 20000
+        for name in OUTCOMES:
+            assert first.bounds[name] == second.bounds[name]
+            assert np.array_equal(first.counts[name], second.counts[name])
+
+
+def test_outcomes_stay_within_bounds():
+    model = TCOModel()
+    bounds = model.bounds(DRONES)
+    outcomes = model.outcomes(model.sample(DRONES, 5000, np.random.default_rng(3)))
+    for name in OUTCOMES:
+        assert bounds[name][0] <= outcomes[name].min() and outcomes[name].max() <= bounds[name][1]
+
+
+def test_simulated_runs_with_the_pool_size_of_simulating(monkeypatch):
+    assert SCENARIOS > SHARD_SIZE
+    pools = []
+    monkeypatch.setattr(tco, '_simulated', {})
+    monkeypatch.setattr(tco, 'simulate', lambda ranges, scenarios, model, seed, jobs: pools.append(jobs) or jobs)
+    with simulating(4):
+        assert simulated([DRONES], 1000) == 4
+        assert simulated([DRONES], 1000) == 4
+    assert simulated([HUMANOIDS], 1000) == 1
+    assert pools == [4, 1]
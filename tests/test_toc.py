@@ -0,0 +1,80 @@
+import re
+from functools import partial
+
+import pypdf
+
+from docbuild import toc
+from docbuild.build import build_sections, build_single_pass
+from docbuild.spec import DocumentSpec
+
+
+def test_start_pages_follow_page_counts():
+    assert toc.start_pages(['a', 'b', 'c'], [1, 3, 2]) == {'a': 1, 'b': 2, 'c': 5}
+    manifest = [{'title': 'a', 'pages': 2}, {'title': 'b', 'pages': 4}]
+    assert toc.estimate_pages(['a', 'new', 'b', 'c'], manifest) == {'a': 1, 'new': 3, 'b': 4, 'c': 8}
+
+
+def test_page_map_is_stale_only_when_a_looked_up_page_moved():
+    pages = toc.PageMap({'a': 1, 'b': 2, 'c': 3})
+    assert toc.lookup(['a']) is None
+    with toc.using(pages):
+        assert toc.lookup(['a', 'b']) == [1, 2]
+        with toc.using(None):
+            assert toc.active() is None
+        assert toc.active() is pages
+    assert toc.active() is None
+    assert pages.lookups == 2 and pages.looked_up == {'a', 'b'}
+    assert not pages.stale({'a': 1, 'b': 2, 'c': 9})
+    assert pages.stale({'a': 1, 'b': 3, 'c': 3})
+
+
+def contents(titles, styles):
+    from docbuild.flowables import Contents
+
+    return [Contents(titles, styles['Normal'])]
+
+
+def section(pages, styles):
+    from reportlab.platypus import PageBreak, Paragraph
+
+    flowables = []
+    for page in range(pages):
+        if page:
+            flowables.append(PageBreak())
+        flowables.append(Paragraph('page %d' % (page + 1), styles['Normal']))
+    return flowables
+
+
+def spec(lengths):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate
+
+    titles = sorted(lengths)
+    sections = [('Contents', partial(contents, titles))]
+    sections += [(title, partial(section, lengths[title])) for title in titles]
+    return DocumentSpec('toc', sections, getSampleStyleSheet, lambda path: SimpleDocTemplate(path, invariant=1))
+
+
+def shown(path):
+    # single-pass numbers are forms, which come out after the titles
+    text = pypdf.PdfReader(path).pages[0].extract_text()
+    return dict(zip(re.findall(r'(\w+) \.+', text), re.findall(r'\b\d+\b', text)))
+
+
+def test_single_pass_contents_show_where_sections_start(tmp_path):
+    output = str(tmp_path / 'doc.pdf')
+    assert build_single_pass(spec({'A': 1, 'B': 2, 'C': 1}), output) == 5
+    assert shown(output) == {'A': '2', 'B': '3', 'C': '5'}
+
+
+def test_section_contents_are_rendered_again_when_pages_move(tmp_path):
+    cache_dir, output = str(tmp_path / 'cache'), str(tmp_path / 'doc.pdf')
+    build_sections(spec({'A': 1, 'B': 2, 'C': 1}), output, cache_dir)
+    assert shown(output) == {'A': '2', 'B': '3', 'C': '5'}
+
+    again = build_sections(spec({'A': 1, 'B': 2, 'C': 1}), output, cache_dir)
+    assert [hit for title, pages, hit in again] == [True, True, True, True]
+
+    moved = build_sections(spec({'A': 1, 'B': 3, 'C': 1}), output, cache_dir)
+    assert [hit for title, pages, hit in moved] == [False, True, False, True]
+    assert shown(output) == {'A': '2', 'B': '3', 'C': '6'}